@@ -0,0 +1,87 @@
+"""
+Benchmark da compressão dos arquivos de macro.
+
+Gera uma gravação realista (trajetórias do mouse amostradas a ~125 Hz com
+jitter no tempo, rajadas de digitação e cliques) e mede, para cada formato, o
+tamanho em disco, a razão em relação ao `.json` indentado e os tempos de salvar
+e carregar.
+
+Uso:
+    python -m benchmarks.bench_compression
+"""
+import json
+import math
+import os
+import random
+import tempfile
+import time
+
+from src.managers.file_manager import save_events_to_path, load_events_from_path
+
+FORMATS = ('.json', '.json.gz', '.json.xz', '.jsonl', '.jsonl.gz', '.jsonl.xz', '.gmac')
+
+_TEXT = "the quick brown fox jumps over the lazy dog "
+
+
+def make_recording(duration=600.0, seed=1):
+    """Cria uma gravação sintética com `duration` segundos no formato de dicionários."""
+    rng = random.Random(seed)
+    events = []
+    t = 0.0
+    x, y = 960.0, 540.0
+    while t < duration:
+        if rng.random() < 0.7:
+            # Trajetória suave até um ponto, seguida de um clique às vezes
+            tx, ty = rng.uniform(0, 1919), rng.uniform(0, 1079)
+            steps = rng.randint(20, 120)
+            for step in range(1, steps + 1):
+                f = (1 - math.cos(math.pi * step / steps)) / 2
+                t += 0.008 + rng.uniform(-0.001, 0.001)
+                events.append({'time': t, 'type': 'move', 'pos': (int(x + (tx - x) * f), int(y + (ty - y) * f))})
+            x, y = tx, ty
+            if rng.random() < 0.5:
+                for pressed in (True, False):
+                    t += rng.uniform(0.05, 0.12)
+                    events.append({'time': t, 'type': 'click', 'pos': (int(x), int(y)), 'button': 'Button.left', 'pressed': pressed})
+        else:
+            # Rajada de digitação
+            start = rng.randrange(len(_TEXT))
+            for char in _TEXT[start:start + rng.randint(5, 30)]:
+                t += rng.uniform(0.06, 0.2)
+                key = 'space' if char == ' ' else f"'{char}'"
+                events.append({'time': t, 'type': 'key_tap', 'key': key})
+        t += rng.uniform(0.1, 1.0)
+    return events
+
+
+def run(duration=600.0):
+    """Executa o benchmark e retorna os resultados como dicionário."""
+    events = make_recording(duration)
+    results = {'benchmark': 'compression', 'events': len(events), 'duration_s': duration, 'formats': {}}
+    with tempfile.TemporaryDirectory() as directory:
+        for extension in FORMATS:
+            path = os.path.join(directory, 'macro' + extension)
+            start = time.perf_counter()
+            save_events_to_path(events, path)
+            save_time = time.perf_counter() - start
+            start = time.perf_counter()
+            loaded = load_events_from_path(path)
+            load_time = time.perf_counter() - start
+            assert len(loaded) == len(events)
+            results['formats'][extension] = {
+                'bytes': os.path.getsize(path),
+                'save_s': save_time,
+                'load_s': load_time,
+            }
+    json_bytes = results['formats']['.json']['bytes']
+    for stats in results['formats'].values():
+        stats['ratio_vs_json'] = json_bytes / stats['bytes']
+    return results
+
+
+def main():
+    print(json.dumps(run(), indent=4))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+"""
+Benchmark do custo de despacho por evento do MacroPlayer.
+
+Compara o despacho antigo (cadeia de comparações de `event['type']`, do motor
+e decodificação de tecla/botão a cada evento) com o plano pré-compilado do
+`MacroPlayer.compile`, em que o loop só chama a função já resolvida. Ambos usam
+controladores nulos, então o tempo medido é apenas o overhead de despacho.
+
+Uso:
+    python -m benchmarks.bench_dispatch
+"""
+import json
+import time
+
+from pynput.keyboard import Key, KeyCode
+from pynput.mouse import Button
+
+from src.core.engines import key_string
+
+from .common import make_null_player
+
+
+def _make_events(count):
+    """Gera uma mistura de movimentos, cliques, teclas e rolagem."""
+    keys = [KeyCode.from_char('a'), Key.space, 'enter', "'b'"]
+    events = []
+    for i in range(count):
+        t = i * 0.001
+        kind = i % 10
+        if kind < 6:
+            events.append({'time': t, 'type': 'move', 'pos': (i % 800, i % 600)})
+        elif kind == 6:
+            events.append({'time': t, 'type': 'click', 'pos': (10, 20), 'button': Button.left, 'pressed': True})
+        elif kind == 7:
+            events.append({'time': t, 'type': 'click', 'pos': (10, 20), 'button': 'Button.left', 'pressed': False})
+        elif kind == 8:
+            events.append({'time': t, 'type': 'key_tap', 'key': keys[i % len(keys)]})
+        else:
+            events.append({'time': t, 'type': 'scroll', 'pos': (5, 5), 'scroll': (0, -1)})
+    return events
+
+
+def _legacy_execute(player, event):
+    """Reprodução fiel do despacho por dicionário usado antes do plano compilado."""
+    event_type = event.get('type')
+    engine = player.engine
+    if event_type == 'key_tap':
+        key_string(event['key'])
+        if engine == 'pydirectinput':
+            pass
+        else:
+            player.keyboard_controller.tap(event['key'])
+    elif event_type == 'move':
+        x, y = event['pos']
+        if engine == 'pydirectinput':
+            pass
+        else:
+            player.mouse_controller.position = (x, y)
+    elif event_type == 'click':
+        x, y = event['pos']
+        button_str = str(event['button']).split('.')[-1]
+        player.mouse_controller.position = (x, y)
+        player.mouse_controller.position = (x, y)
+        from pynput.mouse import Button as _Button
+        button = event['button']
+        if isinstance(button, str):
+            button = getattr(_Button, button_str, None)
+        if button:
+            if event['pressed']:
+                player.mouse_controller.press(button)
+            else:
+                player.mouse_controller.release(button)
+    elif event_type == 'scroll':
+        player.mouse_controller.position = event['pos']
+        player.mouse_controller.scroll(event['scroll'][0], event['scroll'][1])
+
+
+def run(count=200_000):
+    """Executa o benchmark e retorna os resultados como dicionário."""
+    player = make_null_player()
+    # O sleep de acomodação do clique não faz parte do custo de despacho
+    player.backend._click = lambda pos, action, button: action(button)
+    events = _make_events(count)
+
+    start = time.perf_counter()
+    for event in events:
+        _legacy_execute(player, event)
+    legacy = time.perf_counter() - start
+
+    start = time.perf_counter()
+    plan = player.compile(events)
+    compile_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for _, func, args, _ in plan:
+        func(*args)
+    planned = time.perf_counter() - start
+
+    return {
+        'benchmark': 'dispatch',
+        'events': count,
+        'legacy_ns_per_event': legacy / count * 1e9,
+        'plan_ns_per_event': planned / count * 1e9,
+        'compile_ns_per_event': compile_time / count * 1e9,
+        'speedup': legacy / planned if planned else None,
+    }
+
+
+def main():
+    print(json.dumps(run(), indent=4))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""
+Benchmark da montagem da lista de ações (`ActionsDisplay.update`).
+
+Mede o tempo de `update` (resumo + primeira página de linhas) e o tempo até o
+Tk processar as tarefas pendentes, com uma macro sintética. Precisa de um
+servidor X: se `DISPLAY` não estiver definido e o `Xvfb` estiver instalado, um
+servidor virtual é iniciado só para o benchmark; caso contrário o benchmark é
+pulado e o resultado informa o motivo.
+
+Uso:
+    python -m benchmarks.bench_display
+"""
+import json
+import os
+import shutil
+import subprocess
+import time
+
+from .generators import generate
+
+XVFB_DISPLAY = ':99'
+
+
+def _start_virtual_display():
+    """Inicia o Xvfb se não houver display. Retorna o processo (ou None) e o motivo de pular, se houver."""
+    if os.environ.get('DISPLAY'):
+        return None, None
+    xvfb = shutil.which('Xvfb')
+    if not xvfb:
+        return None, "sem DISPLAY e Xvfb não encontrado"
+    process = subprocess.Popen([xvfb, XVFB_DISPLAY, '-screen', '0', '1280x1024x24'],
+                               stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    time.sleep(0.5) # Tempo para o servidor aceitar conexões
+    os.environ['DISPLAY'] = XVFB_DISPLAY
+    return process, None
+
+
+def run(count=100_000, mix='mixed', repeat=3):
+    """Executa o benchmark e retorna os resultados como dicionário (melhor de `repeat` execuções)."""
+    results = {'benchmark': 'display', 'events': count, 'mix': mix}
+    process, skip_reason = _start_virtual_display()
+    if skip_reason:
+        results['skipped'] = skip_reason
+        return results
+
+    try:
+        import tkinter as tk
+        from src.ui.actions_display import ActionsDisplay
+
+        store = generate(count, mix)
+        root = tk.Tk()
+        root.withdraw()
+        display = ActionsDisplay(tk.Frame(root))
+        update_times = []
+        idle_times = []
+        for _ in range(repeat):
+            display.clear()
+            root.update()
+            start = time.perf_counter()
+            display.update(store)
+            update_times.append(time.perf_counter() - start)
+            start = time.perf_counter()
+            root.update_idletasks()
+            idle_times.append(time.perf_counter() - start)
+        results['update_s'] = min(update_times)
+        results['idle_s'] = min(idle_times)
+        results['top_level_rows'] = len(display.tree.get_children())
+        root.destroy()
+    finally:
+        if process:
+            process.terminate()
+            process.wait()
+            del os.environ['DISPLAY']
+    return results
+
+
+def main():
+    print(json.dumps(run(), indent=4))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""
+Benchmark de memória do armazenamento de eventos.
+
+Compara os bytes por evento da lista de dicionários antiga (um dict por evento e
+uma tupla por posição) com as colunas do `EventStore`, medindo as alocações com
+`tracemalloc` para uma gravação sintética dominada por movimentos do mouse.
+
+Uso:
+    python -m benchmarks.bench_event_store
+"""
+import json
+import time
+import tracemalloc
+
+from src.core.event_store import EventStore
+
+
+def _fill_dicts(count):
+    events = []
+    for i in range(count):
+        t = i / 1000
+        if i % 50 == 0:
+            events.append({'time': t, 'type': 'key_tap', 'key': 'a'})
+        else:
+            events.append({'time': t, 'type': 'move', 'pos': (i % 1920, i % 1080)})
+    return events
+
+
+def _fill_store(count):
+    store = EventStore()
+    for i in range(count):
+        t = i * 1_000_000
+        if i % 50 == 0:
+            store.append_key(t, 1, 'a')
+        else:
+            store.append_move(t, i % 1920, i % 1080)
+    return store
+
+
+def _measure(factory, count):
+    tracemalloc.start()
+    start = time.perf_counter()
+    data = factory(count)
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del data
+    return current, peak, elapsed
+
+
+def run(count=500_000):
+    """Executa o benchmark e retorna os resultados como dicionário."""
+    dict_bytes, dict_peak, dict_time = _measure(_fill_dicts, count)
+    store_bytes, store_peak, store_time = _measure(_fill_store, count)
+    return {
+        'benchmark': 'event_store',
+        'events': count,
+        'dict_bytes_per_event': dict_bytes / count,
+        'store_bytes_per_event': store_bytes / count,
+        'store_column_bytes_per_event': EventStore.row_size(),
+        'dict_peak_bytes': dict_peak,
+        'store_peak_bytes': store_peak,
+        'memory_ratio': dict_bytes / store_bytes if store_bytes else None,
+        'dict_append_ns_per_event': dict_time / count * 1e9,
+        'store_append_ns_per_event': store_time / count * 1e9,
+    }
+
+
+def main():
+    print(json.dumps(run(), indent=4))
+
+
+if __name__ == "__main__":
+    main()
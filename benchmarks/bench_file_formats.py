@@ -0,0 +1,64 @@
+"""
+Benchmark dos formatos de arquivo.
+
+Salva e carrega a mesma gravação sintética em `.json`, `.jsonl` e `.gmac`
+(binário mapeado na memória), medindo tempo e tamanho em disco. O carregamento
+do binário também é medido percorrendo todos os eventos, para não esconder o
+custo de acesso às colunas mapeadas.
+
+Uso:
+    python -m benchmarks.bench_file_formats
+"""
+import json
+import os
+import tempfile
+import time
+
+from src.managers.file_manager import save_events_to_path, load_events_from_path
+
+from .generators import generate
+
+FORMATS = ('.json', '.jsonl', '.gmac')
+
+
+def _timed(func, *args):
+    start = time.perf_counter()
+    result = func(*args)
+    return result, time.perf_counter() - start
+
+
+def _touch_all(store):
+    """Percorre todas as linhas (o que o player faz ao compilar o plano)."""
+    total = 0
+    for row in store.rows():
+        total += row[2]
+    return total
+
+
+def run(count=200_000, mix='moves'):
+    """Executa o benchmark e retorna os resultados como dicionário."""
+    store = generate(count, mix)
+    results = {'benchmark': 'file_formats', 'events': count, 'mix': mix}
+    with tempfile.TemporaryDirectory() as directory:
+        for extension in FORMATS:
+            path = os.path.join(directory, 'macro' + extension)
+            _, save_time = _timed(save_events_to_path, store, path)
+            loaded, load_time = _timed(load_events_from_path, path)
+            _, scan_time = _timed(_touch_all, loaded)
+            name = extension.lstrip('.')
+            results[f'{name}_bytes'] = os.path.getsize(path)
+            results[f'{name}_save_s'] = save_time
+            results[f'{name}_load_s'] = load_time
+            results[f'{name}_scan_s'] = scan_time
+            assert len(loaded) == count
+            del loaded
+    results['load_speedup_gmac_vs_json'] = results['json_load_s'] / results['gmac_load_s']
+    return results
+
+
+def main():
+    print(json.dumps(run(), indent=4))
+
+
+if __name__ == "__main__":
+    main()
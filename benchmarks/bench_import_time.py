@@ -0,0 +1,74 @@
+"""
+Benchmark do custo de importação na inicialização.
+
+Executa um processo novo com `python -X importtime` para cada cenário e lê do
+relatório o tempo acumulado de cada módulo:
+- `player`: importar o `MacroPlayer` (o que o app e a linha de comando pagam ao iniciar);
+- `cli`: importar a linha de comando;
+- `engine_<nome>`: o custo extra de escolher cada motor (a importação da biblioteca dele).
+
+Também informa quais bibliotecas de motor foram carregadas só por importar o
+player, que devem ser nenhuma.
+
+Uso:
+    python -m benchmarks.bench_import_time
+"""
+import json
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+ENGINE_LIBRARIES = ('pyautogui', 'pydirectinput')
+
+
+def import_times(code):
+    """
+    Executa `code` em um processo novo com `-X importtime`.
+
+    Returns:
+        dict: Tempo acumulado (em microssegundos) de cada módulo importado.
+    """
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', code],
+        cwd=ROOT, capture_output=True, text=True
+    )
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip().splitlines()[-1])
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        times[name.strip()] = int(cumulative)
+    return times
+
+
+def run(repeat=5):
+    """Executa o benchmark e retorna os resultados como dicionário (melhor de `repeat` execuções)."""
+    results = {'benchmark': 'import_time'}
+
+    player = [import_times('import src.core.player') for _ in range(repeat)]
+    results['player_import_us'] = min(t['src.core.player'] for t in player)
+    results['player_loads_engine_libraries'] = [name for name in ENGINE_LIBRARIES if name in player[0]]
+
+    cli = [import_times('import src.cli') for _ in range(repeat)]
+    results['cli_import_us'] = min(t['src.cli'] for t in cli)
+
+    for name in ENGINE_LIBRARIES:
+        code = f"from src.core.player import MacroPlayer; MacroPlayer().set_engine('{name}')"
+        try:
+            results[f'engine_{name}_import_us'] = min(import_times(code)[name] for _ in range(repeat))
+        except RuntimeError as e:
+            results[f'engine_{name}_import_us'] = None
+            results[f'engine_{name}_error'] = str(e)
+    return results
+
+
+def main():
+    print(json.dumps(run(), indent=4))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""
+Benchmark do modo de baixa variação.
+
+Reproduz a mesma macro sintética com o motor de simulação (`trace`, não injeta
+nada) sem e com o modo de baixa variação, e compara o atraso dos disparos. Uma
+thread de fundo cria objetos com referências cíclicas durante as duas
+reproduções, fazendo o papel do Tk e dos listeners: é ela que faz o coletor de
+lixo rodar (e pausar a thread da reprodução) no meio da macro.
+
+Uso:
+    python -m benchmarks.bench_low_jitter
+    python -m benchmarks.bench_low_jitter --cpu 2
+"""
+import argparse
+import json
+import threading
+
+from . import bench_playback
+
+
+def _churn(stop, live=2_000):
+    """Mantém `live` objetos cíclicos vivos, trocando-os sem parar (gera trabalho para o coletor)."""
+    objects = [None] * live
+    index = 0
+    while not stop.is_set():
+        node = {'index': index}
+        node['self'] = node # Referência cíclica: só o coletor cíclico libera
+        objects[index % live] = node
+        index += 1
+        if index % 1_000 == 0:
+            stop.wait(0.0005) # Cede a CPU de vez em quando, como uma thread de interface
+
+
+def _run(count, mix, duration, low_jitter, cpu, load):
+    stop = threading.Event()
+    churn = threading.Thread(target=_churn, args=(stop,), daemon=True) if load else None
+    if churn is not None:
+        churn.start()
+    try:
+        return bench_playback.run(count=count, mix=mix, duration=duration, low_jitter=low_jitter, cpu=cpu)
+    finally:
+        stop.set()
+        if churn is not None:
+            churn.join()
+
+
+def run(count=20_000, mix='mixed', duration=5.0, cpu=None, load=True):
+    """Executa o benchmark e retorna os resultados como dicionário."""
+    before = _run(count, mix, duration, False, None, load)
+    after = _run(count, mix, duration, True, cpu, load)
+    results = {'benchmark': 'low_jitter', 'events': count, 'mix': mix, 'load': load,
+               'applied': after['low_jitter']}
+    for key in ('p50_lateness_ms', 'p99_lateness_ms', 'max_lateness_ms', 'jitter_ms'):
+        results[f'{key}_before'] = before[key]
+        results[f'{key}_after'] = after[key]
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.bench_low_jitter", description="Compara o atraso da reprodução sem e com o modo de baixa variação.")
+    parser.add_argument('--count', type=int, default=20_000, help="quantidade de eventos")
+    parser.add_argument('--duration', type=float, default=5.0, help="duração aproximada de cada reprodução em segundos")
+    parser.add_argument('--cpu', type=int, default=None, help="CPU em que a thread da reprodução é fixada")
+    parser.add_argument('--no-load', action='store_true', help="sem a thread de fundo que gera lixo")
+    args = parser.parse_args(argv)
+    print(json.dumps(run(args.count, duration=args.duration, cpu=args.cpu, load=not args.no_load), indent=4))
+
+
+if __name__ == "__main__":
+    main()
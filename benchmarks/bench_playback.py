@@ -0,0 +1,77 @@
+"""
+Benchmark da precisão do agendamento na reprodução.
+
+Reproduz uma macro sintética com o motor de simulação (`trace`), que passa
+pelo mesmo caminho de agendamento dos motores reais sem injetar nada, e mede o
+atraso de cada disparo em relação ao horário previsto. A velocidade é ajustada
+para que a macro dure cerca de `duration` segundos (limitada à velocidade
+máxima do player); macros que não cabem nesse tempo são interrompidas depois
+do dobro dele.
+
+Uso:
+    python -m benchmarks.bench_playback
+"""
+import json
+import threading
+
+from src.core.event_store import NS_PER_SECOND
+from src.core.player import MacroPlayer, MAX_SPEED
+
+from .generators import generate
+
+
+def percentile(sorted_values, fraction):
+    """Valor no percentil `fraction` (0 a 1) de uma lista ordenada."""
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(int(fraction * len(sorted_values)), len(sorted_values) - 1)]
+
+
+def run(count=20_000, mix='mixed', duration=5.0, low_jitter=False, cpu=None):
+    """
+    Executa o benchmark e retorna os resultados como dicionário.
+
+    Com `low_jitter` a reprodução roda no modo de baixa variação (ver `runtime.LowJitter`).
+    """
+    store = generate(count, mix)
+    recorded = store.times[len(store) - 1] / NS_PER_SECOND
+    speed = min(max(recorded / duration, 1.0), MAX_SPEED)
+
+    player = MacroPlayer()
+    player.set_engine('trace')
+    player.set_timing(speed=speed)
+    player.set_low_jitter(low_jitter, cpu)
+    stop_signal = threading.Event()
+    timer = threading.Timer(duration * 2, stop_signal.set) # Margem para macros que atrasam
+    timer.start()
+    try:
+        player.play(store, stop_signal)
+    finally:
+        timer.cancel()
+
+    timeline = player.backend.timeline
+    lateness = sorted(a - i for i, a in zip(timeline.intended, timeline.actual))
+    stats = player.last_run_stats
+    summary = timeline.summary()
+    return {
+        'benchmark': 'playback',
+        'events': count,
+        'mix': mix,
+        'speed': speed,
+        'low_jitter': stats['low_jitter'],
+        'dispatched': stats['events'],
+        'events_per_s': stats['events'] / stats['elapsed'] if stats['elapsed'] else None,
+        'p50_lateness_ms': percentile(lateness, 0.5) * 1000,
+        'p99_lateness_ms': percentile(lateness, 0.99) * 1000,
+        'max_lateness_ms': summary['max_lateness'] * 1000,
+        'jitter_ms': summary['jitter'] * 1000,
+        'final_drift_ms': stats['drift'] * 1000,
+    }
+
+
+def main():
+    print(json.dumps(run(), indent=4))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""
+Benchmark da ingestão de eventos pelo MacroRecorder.
+
+Chama os callbacks dos listeners (`on_move`, `on_press`, `on_release`,
+`on_click`, `on_scroll`) direto, sem os listeners do pynput, na ordem de uma
+macro sintética. Mede o custo por evento na thread do listener (o que atrasa o
+hook do sistema) e o tempo total até a thread consumidora entregar tudo em
+`events`. Eventos descartados por estouro dos buffers também são informados.
+
+Uso:
+    python -m benchmarks.bench_recorder
+"""
+import json
+import time
+
+from src.core.event_store import TYPE_NAMES
+from src.core.recorder import MacroRecorder
+
+from .generators import generate
+
+
+def _callbacks(recorder, store):
+    """Converte a macro na sequência de chamadas aos callbacks do gravador."""
+    calls = []
+    append = calls.append
+    for _, type_code, x, y, code, flag, dx, dy in store.rows():
+        name = TYPE_NAMES[type_code]
+        if name == 'move':
+            append((recorder.on_move, (x, y)))
+        elif name == 'click':
+            append((recorder.on_click, (x, y, store.buttons[code], bool(flag))))
+        elif name == 'scroll':
+            append((recorder.on_scroll, (x, y, dx, dy)))
+        else:
+            key = store.keys[code]
+            if name != 'key_release':
+                append((recorder.on_press, (key,)))
+            if name != 'key_press':
+                append((recorder.on_release, (key,)))
+    return calls
+
+
+def run(count=100_000, mix='mixed'):
+    """Executa o benchmark e retorna os resultados como dicionário."""
+    recorder = MacroRecorder()
+    calls = _callbacks(recorder, generate(count, mix))
+
+    recorder.start(listen=False)
+    start = time.perf_counter()
+    for callback, args in calls:
+        callback(*args)
+    ingest = time.perf_counter() - start
+    recorder.stop()
+    total = time.perf_counter() - start
+
+    return {
+        'benchmark': 'recorder',
+        'events': count,
+        'mix': mix,
+        'callbacks': len(calls),
+        'callback_ns': ingest / len(calls) * 1e9 if calls else 0.0,
+        'callbacks_per_s': len(calls) / ingest if ingest else None,
+        'total_s': total,
+        'recorded': recorder.recorded_count,
+        'dropped': recorder.dropped_events,
+    }
+
+
+def main():
+    print(json.dumps(run(), indent=4))
+
+
+if __name__ == "__main__":
+    main()
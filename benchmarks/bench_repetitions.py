@@ -0,0 +1,62 @@
+"""
+Benchmark da cadência das repetições.
+
+Compara o laço antigo (uma chamada de `play` por repetição seguida de
+`time.sleep(pausa)`, com a base de tempo reiniciada a cada volta) com as
+repetições em uma única linha do tempo (`play(..., repetitions=N, delay=...)`).
+Mede quanto o fim da última repetição se afastou do horário previsto.
+
+Uso:
+    python -m benchmarks.bench_repetitions
+"""
+import json
+import threading
+import time
+
+from src.core.event_store import EventStore
+
+from .common import make_null_player
+
+
+def _make_macro(events=5, duration=0.01):
+    store = EventStore()
+    for i in range(events):
+        store.append_move(int(duration * i / (events - 1) * 1e9), i, i)
+    return store
+
+
+def _legacy(player, macro, repetitions, delay, stop):
+    for rep_num in range(repetitions):
+        player.play(macro, stop)
+        if rep_num < repetitions - 1:
+            time.sleep(delay)
+
+
+def run(repetitions=300, delay=0.005, engine_cost=0.0002):
+    """Executa o benchmark e retorna os resultados como dicionário."""
+    macro = _make_macro()
+    duration = macro.time_at(len(macro) - 1)
+    expected = repetitions * duration + (repetitions - 1) * delay
+    results = {'benchmark': 'repetitions', 'repetitions': repetitions, 'expected_s': expected}
+
+    player = make_null_player(engine_cost)
+    start = time.perf_counter()
+    _legacy(player, macro, repetitions, delay, threading.Event())
+    results['legacy_elapsed_s'] = time.perf_counter() - start
+    results['legacy_drift_ms'] = (results['legacy_elapsed_s'] - expected) * 1000
+
+    player = make_null_player(engine_cost)
+    start = time.perf_counter()
+    player.play(macro, threading.Event(), repetitions=repetitions, delay=delay)
+    results['timeline_elapsed_s'] = time.perf_counter() - start
+    results['timeline_drift_ms'] = (results['timeline_elapsed_s'] - expected) * 1000
+    results['timeline_max_lateness_ms'] = player.last_run_stats['max_lateness'] * 1000
+    return results
+
+
+def main():
+    print(json.dumps(run(), indent=4))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+"""
+Benchmark de deriva do agendador do MacroPlayer.
+
+Reproduz macros sintéticas de durações crescentes com controladores nulos
+(espera ativa de `engine_cost` segundos por chamada) e compara o modo relativo
+(antigo) com o agendamento absoluto. No modo absoluto a deriva final deve ficar
+estável independente da duração da macro.
+
+Uso:
+    python -m benchmarks.bench_scheduler
+"""
+import json
+import threading
+
+from .common import make_null_player
+
+
+def _make_events(duration, interval):
+    """Gera eventos de movimento igualmente espaçados."""
+    count = int(duration / interval)
+    return [{'time': i * interval, 'type': 'move', 'pos': (i % 500, i % 300)} for i in range(count)]
+
+
+def run(durations=(1.0, 5.0, 20.0), interval=0.005, engine_cost=0.0002):
+    """Executa o benchmark e retorna os resultados como dicionário."""
+    player = make_null_player(engine_cost)
+
+    results = []
+    for duration in durations:
+        events = _make_events(duration, interval)
+        for absolute in (False, True):
+            player.set_scheduler(absolute=absolute)
+            player.play(events, threading.Event())
+            stats = player.last_run_stats
+            results.append({
+                'mode': 'absoluto' if absolute else 'relativo',
+                'macro_duration_s': duration,
+                'events': stats['events'],
+                'drift_ms': stats['drift'] * 1000,
+                'mean_lateness_ms': stats['mean_lateness'] * 1000,
+                'max_lateness_ms': stats['max_lateness'] * 1000,
+            })
+    return {'benchmark': 'scheduler', 'interval_s': interval, 'engine_cost_s': engine_cost, 'results': results}
+
+
+def main():
+    print(json.dumps(run(), indent=4))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""
+Benchmark da reprodução em blocos direto do arquivo.
+
+Compara carregar o arquivo inteiro e reproduzir (`load_events_from_path` +
+`play`) com a reprodução em blocos (`play_stream` com leitura antecipada),
+medindo o tempo até o primeiro evento ser injetado e o pico de memória.
+Os eventos têm tempos praticamente nulos, então a reprodução corre o mais rápido
+possível e o que se mede é o custo de leitura e preparação.
+
+Como importa o player, precisa do pynput instalado.
+
+Uso:
+    python -m benchmarks.bench_streaming
+"""
+import json
+import os
+import tempfile
+import threading
+import time
+import tracemalloc
+
+from src.core.event_store import EventStore
+from src.managers.file_manager import save_events_to_path, load_events_from_path, iter_events_from_path
+
+from .common import make_null_player
+
+FORMATS = ('.jsonl', '.gmac')
+
+
+def _make_store(count):
+    store = EventStore()
+    for i in range(count):
+        store.append_move(i, i % 1920, i % 1080) # 1ns entre eventos
+    return store
+
+
+def _measure(play):
+    """Executa `play(player, stop)` medindo o tempo até o primeiro evento e o pico de memória."""
+    player = make_null_player()
+    tracemalloc.start()
+    start = time.perf_counter()
+    play(player, threading.Event())
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return player.last_run_stats['first_dispatch'] - start, elapsed, peak
+
+
+def run(count=200_000):
+    """Executa o benchmark e retorna os resultados como dicionário."""
+    results = {'benchmark': 'streaming', 'events': count}
+    with tempfile.TemporaryDirectory() as directory:
+        for extension in FORMATS:
+            path = os.path.join(directory, 'macro' + extension)
+            save_events_to_path(_make_store(count), path)
+            name = extension.lstrip('.')
+
+            first, elapsed, peak = _measure(
+                lambda player, stop: player.play(load_events_from_path(path), stop))
+            results[f'{name}_full_first_event_s'] = first
+            results[f'{name}_full_total_s'] = elapsed
+            results[f'{name}_full_peak_bytes'] = peak
+
+            first, elapsed, peak = _measure(
+                lambda player, stop: player.play_stream(lambda: iter_events_from_path(path), stop))
+            results[f'{name}_stream_first_event_s'] = first
+            results[f'{name}_stream_total_s'] = elapsed
+            results[f'{name}_stream_peak_bytes'] = peak
+    return results
+
+
+def main():
+    print(json.dumps(run(), indent=4))
+
+
+if __name__ == "__main__":
+    main()
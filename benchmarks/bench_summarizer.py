@@ -0,0 +1,118 @@
+"""
+Benchmark do agrupamento da lista de ações.
+
+Compara o agrupamento antigo do `ActionsDisplay.update` (formatava o texto de
+cada evento em toda comparação com o anterior e de novo ao inserir os filhos)
+com o `EventSummarizer`, que faz uma passada linear comparando assinaturas.
+O tempo por evento do resumo deve ficar constante do 10k ao 1M.
+
+Uso:
+    python -m benchmarks.bench_summarizer
+"""
+import json
+import time
+
+from src.core.event_store import EventStore, KEY_TAP
+from src.core.summarizer import EventSummarizer, LabelCache
+
+
+def _make_store(count):
+    """Rajadas de teclas repetidas, cliques e trajetórias do mouse."""
+    store = EventStore()
+    i = 0
+    while i < count:
+        block = i // 100 % 3
+        if block == 0:
+            store.append_key(i, KEY_TAP, "'a'" if i % 200 < 100 else 'space')
+        elif block == 1:
+            store.append_move(i, i % 1920, i % 1080)
+        else:
+            store.append_click(i, 10, 20, 'Button.left', i % 2 == 0)
+        i += 1
+    return store
+
+
+def _format_event(event):
+    """Formatação equivalente à do `ActionsDisplay._format_event`, sem depender do Tk."""
+    event_type = event.get('type')
+    if event_type == 'key_tap':
+        return "Apertar Tecla", f"Tecla: {event.get('key')}"
+    if event_type == 'click':
+        action = 'Pressionar' if event.get('pressed') else 'Soltar'
+        return f"{action} Mouse", f"Botão: {str(event.get('button')).split('.')[-1]} em {event.get('pos')}"
+    return "Evento", str(event)
+
+
+def _legacy_groups(events):
+    """Reprodução fiel do agrupamento antigo (comparação por texto formatado)."""
+    rows = 0
+    i = 0
+    while i < len(events):
+        event = events[i]
+        if i + 1 < len(events) and event.get('type') != 'move':
+            action_str, details_str = _format_event(event)
+            count = 1
+            j = i + 1
+            while j < len(events):
+                next_action_str, next_details_str = _format_event(events[j])
+                if events[j].get('type') != 'move' and action_str == next_action_str and details_str == next_details_str:
+                    count += 1
+                    j += 1
+                else:
+                    break
+            if count > 1:
+                for k in range(i, i + count):
+                    _format_event(events[k])
+                rows += count + 1
+                i += count
+                continue
+        if event.get('type') == 'move':
+            while i < len(events) and events[i].get('type') == 'move':
+                rows += 1
+                i += 1
+            rows += 1
+        else:
+            _format_event(event)
+            rows += 1
+            i += 1
+    return rows
+
+
+def _summarize(store):
+    summary = EventSummarizer().summarize(store)
+    labels = LabelCache(_format_event)
+    for index in range(len(summary)):
+        start, count, signature = summary.group(index)
+        labels.get(signature, store, start)
+    return summary
+
+
+def run(sizes=(10_000, 100_000, 1_000_000), legacy_max=100_000):
+    """Executa o benchmark e retorna os resultados como dicionário."""
+    results = {'benchmark': 'summarizer', 'sizes': {}}
+    for count in sizes:
+        store = _make_store(count)
+        start = time.perf_counter()
+        summary = _summarize(store)
+        elapsed = time.perf_counter() - start
+        stats = {
+            'groups': len(summary),
+            'summarizer_s': elapsed,
+            'summarizer_ns_per_event': elapsed / count * 1e9,
+        }
+        if count <= legacy_max:
+            events = list(store)
+            start = time.perf_counter()
+            _legacy_groups(events)
+            stats['legacy_s'] = time.perf_counter() - start
+            stats['speedup'] = stats['legacy_s'] / elapsed
+        results['sizes'][count] = stats
+    return results
+
+
+def main():
+    print(json.dumps(run(), indent=4))
+
+
+if __name__ == "__main__":
+    main()
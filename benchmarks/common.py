@@ -0,0 +1,61 @@
+"""
+Utilitários compartilhados pelos benchmarks.
+"""
+import time
+
+
+class NullKeyboardController:
+    """Controlador de teclado que não injeta nada, com custo opcional por chamada."""
+    def __init__(self, cost=0.0):
+        self.cost = cost
+        self.calls = 0
+
+    def _call(self, key):
+        self.calls += 1
+        if self.cost:
+            busy_wait(self.cost)
+
+    tap = press = release = _call
+
+
+class NullMouseController:
+    """Controlador de mouse que não injeta nada, com custo opcional por chamada."""
+    def __init__(self, cost=0.0):
+        self.cost = cost
+        self.calls = 0
+        self._position = (0, 0)
+
+    @property
+    def position(self):
+        return self._position
+
+    @position.setter
+    def position(self, pos):
+        self.calls += 1
+        self._position = pos
+        if self.cost:
+            busy_wait(self.cost)
+
+    def _call(self, *args):
+        self.calls += 1
+        if self.cost:
+            busy_wait(self.cost)
+
+    press = release = scroll = _call
+
+
+def busy_wait(seconds):
+    """Simula a latência de uma chamada do motor sem liberar a CPU."""
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        pass
+
+
+def make_null_player(cost=0.0):
+    """Cria um MacroPlayer com o motor Pynput apontando para controladores nulos."""
+    from src.core.player import MacroPlayer
+
+    player = MacroPlayer()
+    player.keyboard_controller = NullKeyboardController(cost)
+    player.mouse_controller = NullMouseController(cost)
+    return player
@@ -0,0 +1,77 @@
+"""
+Geradores de macros sintéticas para os benchmarks.
+
+Cada mistura define a proporção de cada tipo de evento:
+- `keyboard`: digitação (taps com alguns modificadores segurados), poucos movimentos;
+- `moves`: trajetórias do mouse densas, com cliques e rolagens ocasionais;
+- `mixed`: uso comum, mouse e teclado intercalados.
+
+Os eventos são gerados direto em um `EventStore` (sem dicionários), então
+macros de milhões de eventos cabem na memória e são criadas em segundos.
+"""
+import random
+
+from src.core.event_store import EventStore, KEY_TAP, KEY_PRESS, KEY_RELEASE
+
+# Proporções (teclado, movimento, clique, rolagem)
+MIXES = {
+    'keyboard': (0.80, 0.15, 0.04, 0.01),
+    'moves': (0.02, 0.93, 0.04, 0.01),
+    'mixed': (0.30, 0.60, 0.08, 0.02),
+}
+
+# Tamanhos usados pelo `run_all`
+SIZES = (10_000, 100_000, 1_000_000, 10_000_000)
+
+_CHARS = [f"'{c}'" for c in "abcdefghijklmnopqrstuvwxyz0123456789"] + ['space', 'enter', 'backspace']
+_MODIFIERS = ['shift', 'ctrl', 'alt']
+_BUTTONS = ['Button.left', 'Button.right']
+
+
+def generate(count, mix='mixed', seed=1, interval_ns=1_000_000):
+    """
+    Gera uma macro com `count` eventos.
+
+    Args:
+        count (int): Quantidade de eventos.
+        mix (str): Uma das chaves de `MIXES`.
+        seed (int): Semente do gerador aleatório, para resultados reproduzíveis.
+        interval_ns (int): Intervalo médio entre eventos em nanossegundos.
+
+    Returns:
+        EventStore: A macro gerada.
+    """
+    keys, moves, clicks, _ = MIXES[mix]
+    move_limit = keys + moves
+    click_limit = move_limit + clicks
+    rng = random.Random(seed)
+    rand = rng.random
+    store = EventStore()
+    append_key = store.append_key
+    append_move = store.append_move
+    x, y = 960, 540
+    t = 0
+    i = 0
+    while i < count:
+        t += int(interval_ns * (0.5 + rand()))
+        r = rand()
+        if r < keys:
+            if rand() < 0.05 and count - i >= 3:
+                # Modificador segurado em volta de uma tecla
+                modifier = rng.choice(_MODIFIERS)
+                append_key(t, KEY_PRESS, modifier)
+                append_key(t + interval_ns // 4, KEY_TAP, rng.choice(_CHARS))
+                append_key(t + interval_ns // 2, KEY_RELEASE, modifier)
+                i += 3
+                continue
+            append_key(t, KEY_TAP, rng.choice(_CHARS))
+        elif r < move_limit:
+            x = min(max(x + rng.randint(-8, 8), 0), 1919)
+            y = min(max(y + rng.randint(-8, 8), 0), 1079)
+            append_move(t, x, y)
+        elif r < click_limit:
+            store.append_click(t, x, y, rng.choice(_BUTTONS), rand() < 0.5)
+        else:
+            store.append_scroll(t, x, y, 0, rng.choice((-1, 1)))
+        i += 1
+    return store
@@ -0,0 +1,75 @@
+"""
+Executa a suíte de benchmarks em vários tamanhos e misturas de eventos.
+
+Cada benchmark da suíte recebe `count` e `mix` (ver `generators`). Os
+resultados vão para um único JSON com a versão do Python, a plataforma e a data,
+para comparar execuções:
+
+    python -m benchmarks.run_all --out resultados.json
+    python -m benchmarks.run_all --sizes 10000 1000000 --mixes keyboard moves
+    python -m benchmarks.run_all --suite playback --sizes 10000
+"""
+import argparse
+import importlib
+import json
+import platform
+import sys
+import time
+
+from .generators import MIXES, SIZES
+
+SUITE = ('recorder', 'file_formats', 'display', 'playback')
+
+DEFAULT_SIZES = SIZES[:2]
+
+
+def run(sizes=DEFAULT_SIZES, mixes=tuple(MIXES), suite=SUITE, log=None):
+    """
+    Executa cada benchmark da suíte para cada tamanho e mistura.
+
+    Args:
+        log (callable, opcional): Recebe uma linha de progresso antes de cada execução.
+
+    Returns:
+        dict: Metadados da execução e a lista de resultados.
+    """
+    results = []
+    for name in suite:
+        module = importlib.import_module(f"benchmarks.bench_{name}")
+        for count in sizes:
+            for mix in mixes:
+                if log:
+                    log(f"{name}: {count} eventos ({mix})")
+                start = time.perf_counter()
+                try:
+                    result = module.run(count=count, mix=mix)
+                except Exception as e:
+                    result = {'benchmark': name, 'events': count, 'mix': mix, 'error': repr(e)}
+                result['wall_s'] = time.perf_counter() - start
+                results.append(result)
+    return {
+        'python': sys.version.split()[0],
+        'platform': platform.platform(),
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'results': results,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.run_all", description="Executa a suíte de benchmarks.")
+    parser.add_argument('--sizes', type=int, nargs='+', default=list(DEFAULT_SIZES), help=f"quantidades de eventos (ex: {' '.join(map(str, SIZES))})")
+    parser.add_argument('--mixes', nargs='+', choices=sorted(MIXES), default=list(MIXES), help="misturas de eventos")
+    parser.add_argument('--suite', nargs='+', choices=SUITE, default=list(SUITE), help="benchmarks a executar")
+    parser.add_argument('--out', default=None, help="arquivo JSON de saída (padrão: imprime na tela)")
+    args = parser.parse_args(argv)
+
+    report = run(args.sizes, args.mixes, args.suite, log=lambda line: print(line, file=sys.stderr))
+    if args.out:
+        with open(args.out, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=4)
+    else:
+        print(json.dumps(report, indent=4))
+
+
+if __name__ == "__main__":
+    main()
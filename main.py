@@ -7,10 +7,9 @@ from src.managers import config_manager
 import logging 
 import sys
 import ctypes
-# Importações explícitas para ajudar o PyInstaller
+# Importação explícita para ajudar o PyInstaller. O PyAutoGUI e o PyDirectInput
+# são importados pelos seus motores (src/core/engines.py) só quando escolhidos
 from pynput import keyboard, mouse
-import pyautogui
-import pydirectinput
 import sv_ttk
 
 def main():
@@ -0,0 +1,8 @@
+"""
+Permite executar a linha de comando com `python -m src`.
+"""
+import sys
+
+from .cli import main
+
+sys.exit(main())
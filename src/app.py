@@ -1,3 +1,5 @@
+import logging
+import os
 import threading
 import time
 import tkinter as tk
@@ -5,11 +7,11 @@ from tkinter import messagebox, ttk
 
 from pynput.keyboard import Key, Listener
 
-from .managers import file_manager, config_manager
-from .ui.actions_display import ActionsDisplay
+from .managers import file_manager, config_manager, window_manager
+from .ui.actions_display import ActionsDisplay, LIVE_FRAME_MS
 from .managers.hotkey_manager import HotkeyManager
-from .core.player import MacroPlayer
-from .core.recorder import MacroRecorder
+from .core.player import MacroPlayer, MIN_SPEED, MAX_SPEED
+from .core.recorder import MacroRecorder, describe_event
 from .ui.settings_window import SettingsWindow
 from .utils import resource_path
 
@@ -27,7 +29,7 @@ class FullMacroApp:
         except tk.TclError:
             print("Aviso: O arquivo 'img/icon.ico' não foi encontrado ou não pôde ser carregado.")
 
-        self.original_geometry = "450x580"  
+        self.original_geometry = "450x660"  
         self.mini_geometry = "220x60"     
         self.root.geometry(self.original_geometry)
         self.root.protocol("WM_DELETE_WINDOW", self._on_closing)
@@ -36,8 +38,13 @@ class FullMacroApp:
         self.config = config # Usa a configuração pré carregada
 
         # Lógica 
-        self.recorder = MacroRecorder(record_mode=self.config.get("record_mode"))
+        self.recorder = MacroRecorder(
+            record_mode=self.config.get("record_mode"),
+            move_max_rate=self.config.get("move_max_rate", 0),
+            move_min_distance=self.config.get("move_min_distance", 0)
+        )
         self.player = MacroPlayer()
+        self._configure_player()
         self.hotkey_manager = HotkeyManager()
 
         # Estado
@@ -45,6 +52,9 @@ class FullMacroApp:
         self.playback_thread = None
         self.stop_playback_signal = threading.Event()
         self.recorded_events = []
+        self._playback_options = None # (repetições, pausa) lidos ao iniciar a reprodução
+        self._last_recorded_event = None # Último evento gravado, lido pelo status da gravação
+        self._record_status_job = None
         self.is_pinned = False
         self.is_mini_mode = False
 
@@ -133,8 +143,27 @@ class FullMacroApp:
         self.delay_entry.insert(0, "1.0")
         self.delay_entry.grid(row=1, column=1, sticky=tk.W)
 
+        # Velocidade e compressão das pausas
+        tk.Label(playback_frame, text="Velocidade (x):").grid(row=2, column=0, sticky=tk.W, pady=2)
+        self.speed_entry = tk.Entry(playback_frame, width=10)
+        self.speed_entry.insert(0, "1.0")
+        self.speed_entry.grid(row=2, column=1, sticky=tk.W)
+
+        tk.Label(playback_frame, text="Pausa máx. entre ações (s, 0 = sem limite):").grid(row=3, column=0, sticky=tk.W, pady=2)
+        self.max_idle_entry = tk.Entry(playback_frame, width=10)
+        self.max_idle_entry.insert(0, "0")
+        self.max_idle_entry.grid(row=3, column=1, sticky=tk.W)
+
+        # Modo o mais rápido possível, ignorando os tempos gravados
+        self.asap_var = tk.BooleanVar()
+        tk.Checkbutton(playback_frame, text="Máxima velocidade, intervalo mín. (ms):", variable=self.asap_var, command=self.toggle_asap_entry).grid(row=4, column=0, sticky=tk.W)
+        self.min_spacing_entry = tk.Entry(playback_frame, width=10)
+        self.min_spacing_entry.insert(0, "10")
+        self.min_spacing_entry.grid(row=4, column=1, sticky=tk.W)
+        self.toggle_asap_entry()
+
         self.play_btn = tk.Button(playback_frame, text="▶ Reproduzir", command=self.start_playback_countdown, state=tk.DISABLED, bg="#2196F3", fg="white")
-        self.play_btn.grid(row=2, column=0, columnspan=3, pady=10, sticky="ew")
+        self.play_btn.grid(row=5, column=0, columnspan=3, pady=10, sticky="ew")
 
         # Frame de Status
         status_frame = tk.Frame(parent, padx=10, pady=5)
@@ -200,14 +229,49 @@ class FullMacroApp:
         self.root.after(0, lambda: self.main_status_label.config(text=f"Status: {text}"))
         self.root.after(0, lambda: self.mini_status_label.config(text=text))
 
-    def display_action(self, action_text):
-        """Exibe uma ação na caixa de texto"""
-        self.root.after(0, lambda: self.actions_display_handler.add_action(action_text))
+    def on_recorded_batch(self, batch):
+        """
+        Chamado pela thread consumidora do gravador a cada lote de eventos.
+
+        Não pode chamar o Tk: o `stop` do gravador espera essa thread na thread da
+        interface, e com o Tcl em threads (padrão no Windows) um `after` vindo daqui
+        esperaria o mainloop, que estaria bloqueado. A interface busca o lote e o
+        status nos seus próprios timers.
+        """
+        self.actions_display_handler.append_events(batch) # Aplicado pela interface no próximo quadro
+        self._last_recorded_event = batch[len(batch) - 1]
+
+    def _schedule_record_status(self):
+        self._record_status_job = self.root.after(LIVE_FRAME_MS, self._refresh_record_status)
+
+    def _refresh_record_status(self):
+        """Timer da interface: mostra a última ação gravada enquanto a gravação durar"""
+        self._record_status_job = None
+        if not self.recorder.is_recording:
+            return
+        event = self._last_recorded_event
+        if event is not None:
+            self._last_recorded_event = None
+            self.display_action(event, self.recorder.recorded_count)
+        self._schedule_record_status()
+
+    def display_action(self, event, count):
+        """Exibe a última ação gravada no status (o texto só é montado para o que aparece)"""
+        action_text = describe_event(event)
+        self.main_status_label.config(text=f"Status: Gravando... {count} ações | {action_text}")
+        self.mini_status_label.config(text=f"Gravando... {count}")
 
     def toggle_reps_entry(self):
         """Ativa/desativa o campo de repetições com base no checkbox infinito"""
         self.reps_entry.config(state=tk.DISABLED if self.infinite_var.get() else tk.NORMAL)
 
+    def toggle_asap_entry(self):
+        """Ativa/desativa os campos de tempo com base no checkbox de máxima velocidade"""
+        asap = self.asap_var.get()
+        self.min_spacing_entry.config(state=tk.NORMAL if asap else tk.DISABLED)
+        self.speed_entry.config(state=tk.DISABLED if asap else tk.NORMAL)
+        self.max_idle_entry.config(state=tk.DISABLED if asap else tk.NORMAL)
+
     # Gravação 
 
     def start_recording_countdown(self):
@@ -228,20 +292,64 @@ class FullMacroApp:
 
     def start_actual_recording(self):
         """Inicia a gravação"""
-        self.recorder.start(on_action_callback=self.display_action)
+        stream_path = None
+        if self.config.get("stream_recording"):
+            # Grava direto em um arquivo novo, que sobrevive a uma queda do app
+            stream_dir = self.config.get("stream_directory") or "gravacoes"
+            try:
+                os.makedirs(stream_dir, exist_ok=True)
+                stream_path = os.path.join(stream_dir, time.strftime("gravacao_%Y%m%d_%H%M%S.jsonl"))
+            except OSError as e:
+                messagebox.showerror("Erro", f"Não foi possível criar a pasta de gravações: {e}")
+                self.record_btn.config(state=tk.NORMAL)
+                self.update_status("Pronto")
+                return
+
+        self.actions_display_handler.begin_live()
+        self._last_recorded_event = None
+        try:
+            self.recorder.start(on_batch_callback=self.on_recorded_batch, stream_path=stream_path)
+        except OSError as e:
+            # O arquivo da gravação direta não pôde ser criado
+            logging.error(f"Erro ao iniciar a gravação em '{stream_path}': {e}")
+            messagebox.showerror("Erro", f"Não foi possível criar o arquivo da gravação: {e}")
+            self.actions_display_handler.clear()
+            self.record_btn.config(state=tk.NORMAL)
+            self.update_status("Pronto")
+            return
         self.stop_record_btn.config(state=tk.NORMAL)
         self.update_status("Gravando...")
+        self._schedule_record_status()
 
     def stop_recording(self):
         """Para a gravação e atualiza a UI"""
         if self.recorder.is_recording:
+            if self._record_status_job is not None:
+                self.root.after_cancel(self._record_status_job)
+                self._record_status_job = None
             self.recorder.stop()
             self.recorded_events = self.recorder.events
+            stream_path = self.recorder.stream_path
+            if stream_path:
+                # Na gravação direta os eventos estão só no arquivo. Um arquivo grande fica
+                # lá e é lido em blocos na reprodução, como ao carregar
+                min_bytes = self._get_stream_playback_min_bytes()
+                try:
+                    if min_bytes and os.path.getsize(stream_path) >= min_bytes:
+                        self.recorded_events = file_manager.StreamedMacro(stream_path)
+                    else:
+                        self.recorded_events = file_manager.load_events_from_path(stream_path)
+                except OSError as e:
+                    messagebox.showerror("Erro", f"Não foi possível abrir a gravação: {e}")
             self.update_status("Gravação parada.")
             self.stop_record_btn.config(state=tk.DISABLED)
             self.record_btn.config(state=tk.NORMAL)
             self.play_btn.config(state=tk.NORMAL if self.recorded_events else tk.DISABLED)
-            self._update_actions_display() # Atualiza a tela com o que foi gravado
+            # Troca a lista ao vivo (só os grupos recentes) pela lista completa
+            if isinstance(self.recorded_events, file_manager.StreamedMacro):
+                self.actions_display_handler.show_streamed(stream_path) # Também encerra a lista ao vivo
+            else:
+                self.actions_display_handler.end_live(self.recorded_events)
 
     # Reprodução 
 
@@ -249,6 +357,12 @@ class FullMacroApp:
         """Inicia a contagem regressiva para a reproduzir"""
         if self.is_playing or not self.recorded_events:
             return
+
+        if not self._apply_timing_options():
+            return
+        self._playback_options = self._read_repetition_options()
+        if self._playback_options is None:
+            return
         
         self.record_btn.config(state=tk.DISABLED)
         # Atualiza ambos os botões de play
@@ -260,13 +374,33 @@ class FullMacroApp:
         
         self.root.after(2000, self.start_actual_playback)
     
+    def _apply_timing_options(self):
+        """Lê os campos de velocidade e pausa e aplica no player. Retorna False se algum for inválido."""
+        try:
+            speed = float(self.speed_entry.get())
+            max_idle = float(self.max_idle_entry.get())
+            min_spacing = float(self.min_spacing_entry.get()) / 1000
+        except ValueError:
+            messagebox.showerror("Erro", "Velocidade, pausa máxima ou intervalo mínimo inválido.")
+            return False
+        if not MIN_SPEED <= speed <= MAX_SPEED:
+            messagebox.showerror("Erro", f"A velocidade deve estar entre {MIN_SPEED}x e {MAX_SPEED:g}x.")
+            return False
+        self.player.set_timing(speed, max_idle, self.asap_var.get(), min_spacing)
+        return True
+
     def start_actual_playback(self):
         """Inicia a reprodução em uma nova thread."""
         self.is_playing = True
         self.update_status("Reproduzindo...")
         self.stop_playback_signal.clear() 
-        
-        self.playback_thread = threading.Thread(target=self._playback_loop, daemon=True)
+
+        repetitions, delay = self._playback_options
+        window_title = self.config.get("window_specific_title")
+        if window_title:
+            # Acompanha a janela ativa em segundo plano só enquanto a reprodução verifica a janela
+            window_manager.start_focus_tracking(self._get_focus_staleness())
+        self.playback_thread = threading.Thread(target=self._playback_loop, args=(repetitions, delay, window_title), daemon=True)
         self.playback_thread.start()
 
     def stop_playback(self):
@@ -275,64 +409,64 @@ class FullMacroApp:
             self.stop_playback_signal.set()
             self.update_status("Parando...")
 
-    def _playback_loop(self):
-        """O loop que executa em uma thread separada para não bloquear a GUI"""
+    def _read_repetition_options(self):
+        """Lê os campos de repetições e pausa. Retorna (repetições, pausa) ou None se algum for inválido."""
         try:
-            if self.infinite_var.get():
-                num_reps = float('inf')
-                loop_infinitely = True
-            else:
-                num_reps = int(self.reps_entry.get())
-                loop_infinitely = False
+            repetitions = None if self.infinite_var.get() else int(self.reps_entry.get())
+            delay = float(self.delay_entry.get())
         except ValueError:
-            self.root.after(0, lambda: messagebox.showerror("Erro", "Número de repetições inválido."))
-            self._playback_finished()
-            return
-            
-        rep_num = 0
-        while loop_infinitely or rep_num < num_reps:
-            if self.stop_playback_signal.is_set():
-                break
-            
-            rep_num += 1
-            self.root.after(0, lambda r=rep_num: self.rep_count_label.config(text=f"Repetição: {r}/{num_reps if not loop_infinitely else '∞'}"))
-
-            # Obtém o motor de reprodução da configuração
-            engine_map = {
-                "Pynput (Padrão)": "pynput",
-                "PyAutoGUI (Apps)": "pyautogui",
-                "PyDirectInput (Jogos)": "pydirectinput"
-            }
-            engine_name = self.config.get("playback_engine", "Pynput (Padrão)")
-            engine = engine_map.get(engine_name, "pynput")
-
-            # Obtém o título da janela especificada
-            window_title = self.config.get("window_specific_title")
-
-            self.player.play(self.recorded_events, self.stop_playback_signal, window_title)
-            
-            if self.stop_playback_signal.is_set():
-                break
+            messagebox.showerror("Erro", "Número de repetições ou pausa inválida.")
+            return None
+        return repetitions, max(delay, 0.0)
+
+    def _playback_loop(self, repetitions, delay, window_title):
+        """
+        Executa a reprodução em uma thread separada para não bloquear a GUI.
+
+        Tudo (repetições, pausa, janela) já foi lido na thread da interface; o player
+        roda todas as repetições em uma única linha do tempo.
+        """
+        total = repetitions if repetitions is not None else '∞'
+
+        def on_repetition(rep_num):
+            self.root.after(0, lambda: self.rep_count_label.config(text=f"Repetição: {rep_num}/{total}"))
+
+        if isinstance(self.recorded_events, file_manager.StreamedMacro):
+            # Arquivo grande: lido em blocos enquanto toca
+            try:
+                self.player.play_stream(
+                    self.recorded_events.chunks, self.stop_playback_signal, window_title,
+                    repetitions=repetitions, delay=delay, on_repetition=on_repetition
+                )
+            except Exception as e:
+                self.root.after(0, lambda e=e: messagebox.showerror("Erro", f"Não foi possível ler a macro do arquivo: {e}"))
+        else:
+            try:
+                self.player.play(
+                    self.recorded_events, self.stop_playback_signal, window_title,
+                    repetitions=repetitions, delay=delay, on_repetition=on_repetition
+                )
+            except Exception as e:
+                logging.error(f"Erro na reprodução: {e}")
+                self.root.after(0, lambda e=e: messagebox.showerror("Erro", f"Erro na reprodução: {e}"))
 
-            # Pausa 
-            if loop_infinitely or rep_num < num_reps:
-                try:
-                    delay = float(self.delay_entry.get())
-                    if delay > 0:
-                        time.sleep(delay)
-                except ValueError:
-                    pass  # Ignora se o delay for inválido
-        
         self.root.after(0, self._playback_finished)
     
     def _playback_finished(self):
         """Atualiza a UI quando a reprodução termina ou é interrompida"""
         self.is_playing = False
+        window_manager.stop_focus_tracking()
         status_text = "Reprodução Finalizada"
         if self.stop_playback_signal.is_set():
             status_text = "Reprodução Parada"
         elif self.player.was_skipped:
-            status_text = "Reprodução pulada (janela inativa)"
+            status_text = "Reprodução Finalizada (repetições puladas: janela inativa)"
+
+        timings = self.player.last_run_timings
+        if timings is not None and timings.events:
+            status_text = f"{status_text} | {timings.status_text()}"
+            if self.config.get("playback_timings_csv"):
+                self._export_playback_timings(timings)
 
         self.update_status(status_text)
         self.rep_count_label.config(text="")
@@ -343,6 +477,16 @@ class FullMacroApp:
         if not self.recorded_events:
             self.play_btn.config(state=tk.DISABLED)
             
+    def _export_playback_timings(self, timings):
+        """Salva os histogramas da última reprodução em um CSV na pasta de gravações"""
+        directory = self.config.get("stream_directory") or "gravacoes"
+        try:
+            os.makedirs(directory, exist_ok=True)
+            timings.save_csv(os.path.join(directory, time.strftime("tempos_%Y%m%d_%H%M%S.csv")))
+        except OSError as e:
+            logging.error(f"Erro ao exportar os tempos da reprodução: {e}")
+            messagebox.showerror("Erro", f"Não foi possível exportar os tempos da reprodução: {e}")
+
     # Configurações e atalhos 
 
     def open_settings(self):
@@ -362,16 +506,50 @@ class FullMacroApp:
         
         # Atualiza o modo de gravação no recorder
         self.recorder.set_record_mode(self.config.get("record_mode"))
+        self.recorder.set_move_capture(self.config.get("move_max_rate", 0), self.config.get("move_min_distance", 0))
 
         # Atualiza o motor de reprodução no player
-        self.player.set_engine(
-            self.config.get("playback_engine"),
-            pydirectinput_pause=self.config.get("pydirectinput_optimized_pause")
-        )
+        self._configure_player()
         
         # Atualiza os atalhos
         self._update_hotkey_listener()
 
+    def _get_focus_staleness(self):
+        """Lê da configuração a idade máxima do estado da janela ativa"""
+        try:
+            staleness = float(self.config.get("focus_max_staleness", window_manager.DEFAULT_MAX_STALENESS))
+        except (TypeError, ValueError):
+            return window_manager.DEFAULT_MAX_STALENESS
+        return staleness if staleness > 0 else window_manager.DEFAULT_MAX_STALENESS
+
+    def _configure_player(self):
+        """Aplica no player o motor e o modo de agendamento da configuração"""
+        engine = self.config.get("playback_engine", "Pynput (Padrão)")
+        try:
+            self.player.set_engine(
+                engine,
+                pydirectinput_pause=self.config.get("pydirectinput_optimized_pause", True)
+            )
+        except ImportError as e:
+            logging.error(f"Não foi possível carregar o motor de reprodução '{engine}': {e}")
+            messagebox.showerror("Erro", f"Não foi possível carregar o motor de reprodução '{engine}'.\nO motor {self.player.engine} continuará sendo usado.\nErro: {e}")
+        self.player.set_scheduler(absolute=self.config.get("absolute_scheduling", True))
+        self.player.set_instrumentation(self.config.get("playback_timings", False))
+        self.player.set_low_jitter(self.config.get("playback_low_jitter", False), self.config.get("playback_pin_cpu"))
+        try:
+            max_lag = float(self.config.get("catch_up_max_lag_ms", 0)) / 1000
+        except (TypeError, ValueError):
+            max_lag = 0.0
+        self.player.set_catch_up(self.config.get("catch_up_skip_moves", False), max_lag)
+        try:
+            self.player.set_move_rate(float(self.config.get("move_playback_rate", 0)))
+        except (TypeError, ValueError):
+            self.player.set_move_rate(0.0)
+        try:
+            self.player.set_batching(float(self.config.get("playback_batch_window_ms", 0)) / 1000)
+        except (TypeError, ValueError):
+            self.player.set_batching(0.0)
+
     def _update_hotkey_listener(self):
         """Reconstrói o mapa de atalhos e reinicia o listener global"""
         callbacks = {}
@@ -409,21 +587,33 @@ class FullMacroApp:
         if self.recorder.is_recording:
             self.stop_recording()
         self.hotkey_manager.stop_listener()
+        window_manager.stop_focus_tracking()
         self.root.destroy()
 
     def save_actions(self):
         """Salva as ações gravadas usando o file_manager"""
-        file_manager.save_events_to_file(self.recorded_events)
+        file_manager.save_events_to_file(self.recorded_events, self.config.get("save_compression", "none"))
 
     def load_actions(self):
         """Carrega ações de um arquivo e atualiza a UI"""
-        loaded_events = file_manager.load_events_from_file()
+        loaded_events = file_manager.load_events_from_file(self._get_stream_playback_min_bytes())
         if loaded_events is not None:
             self.recorded_events = loaded_events
             self._update_actions_display()
 
+    def _get_stream_playback_min_bytes(self):
+        """Tamanho de arquivo (em bytes) a partir do qual a macro é reproduzida em blocos direto do arquivo"""
+        try:
+            size_mb = float(self.config.get("stream_playback_min_mb", 64))
+        except (TypeError, ValueError):
+            return None
+        return int(size_mb * 1024 * 1024) if size_mb > 0 else None
+
     def _update_actions_display(self):
         """Atualiza a caixa de texto com os eventos atuais"""
-        self.actions_display_handler.update(self.recorded_events)
+        if isinstance(self.recorded_events, file_manager.StreamedMacro):
+            self.actions_display_handler.show_streamed(self.recorded_events.file_path)
+        else:
+            self.actions_display_handler.update(self.recorded_events)
         self.play_btn.config(state=tk.NORMAL if self.recorded_events else tk.DISABLED)
 
@@ -0,0 +1,334 @@
+"""
+Linha de comando (sem interface gráfica)
+
+Executa gravação, reprodução e conversão de macros sem importar tkinter nem os
+módulos de interface, para uso em scripts e tarefas agendadas:
+
+    python -m src record macro.json --duration 30
+    python -m src play macro.json --repeat 5 --delay 1 --speed 2
+    python -m src play macro.json --engine trace --trace-out timeline.csv
+    python -m src convert macro.json macro.gmac
+    python -m src inspect macro.gmac
+    python -m src bench file_formats
+
+Os módulos pesados (listeners, motores de reprodução) só são importados pelo
+subcomando que precisa deles.
+"""
+import time
+
+# Marcado antes das outras importações para medir o tempo até o primeiro evento
+STARTED_AT = time.perf_counter()
+
+import argparse
+import json
+import logging
+import os
+import sys
+import threading
+
+from .managers import file_manager
+
+RECORD_MODES = {
+    'both': "Teclado e Mouse",
+    'keyboard': "Somente Teclado",
+    'mouse': "Somente Mouse",
+}
+
+
+class CommandError(Exception):
+    """Erro de uso ou de arquivo, mostrado sem traceback."""
+
+
+def _countdown(seconds):
+    """Espera alguns segundos antes de começar, para dar tempo de focar a janela certa."""
+    for remaining in range(int(seconds), 0, -1):
+        print(f"Começando em {remaining}...", file=sys.stderr)
+        time.sleep(1)
+
+
+def _wait_interruptible(thread, stop_signal):
+    """Espera a thread terminar; Ctrl+C pede a parada em vez de matar o processo no meio de um evento."""
+    try:
+        while thread.is_alive():
+            thread.join(0.1)
+    except KeyboardInterrupt:
+        print("Parando...", file=sys.stderr)
+        stop_signal.set()
+        thread.join()
+
+
+def _wait_duration(duration):
+    """
+    Espera `duration` segundos (ou para sempre, se não houver duração) em fatias curtas.
+
+    Uma espera única sem limite não é interrompida pelo Ctrl+C no Windows; entre as
+    fatias o KeyboardInterrupt chega a quem chamou.
+    """
+    deadline = time.monotonic() + duration if duration else None
+    while True:
+        remaining = 0.1 if deadline is None else deadline - time.monotonic()
+        if remaining <= 0:
+            return
+        time.sleep(min(remaining, 0.1))
+
+
+# Subcomandos
+
+def cmd_record(args):
+    """Grava até `--duration` segundos ou até Ctrl+C."""
+    from .core.recorder import MacroRecorder
+
+    stream_path = None
+    if args.stream:
+        if not args.output.lower().endswith('.jsonl'):
+            raise CommandError("A gravação direta em arquivo (--stream) precisa de um arquivo .jsonl.")
+        if os.path.exists(args.output):
+            raise CommandError(f"O arquivo '{args.output}' já existe. A gravação direta em arquivo precisa de um arquivo novo.")
+        stream_path = args.output
+
+    recorder = MacroRecorder(
+        record_mode=RECORD_MODES[args.mode],
+        move_max_rate=args.move_rate,
+        move_min_distance=args.move_distance
+    )
+    _countdown(args.countdown)
+    try:
+        recorder.start(stream_path=stream_path)
+    except OSError as e:
+        raise CommandError(f"Não foi possível criar '{args.output}': {e}")
+    print("Gravando... (Ctrl+C para parar)", file=sys.stderr)
+    try:
+        _wait_duration(args.duration)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        recorder.stop()
+
+    if not stream_path:
+        file_manager.save_events_to_path(recorder.events, args.output)
+    print(f"{recorder.recorded_count} eventos gravados em '{args.output}'.", file=sys.stderr)
+    return 0
+
+
+def cmd_play(args):
+    """Reproduz um arquivo de macro."""
+    if not os.path.exists(args.file):
+        raise CommandError(f"Arquivo não encontrado: '{args.file}'.")
+
+    from .core import engines
+    from .core.player import MacroPlayer, MIN_SPEED, MAX_SPEED
+
+    if args.engine not in engines.engine_names():
+        raise CommandError(f"Motor desconhecido '{args.engine}'. Disponíveis: {', '.join(engines.engine_names())}.")
+    if args.trace_out and args.engine != engines.TraceEngine.name:
+        raise CommandError("--trace-out só pode ser usado com --engine trace.")
+
+    if args.pin_cpu is not None and args.pin_cpu < 0:
+        raise CommandError("--pin-cpu deve ser o número de uma CPU (0 ou mais).")
+
+    if not MIN_SPEED <= args.speed <= MAX_SPEED:
+        raise CommandError(f"A velocidade deve estar entre {MIN_SPEED}x e {MAX_SPEED:g}x.")
+
+    player = MacroPlayer()
+    try:
+        player.set_engine(args.engine, pydirectinput_pause=not args.slow_pause)
+    except ImportError as e:
+        raise CommandError(f"Não foi possível carregar o motor '{args.engine}': {e}")
+    player.set_scheduler(absolute=not args.relative)
+    player.set_timing(args.speed, args.max_idle, args.asap, args.min_spacing / 1000)
+    player.set_instrumentation(args.timings or bool(args.timings_csv))
+    player.set_catch_up(args.skip_stale_moves, args.max_lag / 1000)
+    player.set_move_rate(args.move_rate)
+    player.set_batching(args.batch_window / 1000)
+    player.set_low_jitter(args.low_jitter or args.pin_cpu is not None, args.pin_cpu)
+
+    stream = args.stream or os.path.getsize(args.file) >= args.stream_min_mb * 1024 * 1024
+    events = None if stream else file_manager.load_events_from_path(args.file)
+    repetitions = args.repeat or None # 0 = infinitas
+
+    _countdown(args.countdown)
+    stop_signal = threading.Event()
+    errors = []
+
+    def run():
+        try:
+            options = dict(repetitions=repetitions, delay=args.delay)
+            if stream:
+                player.play_stream(lambda: file_manager.iter_events_from_path(args.file), stop_signal, args.window, **options)
+            else:
+                player.play(events, stop_signal, args.window, **options)
+        except Exception as e:
+            errors.append(e)
+
+    thread = threading.Thread(target=run, daemon=True)
+    thread.start()
+    _wait_interruptible(thread, stop_signal)
+    if errors:
+        raise CommandError(f"Erro na reprodução: {errors[0]}")
+
+    stats = dict(player.last_run_stats or {})
+    first_dispatch = stats.pop('first_dispatch', None)
+    stats['first_event_latency'] = first_dispatch - STARTED_AT if first_dispatch is not None else None
+    if player.last_run_timings is not None:
+        stats['timings'] = player.last_run_timings.summary()
+        if args.timings_csv:
+            player.last_run_timings.save_csv(args.timings_csv)
+            print(f"Histogramas salvos em '{args.timings_csv}'.", file=sys.stderr)
+    if args.engine == engines.TraceEngine.name:
+        timeline = player.backend.timeline
+        stats['jitter'] = timeline.summary()['jitter']
+        if args.trace_out:
+            timeline.save(args.trace_out)
+            print(f"Linha do tempo salva em '{args.trace_out}'.", file=sys.stderr)
+    print(json.dumps(stats, indent=4))
+    if player.was_skipped:
+        print(f"Repetições puladas ou interrompidas: a janela '{args.window}' não estava ativa.", file=sys.stderr)
+        return 3
+    return 0
+
+
+def cmd_convert(args):
+    """Converte entre formatos (pela extensão): .json, .jsonl, .gmac, .gz, .xz."""
+    count = file_manager.convert_file(args.source, args.target)
+    print(f"{count} eventos convertidos para '{args.target}'.", file=sys.stderr)
+    return 0
+
+
+def cmd_inspect(args):
+    """Mostra um resumo do arquivo de macro."""
+    from .core.event_store import TYPE_NAMES, NS_PER_SECOND
+    from .core.summarizer import EventSummarizer
+
+    counts = {}
+    summary = EventSummarizer()
+    total = 0
+    groups = 0
+    last_signature = None
+    first_ns = last_ns = None
+    # Lido em blocos para funcionar com arquivos de qualquer tamanho
+    for chunk in file_manager.iter_events_from_path(args.file):
+        if not len(chunk):
+            continue
+        for type_code in chunk.types:
+            counts[TYPE_NAMES[type_code]] = counts.get(TYPE_NAMES[type_code], 0) + 1
+        if first_ns is None:
+            first_ns = chunk.times[0]
+        last_ns = chunk.times[len(chunk) - 1]
+        summary.summarize(chunk)
+        # Um grupo que atravessa a fronteira entre blocos conta uma vez só (os blocos
+        # compartilham as tabelas de teclas e botões, então as assinaturas são comparáveis)
+        groups += len(summary) - (summary.signatures[0] == last_signature)
+        last_signature = summary.signatures[-1]
+        total += len(chunk)
+
+    info = {
+        'file': args.file,
+        'bytes': os.path.getsize(args.file),
+        'events': total,
+        'duration': (last_ns - first_ns) / NS_PER_SECOND if total else 0.0,
+        'groups': groups,
+        'types': counts,
+    }
+    if args.json:
+        print(json.dumps(info, indent=4))
+    else:
+        print(f"Arquivo:  {info['file']} ({info['bytes']} bytes)")
+        print(f"Eventos:  {info['events']}")
+        print(f"Duração:  {info['duration']:.2f}s")
+        print(f"Grupos:   {info['groups']}")
+        for name, count in sorted(counts.items()):
+            print(f"  {name}: {count}")
+    return 0
+
+
+def cmd_bench(args):
+    """Executa benchmarks do pacote `benchmarks` (na raiz do repositório)."""
+    import importlib
+    import pkgutil
+
+    try:
+        import benchmarks
+    except ImportError:
+        raise CommandError("Pacote 'benchmarks' não encontrado; execute a partir da raiz do repositório.")
+
+    available = sorted(m.name[len('bench_'):] for m in pkgutil.iter_modules(benchmarks.__path__) if m.name.startswith('bench_'))
+    names = args.names or available
+    unknown = [name for name in names if name not in available]
+    if unknown:
+        raise CommandError(f"Benchmarks desconhecidos: {', '.join(unknown)}. Disponíveis: {', '.join(available)}.")
+
+    results = []
+    for name in names:
+        module = importlib.import_module(f"benchmarks.bench_{name}")
+        results.append(module.run())
+    print(json.dumps(results, indent=4))
+    return 0
+
+
+# Argumentos
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="python -m src", description="Grava e reproduz macros sem interface gráfica.")
+    parser.add_argument('-v', '--verbose', action='store_true', help="mostra os logs do gravador e do player")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    record = commands.add_parser('record', help="grava uma macro")
+    record.add_argument('output', help="arquivo de saída (.json, .jsonl, .gmac, .gz, .xz)")
+    record.add_argument('--duration', type=float, default=0, help="segundos de gravação (padrão: até Ctrl+C)")
+    record.add_argument('--mode', choices=sorted(RECORD_MODES), default='both', help="o que gravar")
+    record.add_argument('--move-rate', type=float, default=0, help="movimentos máx. por segundo (0 = sem limite)")
+    record.add_argument('--move-distance', type=float, default=0, help="distância mín. entre movimentos em px")
+    record.add_argument('--stream', action='store_true', help="grava direto no arquivo .jsonl durante a gravação")
+    record.add_argument('--countdown', type=float, default=0, help="segundos de espera antes de começar")
+    record.set_defaults(func=cmd_record)
+
+    play = commands.add_parser('play', help="reproduz uma macro")
+    play.add_argument('file', help="arquivo de macro")
+    play.add_argument('--engine', default='pynput', help="motor de reprodução: pynput, pyautogui, pydirectinput ou trace (simulação, não injeta nada)")
+    play.add_argument('--trace-out', default=None, help="com --engine trace, exporta a linha do tempo (.csv ou .json)")
+    play.add_argument('--repeat', type=int, default=1, help="repetições (0 = infinitas)")
+    play.add_argument('--delay', type=float, default=0.0, help="pausa entre repetições em segundos")
+    play.add_argument('--speed', type=float, default=1.0, help="multiplicador de velocidade")
+    play.add_argument('--max-idle', type=float, default=0.0, help="maior pausa entre ações em segundos (0 = sem limite)")
+    play.add_argument('--asap', action='store_true', help="ignora os tempos gravados e reproduz o mais rápido possível")
+    play.add_argument('--min-spacing', type=float, default=0.0, help="com --asap, intervalo mínimo entre ações em ms")
+    play.add_argument('--move-rate', type=float, default=0.0, help="reamostra os movimentos do mouse para no máximo N por segundo (0 = todos)")
+    play.add_argument('--batch-window', type=float, default=0.0, help="dispara juntos os eventos a até N ms do primeiro de um lote (0 = um por vez)")
+    play.add_argument('--skip-stale-moves', action='store_true', help="pula movimentos do mouse atrasados (teclas e cliques nunca)")
+    play.add_argument('--max-lag', type=float, default=0.0, help="maior atraso acumulado em ms; além dele a reprodução segue sem compensar (0 = sem limite)")
+    play.add_argument('--window', default=None, help="só reproduz com esta janela ativa (título ou parte dele)")
+    play.add_argument('--relative', action='store_true', help="usa o agendamento relativo antigo")
+    play.add_argument('--low-jitter', action='store_true', help="pausa o coletor de lixo e aumenta a prioridade da thread durante a reprodução")
+    play.add_argument('--pin-cpu', type=int, default=None, help="fixa a thread da reprodução nesta CPU (implica --low-jitter)")
+    play.add_argument('--timings', action='store_true', help="mede atraso, chamadas ao motor e verificações da janela (histogramas)")
+    play.add_argument('--timings-csv', default=None, help="exporta os histogramas de --timings para um CSV")
+    play.add_argument('--slow-pause', action='store_true', help="PyDirectInput com a pausa padrão de 0.1s")
+    play.add_argument('--stream', action='store_true', help="lê o arquivo em blocos durante a reprodução")
+    play.add_argument('--stream-min-mb', type=float, default=64, help="tamanho a partir do qual lê em blocos automaticamente")
+    play.add_argument('--countdown', type=float, default=0, help="segundos de espera antes de começar")
+    play.set_defaults(func=cmd_play)
+
+    convert = commands.add_parser('convert', help="converte uma macro para outro formato")
+    convert.add_argument('source')
+    convert.add_argument('target')
+    convert.set_defaults(func=cmd_convert)
+
+    inspect = commands.add_parser('inspect', help="mostra um resumo de uma macro")
+    inspect.add_argument('file')
+    inspect.add_argument('--json', action='store_true', help="saída em JSON")
+    inspect.set_defaults(func=cmd_inspect)
+
+    bench = commands.add_parser('bench', help="executa benchmarks")
+    bench.add_argument('names', nargs='*', help="benchmarks a executar (padrão: todos)")
+    bench.set_defaults(func=cmd_bench)
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    logging.basicConfig(level=logging.INFO if args.verbose else logging.WARNING, format="%(levelname)s: %(message)s")
+    try:
+        return args.func(args)
+    except (CommandError, OSError, ValueError) as e:
+        print(f"Erro: {e}", file=sys.stderr)
+        return 1
@@ -0,0 +1,403 @@
+"""
+Motores de reprodução
+
+Cada motor implementa a mesma interface pequena usada pelo `MacroPlayer`:
+- `bind(store)`: retorna os preparadores de cada tipo de evento, que convertem
+  uma linha do `EventStore` em `(função, argumentos)` para o plano compilado;
+- `begin_run()` / `end_run()`: ajustes globais da biblioteca durante uma
+  reprodução (ex: a pausa do PyDirectInput), desfeitos ao final;
+- `flush()`: chamado ao fim de cada lote de eventos disparados juntos (ver
+  `MacroPlayer.set_batching`); o motor faz aqui, uma vez por lote, o que seria
+  feito depois de cada evento (ex: a pausa do PyDirectInput);
+- `observe`: opcional, chamado pelo player antes de cada disparo com o horário
+  previsto e o atraso (usado pelo motor de simulação).
+
+Os motores ficam registrados pelo nome interno ('pynput', 'pyautogui',
+'pydirectinput', 'trace') e pelo rótulo exibido na interface. A biblioteca de
+cada motor só é importada quando ele é criado, então quem usa o Pynput não paga
+a importação (nem as alterações globais) do PyAutoGUI e do PyDirectInput, e o
+motor de simulação funciona sem display.
+"""
+import logging
+import time
+
+from .event_store import TYPE_NAMES, KEY_TAP, KEY_PRESS, KEY_RELEASE, MOVE, CLICK, SCROLL
+
+DEFAULT_ENGINE = "pynput"
+
+_ENGINES = {}
+
+
+def register(engine_class):
+    """Registra uma classe de motor pelo seu `name`."""
+    _ENGINES[engine_class.name] = engine_class
+    return engine_class
+
+
+def engine_names():
+    """Nomes internos dos motores registrados."""
+    return list(_ENGINES)
+
+
+def engine_labels():
+    """Rótulos exibidos na interface, na ordem de registro."""
+    return [engine_class.label for engine_class in _ENGINES.values() if engine_class.listed]
+
+
+def resolve(name_or_label):
+    """
+    Retorna o nome interno do motor a partir do nome ou do rótulo exibido.
+
+    Nomes desconhecidos (ex: configuração antiga ou editada à mão) caem no motor padrão.
+    """
+    if name_or_label in _ENGINES:
+        return name_or_label
+    for engine_class in _ENGINES.values():
+        if engine_class.label == name_or_label:
+            return engine_class.name
+    logging.warning(f"Motor de reprodução desconhecido '{name_or_label}', usando '{DEFAULT_ENGINE}'.")
+    return DEFAULT_ENGINE
+
+
+def create(name, player):
+    """
+    Cria o motor `name` para o `player`, importando a biblioteca dele se preciso.
+
+    Raises:
+        ImportError: Se a biblioteca do motor não estiver disponível.
+    """
+    return _ENGINES[resolve(name)](player)
+
+
+# Resolução de teclas e botões
+
+def button_name(button):
+    """Retorna o nome do botão ('left', 'right'...) a partir do objeto ou da string salva."""
+    return str(button).split('.')[-1]
+
+
+def decode_button(button):
+    """Converte o botão salvo (objeto ou string 'Button.left') para um Button do pynput."""
+    from pynput import mouse
+
+    if isinstance(button, str):
+        return getattr(mouse.Button, button_name(button), None)
+    return button
+
+
+def decode_key(key):
+    """
+    Converte uma tecla carregada de arquivo de volta para um objeto do pynput.
+
+    Os arquivos salvam teclas especiais pelo nome ('space') e caracteres pela sua
+    representação ("'a'"). Objetos de tecla já decodificados são devolvidos como estão.
+    """
+    from pynput import keyboard
+
+    if not isinstance(key, str):
+        return key
+    if len(key) == 1:
+        return key
+    if len(key) == 3 and key[0] == key[-1] and key[0] in "'\"":
+        return key[1]
+    key_name = key[4:] if key.startswith('Key.') else key
+    return getattr(keyboard.Key, key_name, key)
+
+
+def key_string(key):
+    """Converte um objeto de tecla pynput para uma string que pydirectinput compreende"""
+    # Tenta obter o caractere da tecla se for uma tecla normal
+    if hasattr(key, 'char') and key.char:
+        return key.char
+
+    # Para teclas especiais pega o nome
+    if hasattr(key, 'name'):
+        return key.name
+
+    # Caso fallback converte para string
+    return str(key)
+
+
+def key_label(key):
+    """Nome legível da tecla ('a', 'space'), a partir do objeto ou da string salva, sem usar o pynput."""
+    if not isinstance(key, str):
+        return key_string(key)
+    if len(key) == 3 and key[0] == key[-1] and key[0] in "'\"":
+        return key[1]
+    return key[4:] if key.startswith('Key.') else key
+
+
+def make_resolver(table, decode):
+    """Cria uma função que decodifica cada id da tabela uma única vez."""
+    cache = {}
+
+    def resolve_code(code):
+        try:
+            return cache[code]
+        except KeyError:
+            value = cache[code] = decode(table[code])
+            return value
+    return resolve_code
+
+
+# Motores
+
+class Engine:
+    """Interface comum dos motores de reprodução."""
+    name = None
+    label = None
+    listed = True # Aparece na lista de motores da interface
+    observe = None
+
+    def __init__(self, player):
+        self.player = player
+
+    def bind(self, store):
+        """
+        Retorna os preparadores de cada tipo de evento, indexados pelo código do tipo.
+
+        Cada preparador recebe `(x, y, code, flag, dx, dy)` de uma linha do `store` e
+        devolve `(função, argumentos)`. Teclas e botões são resolvidos uma vez por id.
+        """
+        raise NotImplementedError
+
+    def begin_run(self):
+        """Chamado antes de uma reprodução."""
+
+    def end_run(self):
+        """Chamado ao fim de uma reprodução, mesmo se ela for interrompida."""
+
+    def flush(self):
+        """Chamado ao fim de cada lote de eventos."""
+
+
+@register
+class PynputEngine(Engine):
+    """Teclado e mouse pelos controladores do pynput."""
+    name = "pynput"
+    label = "Pynput (Padrão)"
+
+    def __init__(self, player):
+        super().__init__(player)
+        self._position = None # Posição do cursor definida no lote atual
+
+    def bind(self, store):
+        binders = [None] * len(TYPE_NAMES)
+        self.mouse = self.player.mouse_controller
+        keyboard_controller = self.player.keyboard_controller
+        key_for = make_resolver(store.keys, decode_key)
+        move = self._move
+        scroll = self._scroll
+        binders[KEY_TAP] = lambda x, y, code, flag, dx, dy: (keyboard_controller.tap, (key_for(code),))
+        binders[KEY_PRESS] = lambda x, y, code, flag, dx, dy: (keyboard_controller.press, (key_for(code),))
+        binders[KEY_RELEASE] = lambda x, y, code, flag, dx, dy: (keyboard_controller.release, (key_for(code),))
+        binders[MOVE] = lambda x, y, code, flag, dx, dy: (move, ((x, y),))
+        binders[SCROLL] = lambda x, y, code, flag, dx, dy: (scroll, ((x, y), dx, dy))
+        binders[CLICK] = self._bind_click(store)
+        return binders
+
+    def _bind_click(self, store):
+        mouse_controller = self.mouse
+        button_for = make_resolver(store.buttons, decode_button)
+        click = self._click
+
+        def bind_click(x, y, code, flag, dx, dy):
+            button = button_for(code)
+            if button is None:
+                raise ValueError(f"Botão desconhecido: {store.buttons[code]}")
+            action = mouse_controller.press if flag else mouse_controller.release
+            return click, ((x, y), action, button)
+        return bind_click
+
+    def _move(self, pos):
+        self.mouse.position = pos
+        self._position = pos
+
+    def _click(self, pos, action, button):
+        # O cursor já foi para `pos` no mesmo lote: dispensa o reposicionamento e a espera
+        if self._position != pos:
+            self.mouse.position = pos
+            time.sleep(0.01)
+            self.mouse.position = pos
+            self._position = pos
+        action(button)
+
+    def _scroll(self, pos, dx, dy):
+        self.mouse.position = pos
+        self._position = pos
+        self.mouse.scroll(dx, dy)
+
+    def begin_run(self):
+        self._position = None
+
+    def flush(self):
+        self._position = None
+
+
+@register
+class PyAutoGUIEngine(PynputEngine):
+    """Cliques pelo PyAutoGUI; teclado, movimento e rolagem pelo pynput."""
+    name = "pyautogui"
+    label = "PyAutoGUI (Apps)"
+
+    def __init__(self, player):
+        super().__init__(player)
+        import pyautogui
+        self.pyautogui = pyautogui
+        self._pending_pause = False
+
+    def _bind_click(self, store):
+        button_for = make_resolver(store.buttons, button_name)
+        mouse_down = self.pyautogui.mouseDown
+        mouse_up = self.pyautogui.mouseUp
+        click = self._click
+
+        def bind_click(x, y, code, flag, dx, dy):
+            return click, (x, y, mouse_down if flag else mouse_up, button_for(code))
+        return bind_click
+
+    def _click(self, x, y, action, button_str):
+        # A pausa da biblioteca fica para o fim do lote (`flush`)
+        action(x, y, button_str, _pause=False)
+        self._pending_pause = True
+
+    def flush(self):
+        super().flush()
+        if self._pending_pause:
+            self._pending_pause = False
+            time.sleep(self.pyautogui.PAUSE)
+
+    def begin_run(self):
+        super().begin_run()
+        self._pending_pause = False
+
+
+@register
+class PyDirectInputEngine(PynputEngine):
+    """Teclado, movimento e cliques pelo PyDirectInput (jogos com DirectInput); rolagem pelo pynput."""
+    name = "pydirectinput"
+    label = "PyDirectInput (Jogos)"
+
+    # Pausa entre os comandos do PyDirectInput (a da biblioteca é 0.1s)
+    OPTIMIZED_PAUSE = 0.01
+    DEFAULT_PAUSE = 0.1
+
+    def __init__(self, player):
+        super().__init__(player)
+        import pydirectinput
+        # failsafe é ativado quando o mouse é movido para o canto da tela
+        pydirectinput.FAILSAFE = False
+        self.pydirectinput = pydirectinput
+        self._original_pause = None
+        self._pending_pause = False
+
+    def bind(self, store):
+        binders = super().bind(store)
+        key_for = make_resolver(store.keys, lambda k: key_string(decode_key(k)))
+        press = self._unpaused(self.pydirectinput.press)
+        key_down = self._unpaused(self.pydirectinput.keyDown)
+        key_up = self._unpaused(self.pydirectinput.keyUp)
+        move_to = self._move_to
+        binders[KEY_TAP] = lambda x, y, code, flag, dx, dy: (press, (key_for(code),))
+        binders[KEY_PRESS] = lambda x, y, code, flag, dx, dy: (key_down, (key_for(code),))
+        binders[KEY_RELEASE] = lambda x, y, code, flag, dx, dy: (key_up, (key_for(code),))
+        binders[MOVE] = lambda x, y, code, flag, dx, dy: (move_to, (x, y))
+        return binders
+
+    def _unpaused(self, func):
+        """Envolve uma função do PyDirectInput para deixar a pausa da biblioteca para o fim do lote."""
+        def call(*args):
+            func(*args, _pause=False)
+            self._pending_pause = True
+        call.__name__ = func.__name__
+        return call
+
+    def _move_to(self, x, y):
+        self.pydirectinput.moveTo(x, y, _pause=False) # Movimento instantâneo
+        self._position = (x, y)
+        self._pending_pause = True
+
+    def _bind_click(self, store):
+        button_for = make_resolver(store.buttons, button_name)
+        mouse_down = self.pydirectinput.mouseDown
+        mouse_up = self.pydirectinput.mouseUp
+        click = self._click
+
+        def bind_click(x, y, code, flag, dx, dy):
+            return click, (x, y, mouse_down if flag else mouse_up, button_for(code))
+        return bind_click
+
+    def _click(self, x, y, action, button_str):
+        # Fora de um lote que já moveu o cursor, o movimento mantém a pausa antes do clique
+        if self._position != (x, y):
+            self.pydirectinput.moveTo(x, y) # Movimento instantâneo
+            self._position = (x, y)
+        action(button=button_str, _pause=False)
+        self._pending_pause = True
+
+    def flush(self):
+        super().flush()
+        if self._pending_pause:
+            self._pending_pause = False
+            time.sleep(self.pydirectinput.PAUSE)
+
+    def begin_run(self):
+        super().begin_run()
+        self._pending_pause = False
+        self._original_pause = self.pydirectinput.PAUSE
+        self.pydirectinput.PAUSE = self.OPTIMIZED_PAUSE if self.player.use_optimized_pause else self.DEFAULT_PAUSE
+
+    def end_run(self):
+        # Garante que a pausa seja restaurada ao valor original
+        if self._original_pause is not None:
+            self.pydirectinput.PAUSE = self._original_pause
+            self._original_pause = None
+
+
+@register
+class TraceEngine(Engine):
+    """
+    Motor de simulação: não injeta nada e registra, para cada evento, o horário
+    previsto e o horário real do disparo em uma `Timeline`.
+
+    Os eventos passam pelo mesmo caminho de agendamento dos outros motores, então
+    serve para validar macros e medir a precisão do agendador sem mexer no mouse
+    e no teclado, inclusive em máquinas sem display.
+    """
+    name = "trace"
+    label = "Simulação (Trace)"
+    listed = False
+
+    def __init__(self, player):
+        super().__init__(player)
+        from .trace import Timeline
+        self.timeline = Timeline()
+        self._intended = 0.0
+        self._actual = 0.0
+
+    def bind(self, store):
+        binders = [None] * len(TYPE_NAMES)
+        record = self._record
+        key_for = make_resolver(store.keys, key_label)
+        button_for = make_resolver(store.buttons, button_name)
+
+        def bind_key(type_code):
+            return lambda x, y, code, flag, dx, dy: (record, (type_code, x, y, key_for(code)))
+        for type_code in (KEY_TAP, KEY_PRESS, KEY_RELEASE):
+            binders[type_code] = bind_key(type_code)
+        binders[MOVE] = lambda x, y, code, flag, dx, dy: (record, (MOVE, x, y, ""))
+        binders[CLICK] = lambda x, y, code, flag, dx, dy: (
+            record, (CLICK, x, y, f"{button_for(code)} {'down' if flag else 'up'}"))
+        binders[SCROLL] = lambda x, y, code, flag, dx, dy: (record, (SCROLL, x, y, f"{dx},{dy}"))
+        return binders
+
+    def begin_run(self):
+        self.timeline.clear()
+
+    def observe(self, intended, lateness):
+        """Guarda os horários do disparo que vem a seguir."""
+        self._intended = intended
+        self._actual = intended + lateness
+
+    def _record(self, type_code, x, y, detail):
+        self.timeline.append(self._intended, self._actual, type_code, x, y, detail)
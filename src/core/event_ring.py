@@ -0,0 +1,106 @@
+"""
+Buffer circular de eventos para a gravação
+
+Os callbacks dos listeners do pynput rodam na thread do hook do sistema, então
+precisam ser o mais curtos possível. Cada listener escreve os eventos crus em
+um `EventRing` próprio (um produtor), pré-alocado em colunas como o `EventStore`,
+e uma thread consumidora esvazia o buffer em lotes.
+
+Como há exatamente um produtor e um consumidor, não é preciso lock: o produtor
+só avança `_head` depois de escrever a linha inteira e o consumidor só avança
+`_tail` depois de copiá-la.
+
+Política de estouro: se o buffer estiver cheio, o evento novo é descartado e
+contado em `dropped` (a thread do hook nunca espera pelo consumidor).
+"""
+from array import array
+
+from .event_store import COLUMNS
+
+# Capacidade padrão (potência de 2): ~8s de folga com um mouse de 8000 Hz
+DEFAULT_CAPACITY = 1 << 16
+
+
+class EventRing:
+    """Buffer circular limitado de eventos, com um produtor e um consumidor."""
+    def __init__(self, capacity=DEFAULT_CAPACITY):
+        if capacity <= 0 or capacity & (capacity - 1):
+            raise ValueError("A capacidade do buffer deve ser uma potência de 2.")
+        self.capacity = capacity
+        self._mask = capacity - 1
+        for name, typecode in COLUMNS:
+            setattr(self, name, array(typecode, [0]) * capacity)
+        self._head = 0 # Total de eventos escritos (só o produtor altera)
+        self._tail = 0 # Total de eventos lidos (só o consumidor altera)
+
+        # Contadores
+        self.dropped = 0 # Eventos descartados por falta de espaço
+        self.high_water = 0 # Maior ocupação vista pelo consumidor
+
+    @property
+    def written(self):
+        """Total de eventos aceitos pelo buffer."""
+        return self._head
+
+    def __len__(self):
+        return self._head - self._tail
+
+    def push(self, time_ns, type_code, x=0, y=0, code=0, flag=0, dx=0, dy=0):
+        """
+        Escreve um evento (chamado pelo produtor).
+
+        Returns:
+            bool: False se o buffer estava cheio e o evento foi descartado.
+        """
+        head = self._head
+        if head - self._tail >= self.capacity:
+            self.dropped += 1
+            return False
+        i = head & self._mask
+        self.times[i] = time_ns
+        self.types[i] = type_code
+        self.xs[i] = x
+        self.ys[i] = y
+        self.codes[i] = code
+        self.flags[i] = flag
+        self.dxs[i] = dx
+        self.dys[i] = dy
+        # Publica a linha só depois de escrita por completo
+        self._head = head + 1
+        return True
+
+    def drain_rows(self):
+        """
+        Retira todos os eventos disponíveis (chamado pelo consumidor).
+
+        Returns:
+            list: Linhas (tempo_ns, tipo, x, y, id, flag, dx, dy) na ordem em que foram escritas.
+        """
+        tail = self._tail
+        count = self._head - tail
+        if count <= 0:
+            return []
+        if count > self.high_water:
+            self.high_water = count
+
+        start = tail & self._mask
+        end = start + count
+        columns = []
+        for name, _ in COLUMNS:
+            source = getattr(self, name)
+            if end <= self.capacity:
+                columns.append(source[start:end])
+            else:
+                # A faixa dá a volta no fim do buffer
+                columns.append(source[start:] + source[:end - self.capacity])
+        self._tail = tail + count
+        return list(zip(*columns))
+
+    def stats(self):
+        """Contadores do buffer."""
+        return {
+            'capacity': self.capacity,
+            'written': self.written,
+            'dropped': self.dropped,
+            'high_water': self.high_water,
+        }
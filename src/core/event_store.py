@@ -0,0 +1,256 @@
+"""
+Armazenamento compacto dos eventos gravados
+
+Em vez de um dicionário por evento, os eventos ficam em colunas de `array`
+(struct-of-arrays): tempo em nanossegundos, código do tipo, posição x/y e ids
+pequenos para teclas e botões, que apontam para tabelas de objetos únicos.
+Um evento ocupa algumas dezenas de bytes em vez de centenas.
+
+Os consumidores antigos continuam funcionando: iterar ou indexar o `EventStore`
+devolve dicionários no formato original ({'time': ..., 'type': ..., ...}).
+"""
+from array import array
+
+# Códigos dos tipos de evento
+KEY_TAP = 1
+KEY_PRESS = 2
+KEY_RELEASE = 3
+MOVE = 4
+CLICK = 5
+SCROLL = 6
+
+TYPE_NAMES = (None, 'key_tap', 'key_press', 'key_release', 'move', 'click', 'scroll')
+TYPE_CODES = {name: code for code, name in enumerate(TYPE_NAMES) if name}
+
+KEY_TYPES = (KEY_TAP, KEY_PRESS, KEY_RELEASE)
+
+NS_PER_SECOND = 1_000_000_000
+
+# Colunas e seus typecodes: tempo, tipo, x, y, id de tecla/botão, pressionado, rolagem x/y
+COLUMNS = (
+    ('times', 'q'),
+    ('types', 'B'),
+    ('xs', 'i'),
+    ('ys', 'i'),
+    ('codes', 'H'),
+    ('flags', 'b'),
+    ('dxs', 'h'),
+    ('dys', 'h'),
+)
+
+
+def seconds_to_ns(seconds):
+    """Converte segundos (float) para nanossegundos inteiros."""
+    return round(seconds * NS_PER_SECOND)
+
+
+class EventStore:
+    """
+    Lista de eventos em colunas.
+
+    Suporta `len`, iteração, indexação (um dicionário por evento) e fatiamento
+    (um novo `EventStore` que compartilha as tabelas de teclas e botões).
+    """
+    def __init__(self):
+        for name, typecode in COLUMNS:
+            setattr(self, name, array(typecode))
+        self.keys = [] # Objetos de tecla únicos, indexados pelo id
+        self.buttons = [] # Objetos de botão únicos, indexados pelo id
+        self._key_ids = {}
+        self._button_ids = {}
+
+    @classmethod
+    def from_events(cls, events):
+        """Cria um EventStore a partir de uma lista de dicionários (ou devolve o próprio store)."""
+        if isinstance(events, cls):
+            return events
+        store = cls()
+        for event in events:
+            store.append(event)
+        return store
+
+    @classmethod
+    def from_columns(cls, columns, keys, buttons):
+        """
+        Cria um EventStore a partir de colunas prontas.
+
+        As colunas podem ser `array` ou `memoryview` já convertidas para o typecode
+        (ex: um arquivo mapeado na memória). Colunas `memoryview` são somente
+        leitura: o store pode ser lido, fatiado e copiado com `extend`, mas não
+        recebe novos eventos.
+        """
+        store = cls.__new__(cls)
+        for name, _ in COLUMNS:
+            setattr(store, name, columns[name])
+        store.keys = list(keys)
+        store.buttons = list(buttons)
+        store._key_ids = {key: i for i, key in enumerate(store.keys)}
+        store._button_ids = {button: i for i, button in enumerate(store.buttons)}
+        return store
+
+    # Tabelas de teclas e botões
+
+    def key_id(self, key):
+        """Retorna o id da tecla, registrando-a na tabela se for nova."""
+        key_id = self._key_ids.get(key)
+        if key_id is None:
+            key_id = len(self.keys)
+            self.keys.append(key)
+            self._key_ids[key] = key_id
+        return key_id
+
+    def button_id(self, button):
+        """Retorna o id do botão, registrando-o na tabela se for novo."""
+        button_id = self._button_ids.get(button)
+        if button_id is None:
+            button_id = len(self.buttons)
+            self.buttons.append(button)
+            self._button_ids[button] = button_id
+        return button_id
+
+    # Inserção
+
+    def append_row(self, time_ns, type_code, x=0, y=0, code=0, flag=0, dx=0, dy=0):
+        """Adiciona um evento já no formato das colunas."""
+        self.times.append(time_ns)
+        self.types.append(type_code)
+        self.xs.append(x)
+        self.ys.append(y)
+        self.codes.append(code)
+        self.flags.append(flag)
+        self.dxs.append(dx)
+        self.dys.append(dy)
+
+    def append_key(self, time_ns, type_code, key):
+        """Adiciona um evento de tecla (tap, press ou release)."""
+        self.append_row(time_ns, type_code, 0, 0, self.key_id(key))
+
+    def append_move(self, time_ns, x, y):
+        """Adiciona um movimento do mouse."""
+        self.append_row(time_ns, MOVE, int(x), int(y))
+
+    def append_click(self, time_ns, x, y, button, pressed):
+        """Adiciona um clique (pressionar ou soltar) do mouse."""
+        self.append_row(time_ns, CLICK, int(x), int(y), self.button_id(button), 1 if pressed else 0)
+
+    def append_scroll(self, time_ns, x, y, dx, dy):
+        """Adiciona uma rolagem do mouse."""
+        self.append_row(time_ns, SCROLL, int(x), int(y), 0, 0, int(dx), int(dy))
+
+    def append(self, event):
+        """Adiciona um evento no formato de dicionário."""
+        type_code = TYPE_CODES[event['type']]
+        time_ns = seconds_to_ns(event['time'])
+        if type_code in KEY_TYPES:
+            self.append_key(time_ns, type_code, event['key'])
+            return
+        x, y = event['pos']
+        if type_code == MOVE:
+            self.append_move(time_ns, x, y)
+        elif type_code == CLICK:
+            self.append_click(time_ns, x, y, event['button'], event['pressed'])
+        else:
+            dx, dy = event['scroll']
+            self.append_scroll(time_ns, x, y, dx, dy)
+
+    def extend(self, other):
+        """Adiciona todos os eventos de outro EventStore, remapeando teclas e botões."""
+        if other.keys is self.keys and other.buttons is self.buttons:
+            for name, _ in COLUMNS:
+                getattr(self, name).extend(getattr(other, name))
+            return
+        for row in other.rows():
+            self._append_foreign_row(other, row)
+
+    def _append_foreign_row(self, other, row):
+        time_ns, type_code, x, y, code, flag, dx, dy = row
+        if type_code in KEY_TYPES:
+            code = self.key_id(other.keys[code])
+        elif type_code == CLICK:
+            code = self.button_id(other.buttons[code])
+        self.append_row(time_ns, type_code, x, y, code, flag, dx, dy)
+
+    def clear_rows(self):
+        """Descarta todos os eventos, mantendo as tabelas de teclas e botões."""
+        for name, typecode in COLUMNS:
+            setattr(self, name, array(typecode))
+
+    # Leitura
+
+    def __len__(self):
+        return len(self.times)
+
+    def rows(self, start=0, stop=None):
+        """Itera pelos eventos como tuplas (tempo_ns, tipo, x, y, id, flag, dx, dy)."""
+        if start == 0 and stop is None:
+            return zip(self.times, self.types, self.xs, self.ys, self.codes, self.flags, self.dxs, self.dys)
+        columns = [getattr(self, name)[start:stop] for name, _ in COLUMNS]
+        return zip(*columns)
+
+    def event(self, index):
+        """Monta o dicionário do evento na posição `index`."""
+        return self._row_to_event((
+            self.times[index], self.types[index], self.xs[index], self.ys[index],
+            self.codes[index], self.flags[index], self.dxs[index], self.dys[index],
+        ))
+
+    def _row_to_event(self, row):
+        time_ns, type_code, x, y, code, flag, dx, dy = row
+        event_type = TYPE_NAMES[type_code]
+        event = {'time': time_ns / NS_PER_SECOND, 'type': event_type}
+        if type_code in KEY_TYPES:
+            event['key'] = self.keys[code]
+        elif type_code == MOVE:
+            event['pos'] = (x, y)
+        elif type_code == CLICK:
+            event['pos'] = (x, y)
+            event['button'] = self.buttons[code]
+            event['pressed'] = bool(flag)
+        else:
+            event['pos'] = (x, y)
+            event['scroll'] = (dx, dy)
+        return event
+
+    def __iter__(self):
+        row_to_event = self._row_to_event
+        for row in self.rows():
+            yield row_to_event(row)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return self._slice(index)
+        return self.event(index)
+
+    def _slice(self, index):
+        store = EventStore.__new__(EventStore)
+        for name, _ in COLUMNS:
+            setattr(store, name, getattr(self, name)[index])
+        # As tabelas só crescem, então podem ser compartilhadas com segurança
+        store.keys = self.keys
+        store.buttons = self.buttons
+        store._key_ids = self._key_ids
+        store._button_ids = self._button_ids
+        return store
+
+    def time_at(self, index):
+        """Tempo do evento `index` em segundos."""
+        return self.times[index] / NS_PER_SECOND
+
+    def own_columns(self):
+        """
+        Copia para arrays próprios as colunas que apontam para memória externa
+        (ex: um `.gmac` mapeado), liberando o arquivo. Colunas `array` não mudam.
+        """
+        for name, typecode in COLUMNS:
+            column = getattr(self, name)
+            if not isinstance(column, array):
+                owned = array(typecode)
+                owned.frombytes(column.cast('B'))
+                setattr(self, name, owned)
+
+    # Memória
+
+    @staticmethod
+    def row_size():
+        """Bytes por evento nas colunas."""
+        return sum(array(typecode).itemsize for _, typecode in COLUMNS)
@@ -0,0 +1,82 @@
+"""
+Intercalação ordenada dos eventos de várias fontes
+
+Os listeners de teclado e mouse escrevem em buffers separados, cada um na sua
+thread, então os eventos chegam ao consumidor fora de ordem entre as fontes.
+O `OrderedMerger` segura os eventos recebidos e só libera, já ordenados, os que
+têm tempo até a marca d'água informada (o instante até o qual nenhuma fonte
+ainda pode produzir eventos). Assim a linha do tempo sai em ordem enquanto a
+gravação acontece e o custo de ordenação fica limitado ao tamanho da janela.
+"""
+from bisect import bisect_right
+from operator import itemgetter
+
+_row_time = itemgetter(0)
+
+
+class OrderedMerger:
+    """
+    Janela de reordenação limitada.
+
+    Recebe linhas no formato das colunas do `EventStore`
+    (tempo_ns, tipo, x, y, id, flag, dx, dy) e entrega em ordem de tempo para `sink`.
+    """
+    def __init__(self, sink):
+        """
+        Args:
+            sink (callable): Função chamada com os campos de cada linha liberada (ex: `EventStore.append_row`).
+        """
+        self._sink = sink
+        self._pending = []
+        self.last_time = None # Tempo da última linha liberada
+        self.released = 0
+        self.late = 0 # Linhas que chegaram depois da marca d'água e tiveram o tempo ajustado
+
+    def __len__(self):
+        return len(self._pending)
+
+    def add(self, row):
+        """Adiciona uma linha à janela."""
+        self._pending.append(row)
+
+    def add_row(self, *row):
+        """Adiciona uma linha passada campo a campo (mesma assinatura de `EventStore.append_row`)."""
+        self._pending.append(row)
+
+    def extend(self, rows):
+        """Adiciona várias linhas à janela."""
+        self._pending.extend(rows)
+
+    def release(self, watermark):
+        """
+        Entrega em ordem todas as linhas com tempo até `watermark`.
+
+        Returns:
+            int: Quantidade de linhas entregues.
+        """
+        pending = self._pending
+        if not pending:
+            return 0
+        # A maior parte já chega em ordem, então a ordenação (estável) é quase linear
+        pending.sort(key=_row_time)
+        cut = len(pending) if watermark is None else bisect_right(pending, watermark, key=_row_time)
+        if not cut:
+            return 0
+
+        sink = self._sink
+        last = self.last_time
+        for row in pending[:cut]:
+            if last is not None and row[0] < last:
+                # Chegou atrasada demais para a janela: mantém a ordem ajustando o tempo
+                self.late += 1
+                row = (last,) + row[1:]
+            last = row[0]
+            sink(*row)
+        self.last_time = last
+        self.released += cut
+        del pending[:cut]
+        return cut
+
+    def flush(self):
+        """Entrega tudo o que restou na janela."""
+        return self.release(None)
@@ -5,170 +5,530 @@ Este arquivo é responsável por reproduzir o macro
 
 import time
 import logging
-from pynput import keyboard, mouse
-import pyautogui
-import pydirectinput
 
 from ..managers import window_manager
+from . import engines
+from .event_store import EventStore, TYPE_NAMES, MOVE, NS_PER_SECOND
+from .prefetch import Prefetcher, DEFAULT_DEPTH
+from .resample import resample_moves
+from .runtime import LowJitter
+from .timing import RunTimings
 
-# Otimizações para PyDirectInput -
-pydirectinput.PAUSE = 0.01  # Reduz a pausa padrão entre os comandos
-pydirectinput.FAILSAFE = False # failsafe é ativado quando o mouse é movido para o canto da tela
+# Margem final (em segundos) antes de cada evento que é aguardada em espera ativa.
+# O sleep do sistema pode atrasar alguns décimos de milissegundo, então dormimos
+# até perto do prazo e o restante é feito girando no relógio
+SPIN_THRESHOLD = 0.001
+
+# Esperas longas usam `stop_signal.wait`, mas ele segue o timer de milissegundos do
+# sistema (~15,6ms por padrão no Windows). Ele termina `COARSE_WAIT_MARGIN` antes do
+# prazo e o restante é dormido com `time.sleep` (timer de alta resolução no Python
+# 3.11+) em fatias de até `SLEEP_SLICE`, verificando o stop_signal entre elas
+COARSE_WAIT_MARGIN = 0.05
+SLEEP_SLICE = 0.01
+
+# Limites do multiplicador de velocidade
+MIN_SPEED = 0.1
+MAX_SPEED = 100.0
+
+class TimeWarp:
+    """
+    Converte o tempo gravado no tempo de reprodução.
+
+    Cada intervalo entre eventos consecutivos é dividido pela velocidade e limitado
+    a `max_idle` segundos (0 = sem limite). No modo `asap` os intervalos gravados
+    são ignorados e os eventos saem a cada `min_spacing` segundos, o mais rápido
+    que o motor permitir. Guarda o último tempo visto, então blocos consecutivos
+    (reprodução em blocos) continuam na mesma linha do tempo.
+    """
+    def __init__(self, speed=1.0, max_idle=0.0, asap=False, min_spacing=0.0):
+        self.speed = speed
+        self.max_idle = max_idle
+        self.asap = asap
+        self.min_spacing = min_spacing
+        self._last_in = 0.0
+        self._last_out = 0.0
+
+    def __call__(self, event_time):
+        gap = event_time - self._last_in
+        self._last_in = event_time
+        if self.asap:
+            gap = self.min_spacing
+        else:
+            gap = max(gap, 0.0) / self.speed
+            if self.max_idle and gap > self.max_idle:
+                gap = self.max_idle
+        self._last_out += gap
+        return self._last_out
 
 class MacroPlayer:
     """
     Executa uma sequência de eventos de teclado e mouse.
     """
     def __init__(self):
-        self.keyboard_controller = keyboard.Controller()
-        self.mouse_controller = mouse.Controller()
+        self._keyboard_controller = None
+        self._mouse_controller = None
         self.was_skipped = False
-        self.engine = "pynput"
+        self.engine = engines.DEFAULT_ENGINE
+        self.backend = engines.create(self.engine, self)
         self.use_optimized_pause = True
+        self.absolute_scheduling = True
+        self.spin_threshold = SPIN_THRESHOLD
+        self.speed = 1.0
+        self.max_idle = 0.0
+        self.asap = False
+        self.min_spacing = 0.0
+        self.collect_timings = False
+        self.move_rate = 0.0
+        self.batch_window = 0.0
+        self.skip_stale_moves = False
+        self.max_lag = 0.0
+        self.low_jitter = False
+        self.pin_cpu = None
+        self.last_run_stats = None
+        self.last_run_timings = None
+
+    # Os controladores do pynput são criados no primeiro uso: importar o pynput exige
+    # um display, e o motor de simulação não precisa dele
+
+    @property
+    def keyboard_controller(self):
+        if self._keyboard_controller is None:
+            from pynput import keyboard
+            self._keyboard_controller = keyboard.Controller()
+        return self._keyboard_controller
+
+    @keyboard_controller.setter
+    def keyboard_controller(self, controller):
+        self._keyboard_controller = controller
+
+    @property
+    def mouse_controller(self):
+        if self._mouse_controller is None:
+            from pynput import mouse
+            self._mouse_controller = mouse.Controller()
+        return self._mouse_controller
+
+    @mouse_controller.setter
+    def mouse_controller(self, controller):
+        self._mouse_controller = controller
 
     def set_engine(self, engine_name, pydirectinput_pause=True):
-        """Define o motor de reprodução e suas configurações."""
-        if "Pynput" in engine_name:
-            self.engine = "pynput"
-        elif "PyAutoGUI" in engine_name:
-            self.engine = "pyautogui"
-        elif "PyDirectInput" in engine_name:
-            self.engine = "pydirectinput"
-        else:
-            self.engine = "pynput" # Padrão
-        
+        """
+        Define o motor de reprodução e suas configurações.
+
+        Args:
+            engine_name (str): Nome interno ('pynput', 'trace'...) ou rótulo exibido ("Pynput (Padrão)") do motor.
+            pydirectinput_pause (bool): Usa a pausa reduzida entre os comandos do PyDirectInput.
+
+        Raises:
+            ImportError: Se a biblioteca do motor não estiver instalada; o motor atual é mantido.
+        """
+        name = engines.resolve(engine_name)
+        if name != self.engine:
+            # A biblioteca do motor só é importada aqui, na primeira vez que ele é escolhido
+            self.backend = engines.create(name, self)
+            self.engine = name
+
         self.use_optimized_pause = pydirectinput_pause
 
-    def play(self, events, stop_signal, window_title=None):
+    def set_scheduler(self, absolute=True):
+        """
+        Define o modo de agendamento da reprodução.
+
+        No modo absoluto cada evento é disparado em `início + event['time']` no relógio
+        monotônico, então a latência do motor e os atrasos do sleep não se acumulam.
+        No modo relativo (antigo) dorme apenas o intervalo entre eventos consecutivos.
+        """
+        self.absolute_scheduling = absolute
+
+    def set_timing(self, speed=1.0, max_idle=0.0, asap=False, min_spacing=0.0):
+        """
+        Define como o tempo gravado é seguido na reprodução.
+
+        Args:
+            speed (float): Multiplicador de velocidade (limitado entre 0.1x e 100x).
+            max_idle (float): Maior pausa (em segundos) entre dois eventos; 0 = sem limite.
+            asap (bool): Ignora os tempos gravados e reproduz o mais rápido possível.
+            min_spacing (float): No modo `asap`, intervalo mínimo (em segundos) entre eventos.
+        """
+        self.speed = min(max(speed, MIN_SPEED), MAX_SPEED)
+        self.max_idle = max(max_idle, 0.0)
+        self.asap = asap
+        self.min_spacing = max(min_spacing, 0.0)
+
+    def set_batching(self, window=0.0):
+        """
+        Define a janela (em segundos) para disparar eventos em lote.
+
+        Eventos previstos até `window` depois do primeiro de um lote (ex: o movimento
+        antes do clique, o clique e os modificadores gravados no mesmo milissegundo)
+        são disparados juntos: uma espera, uma verificação da janela ativa e uma
+        finalização do motor (`flush`) por lote, sem pausas entre eles. 0 = um evento por vez.
+
+        É opcional (desativado por padrão) porque muda a reprodução: os eventos de um
+        lote saem até `window` antes do previsto, e o clique do Pynput perde a espera
+        de acomodação do cursor quando o movimento até ele está no mesmo lote.
+        """
+        self.batch_window = max(window, 0.0)
+
+    def set_move_rate(self, rate=0.0):
+        """
+        Define a taxa máxima de injeção dos movimentos do mouse.
+
+        Cada sequência de movimentos consecutivos é reamostrada na compilação para no
+        máximo `rate` pontos por segundo de reprodução (ver `resample.resample_moves`),
+        mantendo o primeiro e o último ponto e seus tempos. 0 = reproduz todos os pontos.
+        """
+        self.move_rate = max(rate, 0.0)
+
+    def _move_interval_ns(self):
+        """Intervalo mínimo entre movimentos no tempo gravado, ou 0 se a reamostragem estiver desligada."""
+        if not self.move_rate:
+            return 0
+        # A velocidade encurta os intervalos na reprodução, então a grade no tempo gravado é maior
+        speed = 1.0 if self.asap else self.speed
+        return int(NS_PER_SECOND * speed / self.move_rate)
+
+    def set_catch_up(self, skip_stale_moves=False, max_lag=0.0):
+        """
+        Define como a reprodução se recupera quando fica atrasada (motor lento, pausa do GC...).
+
+        Teclas, cliques e rolagens nunca são descartados.
+
+        Args:
+            skip_stale_moves (bool): Pula um movimento do mouse atrasado quando o movimento
+                seguinte também já passou do horário, indo direto para a posição mais recente.
+            max_lag (float): Maior atraso (em segundos) mantido; além dele a base de tempo é
+                empurrada para frente, e os eventos seguintes deixam de tentar compensar o atraso.
+                0 = sem limite.
+        """
+        self.skip_stale_moves = skip_stale_moves
+        self.max_lag = max(max_lag, 0.0)
+
+    def set_instrumentation(self, enabled):
+        """
+        Ativa a medição de tempos de cada reprodução (ver `timing.RunTimings`).
+
+        Com a medição ativa, `last_run_timings` guarda os histogramas do atraso de
+        cada disparo, da duração de cada chamada ao motor e de cada verificação da
+        janela ativa. Desativada, o custo por evento é só um teste a mais.
+        """
+        self.collect_timings = enabled
+
+    def set_low_jitter(self, enabled, cpu=None):
+        """
+        Ativa o modo de baixa variação durante as reproduções (ver `runtime.LowJitter`).
+
+        Enquanto a reprodução roda o coletor de lixo fica congelado e desativado e a
+        thread da reprodução ganha prioridade maior, onde o sistema permitir; com `cpu`
+        ela também fica fixa nessa CPU. Tudo é desfeito ao final.
+        """
+        self.low_jitter = enabled
+        self.pin_cpu = cpu
+
+    def _make_time_warp(self):
+        """Cria o conversor de tempo da reprodução, ou None se o tempo gravado for seguido à risca."""
+        if not self.asap and self.speed == 1.0 and not self.max_idle:
+            return None
+        return TimeWarp(self.speed, self.max_idle, self.asap, self.min_spacing)
+
+    def play(self, events, stop_signal, window_title=None, repetitions=1, delay=0.0, on_repetition=None):
         """
         Função de reprodução de macro
 
+        As repetições correm em uma única linha do tempo contínua: a repetição
+        seguinte começa `delay` segundos depois do último evento da anterior, sem
+        recompilar o plano nem reiniciar a base de tempo, então a cadência não deriva.
+
         Argumentos possíveis:
-            events (list): A lista de dicionários de eventos a serem reproduzidos
+            events (EventStore or list): Os eventos a serem reproduzidos
             stop_signal (threading.Event): Um evento que quando definido interrompe a reprodução
             window_title (str, opcional): O título da janela onde a macro deve ser executada
+            repetitions (int or None): Quantidade de repetições (None = infinitas)
+            delay (float): Pausa (em segundos) entre o fim de uma repetição e o início da próxima
+            on_repetition (callable, opcional): Chamada com o número de cada repetição quando ela começa
         """
         if not events:
+            # Nada para reproduzir: não deixa os dados da reprodução anterior para trás
+            self.was_skipped = False
+            self.last_run_stats = None
+            self.last_run_timings = None
             return
 
+        def open_plans():
+            # O plano é compilado só quando a primeira repetição começa
+            if not compiled:
+                compiled.append(self.compile(events, self._make_time_warp()))
+            return compiled
+        compiled = []
+
+        self._run_plans(self._repeat(open_plans, repetitions, delay, on_repetition), stop_signal, window_title)
+
+    def play_stream(self, open_chunks, stop_signal, window_title=None, prefetch=DEFAULT_DEPTH,
+                    repetitions=1, delay=0.0, on_repetition=None):
+        """
+        Reproduz uma macro lida em blocos, sem precisar de todos os eventos na memória.
+
+        Os blocos são lidos e compilados em uma thread de fundo com no máximo `prefetch`
+        planos prontos, então a reprodução começa assim que o primeiro bloco fica pronto.
+        Todos os blocos (e todas as repetições) usam a mesma base de tempo.
+
+        Args:
+            open_chunks (callable): Retorna um iterador novo pelos blocos de eventos
+                (EventStore ou listas), em ordem de tempo. É chamado uma vez por repetição.
+            stop_signal (threading.Event): Um evento que quando definido interrompe a reprodução
+            window_title (str, opcional): O título da janela onde a macro deve ser executada
+            prefetch (int): Quantidade de blocos compilados mantidos à frente da reprodução.
+            repetitions, delay, on_repetition: Como em `play`.
+        """
+        def open_plans():
+            warp = self._make_time_warp() # Compartilhado pelos blocos, que seguem a mesma linha do tempo
+            return Prefetcher((self.compile(chunk, warp) for chunk in open_chunks()), prefetch)
+
+        self._run_plans(self._repeat(open_plans, repetitions, delay, on_repetition), stop_signal, window_title)
+
+    def _repeat(self, open_plans, repetitions, delay, on_repetition):
+        """
+        Monta a linha do tempo das repetições.
+
+        Yields:
+            tuple: (número da repetição, deslocamento da repetição em segundos, plano)
+        """
+        offset = 0.0
+        repetition = 0
+        while repetitions is None or repetition < repetitions:
+            repetition += 1
+            if on_repetition:
+                on_repetition(repetition)
+            plans = open_plans()
+            last_time = None
+            try:
+                for plan in plans:
+                    yield repetition, offset, plan
+                    if plan:
+                        last_time = plan[-1][0]
+            finally:
+                if isinstance(plans, Prefetcher):
+                    plans.close()
+            if last_time is None:
+                return # Macro vazia: repetir não faria nada
+            offset += last_time + delay
+
+    def _run_plans(self, plans, stop_signal, window_title):
+        """
+        Executa os planos `(repetição, deslocamento, plano)` em sequência, na mesma base de tempo.
+
+        Se a janela `window_title` não estiver ativa, só a repetição atual é pulada: a
+        seguinte começa no seu horário normal. Apenas o `stop_signal` encerra tudo.
+        """
         self.was_skipped = False
+        timings = RunTimings() if self.collect_timings else None
+        self.last_run_timings = timings
+        is_window_active = window_manager.is_window_active
+        if timings is not None:
+            is_window_active = timings.timed(is_window_active, timings.focus)
 
-        # Se um título de janela for especificado, vai ver se ela tá ativa antes de começar
-        if window_title and not window_manager.is_window_active(window_title):
-            logging.warning(f"Reprodução pulada. Janela '{window_title}' não está ativa.")
-            self.was_skipped = True
-            return
+        backend = self.backend
+        observe = backend.observe
+        flush = backend.flush
+        runtime = LowJitter(self.pin_cpu) if self.low_jitter else None
 
-        original_pause = pydirectinput.PAUSE
-        if self.engine == 'pydirectinput':
-            pydirectinput.PAUSE = 0.01 if self.use_optimized_pause else 0.1
-        
+        clock = time.perf_counter # Relógio monotônico de alta resolução
+        absolute = self.absolute_scheduling
+        batch_window = self.batch_window
+        skip_stale_moves = self.skip_stale_moves
+        max_lag = self.max_lag
+        is_stopped = stop_signal.is_set
+        executed = 0
+        batches = 0
+        skipped_moves = 0
+        clamps = 0
+        clamped = 0.0
+        total_lateness = 0.0
+        max_lateness = 0.0
+        lateness = 0.0
+        last_event_time = 0
+        first_dispatch = None
+        start = run_start = None # `start` é a base de tempo, que `max_lag` pode empurrar
+        skipped_repetition = None
         try:
-            last_event_time = 0
-            for event in events:
-                if stop_signal.is_set():
-                    break
-
-                # Verifica a janela ativa antes de cada evento caso seja necessario
-                if window_title and not window_manager.is_window_active(window_title):
-                    logging.warning(f"Reprodução interrompida. Janela '{window_title}' não está mais ativa.")
-                    self.was_skipped = True
-                    break
-
-                delay = event['time'] - last_event_time
-                if delay > 0:
-                    time.sleep(delay)
-                
-                if stop_signal.is_set():
-                    break
-
-                self._execute_event(event)
-                last_event_time = event['time']
+            # Dentro do try: se falharem no meio, o finally desfaz o que já foi aplicado
+            backend.begin_run()
+            if runtime is not None:
+                runtime.apply()
+            for repetition, offset, plan in plans:
+                if repetition == skipped_repetition:
+                    continue # Resto de uma repetição pulada
+                if start is None:
+                    # A base de tempo começa quando o primeiro plano fica pronto
+                    start = run_start = clock()
+                base = start + offset
+                plan_length = len(plan)
+                index = 0
+                interrupted = False
+                while index < plan_length:
+                    if is_stopped():
+                        interrupted = True
+                        break
+
+                    # Lote: o evento atual e os seguintes previstos até `batch_window` depois dele
+                    # são disparados juntos, com uma única espera e verificação da janela
+                    event_time = plan[index][0]
+                    batch_end = index + 1
+                    if batch_window:
+                        batch_limit = event_time + batch_window
+                        while batch_end < plan_length and plan[batch_end][0] <= batch_limit:
+                            batch_end += 1
+
+                    # Verifica a janela ativa antes de cada lote caso seja necessario
+                    if window_title and not is_window_active(window_title):
+                        logging.warning(f"Repetição {repetition} pulada. Janela '{window_title}' não está ativa.")
+                        self.was_skipped = True
+                        skipped_repetition = repetition
+                        break
+
+                    if absolute:
+                        self._wait_until(base + event_time, stop_signal)
+                    else:
+                        delay = offset + event_time - last_event_time
+                        if delay > 0:
+                            time.sleep(delay)
+
+                    if is_stopped():
+                        interrupted = True
+                        break
+
+                    for position in range(index, batch_end):
+                        event_time, func, args, type_code = plan[position]
+
+                        # Atrasado em um trecho de movimentos: se o próximo movimento também já
+                        # passou do horário, este é pulado e o cursor vai direto para o mais recente
+                        if skip_stale_moves and type_code == MOVE and position + 1 < plan_length:
+                            next_time, _, _, next_type = plan[position + 1]
+                            if next_type == MOVE and clock() >= base + next_time:
+                                skipped_moves += 1
+                                continue
+
+                        # Atraso do disparo em relação ao horário previsto do evento
+                        deadline = base + event_time
+                        lateness = clock() - deadline
+                        if max_lag and lateness > max_lag:
+                            # Empurra a base de tempo para que o atraso não passe de `max_lag`
+                            shift = lateness - max_lag
+                            start += shift
+                            base += shift
+                            clamped += shift
+                            clamps += 1
+                        total_lateness += lateness
+                        if lateness > max_lateness:
+                            max_lateness = lateness
+                        if observe is not None:
+                            observe(deadline - run_start, lateness)
+
+                        try:
+                            if timings is None:
+                                func(*args)
+                            else:
+                                timings.lateness.record(lateness)
+                                call_start = clock()
+                                func(*args)
+                                timings.engine.record(clock() - call_start)
+                        except Exception as e:
+                            logging.error(f"Erro ao executar {getattr(func, '__name__', func)}{args} com o motor {self.engine}: {e}")
+                        if first_dispatch is None:
+                            first_dispatch = clock()
+                        last_event_time = offset + event_time
+                        executed += 1
+
+                    flush() # Fim do lote: o motor conclui o que adiou durante o lote
+                    batches += 1
+                    index = batch_end
+                if interrupted:
+                    break # Parada pedida pelo stop_signal
         finally:
-            # Garante que a pausa seja restaurada ao valor original
-            pydirectinput.PAUSE = original_pause
+            plans.close() # Encerra a leitura antecipada se a reprodução parou no meio
+            backend.end_run()
+            low_jitter = runtime.applied if runtime is not None else None
+            if runtime is not None:
+                runtime.restore()
 
-    def _execute_event(self, event):
+            self.last_run_stats = {
+                'events': executed,
+                'scheduled_duration': last_event_time,
+                'elapsed': clock() - run_start if run_start is not None else 0.0,
+                'drift': lateness, # Atraso do último evento disparado
+                'max_lateness': max_lateness,
+                'mean_lateness': total_lateness / executed if executed else 0.0,
+                'first_dispatch': first_dispatch, # Instante (perf_counter) em que o primeiro evento foi injetado
+                'batches': batches, # Lotes de eventos disparados juntos (ver `batch_window`)
+                'skipped_moves': skipped_moves, # Movimentos atrasados pulados pela recuperação de atraso
+                'clamps': clamps, # Vezes em que a base de tempo foi empurrada por `max_lag`
+                'clamped': clamped, # Total (em segundos) que a base de tempo foi empurrada
+                'low_jitter': low_jitter, # Ajustes do modo de baixa variação aplicados (None = desativado)
+            }
+            if timings is not None:
+                timings.finish(executed, self.last_run_stats['elapsed'])
+            logging.info(
+                f"Reprodução: {executed} eventos, deriva final {lateness * 1000:.2f}ms, "
+                f"atraso médio {self.last_run_stats['mean_lateness'] * 1000:.2f}ms, "
+                f"atraso máximo {max_lateness * 1000:.2f}ms"
+                + (f", {skipped_moves} movimentos atrasados pulados" if skipped_moves else "")
+                + (f", base de tempo empurrada {clamped * 1000:.1f}ms" if clamps else "")
+            )
+
+    def _wait_until(self, deadline, stop_signal):
         """
-        Executa um único evento usando o motor especificado pelo usuário.
+        Espera até o instante `deadline` do relógio monotônico.
+
+        Dorme (de forma interrompível pelo stop_signal) até faltar `spin_threshold`
+        e gira no relógio pelo restante, evitando o atraso de acordar do sleep.
         """
-        event_type = event.get('type')
-        engine = self.engine
-        
-        try:
-            if event_type == 'key_tap':
-                key_str = self._get_key_string(event['key'])
-                if engine == 'pydirectinput':
-                    pydirectinput.press(key_str)
-                else:
-                    self.keyboard_controller.tap(event['key'])
-            elif event_type == 'key_press':
-                key_str = self._get_key_string(event['key'])
-                if engine == 'pydirectinput':
-                    pydirectinput.keyDown(key_str)
-                else:
-                    self.keyboard_controller.press(event['key'])
-            elif event_type == 'key_release':
-                key_str = self._get_key_string(event['key'])
-                if engine == 'pydirectinput':
-                    pydirectinput.keyUp(key_str)
-                else:
-                    self.keyboard_controller.release(event['key'])
-            elif event_type == 'move':
-                x, y = event['pos']
-                if engine == 'pydirectinput':
-                    pydirectinput.moveTo(x, y, duration=0) # Movimento instantâneo
-                else:
-                    self.mouse_controller.position = (x, y)
-            elif event_type == 'click':
-                self._handle_click(event, engine)
-            elif event_type == 'scroll':
-                self.mouse_controller.position = event['pos']
-                self.mouse_controller.scroll(event['scroll'][0], event['scroll'][1])
-        except Exception as e:
-            logging.error(f"Erro ao executar o evento {event} com o motor {engine}: {e}")
-
-    def _handle_click(self, event, engine):
-        """Lida com eventos de clique usando o motor especificado."""
-        x, y = event['pos']
-        button_str = str(event['button']).split('.')[-1]
-
-        if engine == 'pyautogui':
-            if event['pressed']:
-                pyautogui.mouseDown(x=x, y=y, button=button_str)
-            else:
-                pyautogui.mouseUp(x=x, y=y, button=button_str)
-        elif engine == 'pydirectinput':
-            pydirectinput.moveTo(x, y, duration=0) # Movimento instantâneo
-            if event['pressed']:
-                pydirectinput.mouseDown(button=button_str)
-            else:
-                pydirectinput.mouseUp(button=button_str)
-        else: # Padrão para pynput
-            self.mouse_controller.position = (x, y)
-            time.sleep(0.01)
-            self.mouse_controller.position = (x, y)
-            
-            from pynput.mouse import Button
-            button = event['button']
-            if isinstance(button, str):
-                button = getattr(Button, button_str, None)
-            
-            if button:
-                if event['pressed']:
-                    self.mouse_controller.press(button)
-                else:
-                    self.mouse_controller.release(button)
-
-    def _get_key_string(self, key):
-        """Converte um objeto de tecla pynput para uma string que pydirectinput compreende"""
-        # Tenta obter o caractere da tecla se for uma tecla normal 
-        if hasattr(key, 'char') and key.char:
-            return key.char
-
-        # Para teclas especiais pega o nome
-        if hasattr(key, 'name'):
-            return key.name
-            
-        # Caso fallback converte para string
-        return str(key)
+        clock = time.perf_counter
+        remaining = deadline - clock() - COARSE_WAIT_MARGIN
+        if remaining > 0 and stop_signal.wait(remaining):
+            return
+        while True:
+            remaining = deadline - clock() - self.spin_threshold
+            if remaining <= 0:
+                break
+            time.sleep(min(remaining, SLEEP_SLICE))
+            if stop_signal.is_set():
+                return
+        while clock() < deadline:
+            pass
+
+    # Compilação do plano de reprodução
+
+    def compile(self, events, warp=None):
+        """
+        Converte os eventos em um plano de reprodução para o motor atual.
+
+        Cada item do plano é uma tupla `(tempo, função, argumentos, tipo)` com as teclas
+        já decodificadas, os botões já resolvidos e o manipulador do motor já escolhido,
+        de modo que o loop de reprodução só precisa esperar e chamar. O código do tipo
+        é usado pelas políticas de recuperação de atraso.
+
+        Args:
+            events (EventStore or list): Os eventos a serem compilados.
+            warp (TimeWarp, opcional): Conversor do tempo gravado para o tempo de reprodução.
+
+        Returns:
+            list: O plano de reprodução.
+        """
+        store = EventStore.from_events(events)
+        binders = self.backend.bind(store)
+        plan = []
+        append = plan.append
+        rows = store.rows()
+        move_interval = self._move_interval_ns()
+        if move_interval:
+            rows = resample_moves(rows, move_interval)
+        for time_ns, type_code, x, y, code, flag, dx, dy in rows:
+            try:
+                func, args = binders[type_code](x, y, code, flag, dx, dy)
+            except Exception as e:
+                logging.error(f"Erro ao preparar o evento {TYPE_NAMES[type_code]} com o motor {self.engine}: {e}")
+                continue
+            event_time = time_ns / NS_PER_SECOND
+            append((warp(event_time) if warp else event_time, func, args, type_code))
+        return plan
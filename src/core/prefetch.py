@@ -0,0 +1,72 @@
+"""
+Leitura antecipada em segundo plano
+
+O `Prefetcher` consome um iterador (ex: blocos de eventos lidos de um arquivo e
+já compilados) em uma thread de fundo e mantém no máximo `depth` itens prontos.
+Com `depth=2` funciona como buffer duplo: enquanto o consumidor usa um bloco,
+o próximo já está pronto e o seguinte está sendo preparado. A memória fica
+limitada pela janela de leitura antecipada, não pelo tamanho do arquivo.
+"""
+import queue
+import threading
+
+DEFAULT_DEPTH = 2
+
+_DONE = object()
+
+
+class _Failure:
+    """Erro levantado pelo iterador de origem, repassado ao consumidor."""
+    def __init__(self, error):
+        self.error = error
+
+
+class Prefetcher:
+    """Itera por `iterable` em uma thread de fundo, com no máximo `depth` itens prontos."""
+    def __init__(self, iterable, depth=DEFAULT_DEPTH):
+        self._iterable = iterable
+        self._queue = queue.Queue(maxsize=max(1, depth))
+        self._closed = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def __iter__(self):
+        while True:
+            item = self._queue.get()
+            if item is _DONE:
+                return
+            if isinstance(item, _Failure):
+                raise item.error
+            yield item
+
+    def close(self):
+        """Interrompe a leitura antecipada e espera a thread terminar."""
+        self._closed.set()
+        # Esvazia a fila para destravar a thread caso ela esteja esperando espaço
+        while self._thread.is_alive():
+            try:
+                self._queue.get(timeout=0.05)
+            except queue.Empty:
+                pass
+        self._thread.join()
+
+    def _put(self, item):
+        """Coloca um item na fila, desistindo se o consumidor fechar o prefetcher."""
+        while not self._closed.is_set():
+            try:
+                self._queue.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _run(self):
+        """Alvo da thread de leitura antecipada."""
+        try:
+            for item in self._iterable:
+                if not self._put(item):
+                    return
+        except Exception as e:
+            self._put(_Failure(e))
+        finally:
+            self._put(_DONE)
@@ -2,24 +2,56 @@
 Este arquivo é responsável por gravar o macro
 """
 import time
+import logging
 import threading
-from pynput import keyboard, mouse
+
+from .event_store import (
+    EventStore, KEY_TAP, KEY_PRESS, KEY_RELEASE, MOVE, CLICK, SCROLL, NS_PER_SECOND
+)
+from .event_ring import EventRing, DEFAULT_CAPACITY
+from .merger import OrderedMerger
+from ..managers.stream_writer import StreamWriter
+
+# Intervalo (em segundos) em que a thread consumidora esvazia os buffers dos listeners
+DRAIN_INTERVAL = 0.05
+
+# Folga (em ns) para eventos cujo tempo já foi lido mas que ainda não chegaram ao buffer
+REORDER_SLACK_NS = 20_000_000
 
 class MacroRecorder:
     """
     Gerencia a gravação de ações do usuário tanto teclado quanto mouse.
+
+    Os callbacks dos listeners só escrevem eventos crus no buffer circular da sua
+    thread (teclas como press/release no instante em que acontecem). Uma thread
+    consumidora esvazia os buffers em lotes, transforma press+release curtos em
+    taps e intercala as fontes em ordem de tempo direto em `events`, avisando o
+    callback de lote. Os textos de exibição só são montados sob demanda (`describe_event`).
+
+    Na gravação direta em arquivo (`stream_path`), cada lote vai para um `StreamWriter`
+    e é descartado da memória, então `events` fica vazio e o uso de memória não cresce.
     """
-    def __init__(self, record_mode="Teclado e Mouse"):
-        self.events = []
+    def __init__(self, record_mode="Teclado e Mouse", move_max_rate=0, move_min_distance=0, ring_capacity=DEFAULT_CAPACITY):
+        self.events = EventStore()
         self.is_recording = False
         self.start_time = 0
         self.keyboard_listener = None
         self.mouse_listener = None
-        self._on_action_callback = None
+        self._on_batch_callback = None
         self.ignore_keys = set() # Conjunto de teclas a serem ignoradas.
-        self.key_press_times = {}  # Dicionário para rastrear o tempo de pressionamento de cada tecla
+        self.key_press_times = {}  # Dicionário para rastrear o tempo (ns) de pressionamento de cada tecla
         self.TAP_THRESHOLD = 0.2  # Limite em segundos para considerar um tap
+        self.dropped_moves = 0 # Movimentos descartados pela política de captura na última gravação
+        self.ring_capacity = ring_capacity
+        # Um buffer por thread de listener, para que cada um tenha um único produtor
+        self._keyboard_ring = EventRing(ring_capacity)
+        self._mouse_ring = EventRing(ring_capacity)
+        self._drain_thread = None
+        self._stop_drain = threading.Event()
+        self.stream_path = None
+        self._stream_writer = None
         self.set_record_mode(record_mode)
+        self.set_move_capture(move_max_rate, move_min_distance)
 
     def set_record_mode(self, mode):
         """Define o que deve ser gravado."""
@@ -27,29 +59,79 @@ class MacroRecorder:
         self.record_keyboard = "Teclado" in self.record_mode
         self.record_mouse = "Mouse" in self.record_mode
 
-    def start(self, on_action_callback=None, ignore_keys=None):
+    def set_move_capture(self, max_rate=0, min_distance=0):
+        """
+        Define a política de captura dos movimentos do mouse.
+
+        Argumentos:
+            max_rate (float): Taxa máxima de amostras de movimento por segundo (0 = sem limite).
+            min_distance (float): Distância mínima em pixels desde o último movimento gravado (0 = sem limite).
+        """
+        self.move_max_rate = max_rate or 0
+        self.move_min_distance = min_distance or 0
+
+    def start(self, on_batch_callback=None, ignore_keys=None, stream_path=None, listen=True):
         """
         Inicia a gravação, limpando eventos antigos e ativando os listeners.
-        
+
         Argumentos:
-            on_action_callback (callable, opcional): Uma função a ser chamada sempre que uma nova ação for registrada. Recebe uma string descritiva da ação. Defaults to None.
+            on_batch_callback (callable, opcional): Uma função chamada pela thread consumidora a cada lote de eventos gravados. Recebe o lote como um `EventStore`. Não deve chamar o Tk nem esperar a thread da interface, que fica bloqueada em `stop` até a thread consumidora terminar. Defaults to None.
             ignore_keys (list, opcional): Uma lista de teclas a serem ignoradas durante a gravação. Defaults to None.
+            stream_path (str, opcional): Se definido, grava os eventos direto neste arquivo `.jsonl` (que não pode existir ainda) em vez de mantê-los em memória. Defaults to None.
+            listen (bool, opcional): Se False, não inicia os listeners do pynput e os callbacks (`on_move`, `on_press`...) são chamados por quem usa o gravador, como nos benchmarks. Defaults to True.
         """
         if self.is_recording:
             return
 
-        self.events = []
-        self.is_recording = True
-        self.start_time = time.monotonic()
-        self._on_action_callback = on_action_callback
+        # Criado antes de mudar qualquer estado: se o arquivo não puder ser aberto,
+        # o OSError chega a quem chamou com o gravador parado como estava
+        stream_writer = StreamWriter(stream_path) if stream_path else None
+        self.stream_path = stream_path
+        self._stream_writer = stream_writer
+
+        self.events = EventStore()
+        self._keyboard_ring = EventRing(self.ring_capacity)
+        self._mouse_ring = EventRing(self.ring_capacity)
+        self._merger = OrderedMerger(self.events.append_row)
+        self._open_presses = {} # id da tecla -> tempo do press ainda sem decisão (tap ou press)
+        self._promoted_keys = set() # Teclas seguradas além do limite, com o press já emitido
+        self._tap_threshold_ns = int(self.TAP_THRESHOLD * NS_PER_SECOND)
+        self.start_time = time.monotonic_ns()
+        self._on_batch_callback = on_batch_callback
         self.ignore_keys = set(ignore_keys or []) # Define as teclas a ignorar
         self.key_press_times.clear()
 
+        # Prepara a política de captura de movimentos
+        self._move_interval_ns = int(NS_PER_SECOND / self.move_max_rate) if self.move_max_rate > 0 else 0
+        self._min_distance_sq = self.move_min_distance * self.move_min_distance
+        self._throttle_moves = bool(self._move_interval_ns or self._min_distance_sq)
+        self._last_move_t = -self._move_interval_ns
+        self._last_x = self._last_y = None
+        # Último movimento descartado. `_pending_seq` é ímpar enquanto a thread do mouse
+        # o escreve, para que a thread do teclado leia sempre uma posição consistente
+        self._pending_seq = 0
+        self._pending_t = self._pending_x = self._pending_y = 0
+        self._flushed_seq = 0 # Último `_pending_seq` já gravado
+        self.dropped_moves = 0
+
+        self.is_recording = True
+
+        # Thread consumidora que esvazia os buffers em lotes
+        self._stop_drain.clear()
+        self._drain_thread = threading.Thread(target=self._drain_loop, daemon=True)
+        self._drain_thread.start()
+
+        if not listen:
+            return
+
+        # Importado só aqui: o pynput exige um display
+        from pynput import keyboard, mouse
+
         # Configura e inicia os listeners com base no modo de gravação
         if self.record_keyboard:
             self.keyboard_listener = keyboard.Listener(on_press=self.on_press, on_release=self.on_release)
             self.keyboard_listener.start()
-        
+
         if self.record_mouse:
             self.mouse_listener = mouse.Listener(on_move=self.on_move, on_click=self.on_click, on_scroll=self.on_scroll)
             self.mouse_listener.start()
@@ -66,35 +148,141 @@ class MacroRecorder:
             self.mouse_listener.stop()
             self.mouse_listener = None
 
+        self.is_recording = False
+
+        # Para a thread consumidora e esvazia o que sobrou nos buffers
+        self._stop_drain.set()
+        if self._drain_thread and self._drain_thread.is_alive():
+            self._drain_thread.join()
+        self._drain_thread = None
+
         # Processa quaisquer teclas que ainda estejam pressionadas como eventos do tipo press
         # Isso garante que se a gravação parar com uma tecla pressionada, ela vai ser registrada
-        for key, press_time in self.key_press_times.items():
-            t = press_time - self.start_time
-            event = {'time': t, 'type': 'key_press', 'key': key}
-            display = f"[{t:.2f}s] Pressionou Tecla: {key}"
-            self._record_event(event, display)
+        self._flush_pending_move(self._merger.add_row)
+        self._drain(final=True)
         self.key_press_times.clear()
-            
-        # Garante que todos os eventos estejam em ordem cronológica estrita
-        # Isso corrige um problema que  as vezes os eventos podem estar fora de ordem devido a threads
-        self.events.sort(key=lambda e: e['time'])
 
-        self.is_recording = False
-        self._on_action_callback = None
+        if self._stream_writer:
+            self._stream_writer.close()
+            self._stream_writer = None
+
+        dropped = self.dropped_events
+        if dropped:
+            logging.warning(f"Gravação: {dropped} eventos descartados por estouro do buffer.")
+
+        if self._merger.late:
+            logging.warning(f"Gravação: {self._merger.late} eventos chegaram fora da janela de reordenação.")
+
+        self._on_batch_callback = None
         self.ignore_keys = set() # Limpa as teclas ignoradas
 
-    def _record_event(self, event_data, display_text):
+    # Consumo dos buffers
+
+    def _drain_loop(self):
+        """Alvo da thread consumidora."""
+        while not self._stop_drain.wait(DRAIN_INTERVAL):
+            self._drain()
+
+    def _drain(self, final=False):
         """
-        Adiciona um evento à lista e chama o callback de ação... caso exista
+        Esvazia os buffers, libera em ordem os eventos que já não podem mais ser
+        ultrapassados e avisa o callback de lote.
+
+        Args:
+            final (bool): Se True (na parada), libera tudo e grava as teclas ainda pressionadas.
         """
-        if not self.is_recording:
+        # O instante é lido antes de esvaziar os buffers: o que chegar depois é mais novo
+        now = time.monotonic_ns() - self.start_time
+        merger = self._merger
+        start = len(self.events)
+
+        merger.extend(self._mouse_ring.drain_rows())
+        for row in self._keyboard_ring.drain_rows():
+            self._fold_key_row(row)
+
+        if final:
+            for code, press_time in self._open_presses.items():
+                merger.add((press_time, KEY_PRESS, 0, 0, code, 0, 0, 0))
+            self._open_presses.clear()
+            merger.flush()
+        else:
+            # Um press ainda pode virar tap no seu próprio tempo, então segura a marca
+            # d'água nele. Depois do limite do tap ele é com certeza um press e é emitido.
+            watermark = now - REORDER_SLACK_NS
+            promote_before = now - self._tap_threshold_ns - REORDER_SLACK_NS
+            for code, press_time in list(self._open_presses.items()):
+                if press_time <= promote_before:
+                    del self._open_presses[code]
+                    self._promoted_keys.add(code)
+                    merger.add((press_time, KEY_PRESS, 0, 0, code, 0, 0, 0))
+                elif press_time < watermark:
+                    watermark = press_time
+            merger.release(watermark)
+
+        end = len(self.events)
+        if end == start:
+            return
+        batch = self.events[start:end]
+        if self._stream_writer:
+            # Na gravação direta o lote vai para o arquivo e sai da memória
+            self._stream_writer.submit(batch)
+            self.events.clear_rows()
+        if self._on_batch_callback:
+            self._on_batch_callback(batch)
+
+    def _fold_key_row(self, row):
+        """Converte os press/release crus do teclado em tap, press e release."""
+        time_ns, type_code, _, _, code = row[:5]
+        if type_code == KEY_PRESS:
+            self._open_presses[code] = time_ns
+            return
+        if type_code != KEY_RELEASE:
+            self._merger.add(row) # Movimento pendente gravado pela thread do teclado
             return
-            
-        self.events.append(event_data)
-        if self._on_action_callback:
-            self._on_action_callback(display_text)
 
-    # Callback para Listeners 
+        press_time = self._open_presses.pop(code, None)
+        if press_time is None:
+            # O press já foi emitido (tecla segurada) ou não foi visto
+            self._promoted_keys.discard(code)
+            self._merger.add(row)
+        elif time_ns - press_time < self._tap_threshold_ns:
+            # Se a duração for curta, registra como um tap
+            self._merger.add((press_time, KEY_TAP, 0, 0, code, 0, 0, 0))
+        else:
+            # Se for longa, registra press e release separadamente
+            self._merger.add((press_time, KEY_PRESS, 0, 0, code, 0, 0, 0))
+            self._merger.add(row)
+
+    @property
+    def dropped_events(self):
+        """Total de eventos descartados por estouro dos buffers na gravação atual."""
+        return self._keyboard_ring.dropped + self._mouse_ring.dropped
+
+    @property
+    def recorded_count(self):
+        """Total de eventos gravados até agora (inclusive os já enviados ao arquivo)."""
+        return self._merger.released
+
+    def ring_stats(self):
+        """Contadores dos buffers de cada listener."""
+        return {'keyboard': self._keyboard_ring.stats(), 'mouse': self._mouse_ring.stats()}
+
+    def _flush_pending_move(self, push):
+        """
+        Grava com `push` o último movimento descartado, se ainda não foi gravado.
+        Chamado antes de cliques, rolagens e teclas para que a posição do cursor na
+        reprodução fique correta.
+        """
+        seq = self._pending_seq
+        if seq == self._flushed_seq or seq & 1:
+            return
+        t, x, y = self._pending_t, self._pending_x, self._pending_y
+        if self._pending_seq != seq:
+            return # A thread do mouse atualizou a posição durante a leitura
+        self._flushed_seq = seq
+        push(t, MOVE, x, y)
+
+    # Callback para Listeners
 
     def on_press(self, key):
         # Ignora eventos de repetição do sistema operacional
@@ -103,54 +291,87 @@ class MacroRecorder:
         # Verifica se a tecla deve ser ignorada
         if key in self.ignore_keys:
             return
-        
+        if not self.is_recording:
+            return
+
         # Armazena o tempo que a tecla foi pressionada
-        self.key_press_times[key] = time.monotonic()
+        press_time = time.monotonic_ns()
+        self.key_press_times[key] = press_time
+        push = self._keyboard_ring.push
+        self._flush_pending_move(push)
+        push(press_time - self.start_time, KEY_PRESS, 0, 0, self.events.key_id(key))
 
     def on_release(self, key):
         if key not in self.key_press_times:
             return
-            
-        press_time = self.key_press_times.pop(key)
-        release_time = time.monotonic()
-        duration = release_time - press_time
 
-        if duration < self.TAP_THRESHOLD:
-            # Se a duração for curta, registra como um tap
-            t = press_time - self.start_time
-            event = {'time': t, 'type': 'key_tap', 'key': key}
-            display = f"[{t:.2f}s] Apertou Tecla: {key}"
-            self._record_event(event, display)
-        else:
-            # Se for longa, registra press e release separadamente
-            # Evento de Pressionar
-            t_press = press_time - self.start_time
-            event_press = {'time': t_press, 'type': 'key_press', 'key': key}
-            display_press = f"[{t_press:.2f}s] Pressionou Tecla: {key}"
-            self._record_event(event_press, display_press)
-            
-            # Evento de Soltar
-            t_release = release_time - self.start_time
-            event_release = {'time': t_release, 'type': 'key_release', 'key': key}
-            display_release = f"[{t_release:.2f}s] Soltou Tecla: {key}"
-            self._record_event(event_release, display_release)
+        self.key_press_times.pop(key)
+        if not self.is_recording:
+            return
+        # A decisão entre tap e press+release é feita pela thread consumidora
+        push = self._keyboard_ring.push
+        self._flush_pending_move(push)
+        push(time.monotonic_ns() - self.start_time, KEY_RELEASE, 0, 0, self.events.key_id(key))
 
     def on_move(self, x, y):
-        t = time.monotonic() - self.start_time
+        if not self.is_recording:
+            return
+        t = time.monotonic_ns() - self.start_time
+
+        # Descarta amostras redundantes antes de qualquer outra coisa, guardando
+        # só a última posição para ser gravada antes do próximo clique/tecla
+        if self._throttle_moves and self._last_x is not None:
+            dx = x - self._last_x
+            dy = y - self._last_y
+            if t - self._last_move_t < self._move_interval_ns or dx * dx + dy * dy < self._min_distance_sq:
+                self._pending_seq += 1
+                self._pending_t = t
+                self._pending_x = x
+                self._pending_y = y
+                self._pending_seq += 1
+                self.dropped_moves += 1
+                return
+
+        self._last_move_t = t
+        self._last_x = x
+        self._last_y = y
+        # Movimento gravado, então o pendente (se houver) já ficou para trás
+        self._flushed_seq = self._pending_seq
         # Registra eventos de movimento do mouse
-        event = {'time': t, 'type': 'move', 'pos': (x, y)}
-        self._record_event(event, f"[{t:.2f}s] Mouse Move: ({x}, {y})")
+        self._mouse_ring.push(t, MOVE, int(x), int(y))
 
     def on_click(self, x, y, button, pressed):
-        t = time.monotonic() - self.start_time
-        action = 'pressionou' if pressed else 'soltou'
-        event = {'time': t, 'type': 'click', 'pos': (x, y), 'button': button, 'pressed': pressed}
-        display = f"[{t:.2f}s] Mouse {action}: {button}"
-        self._record_event(event, display)
+        if not self.is_recording:
+            return
+        t = time.monotonic_ns() - self.start_time
+        push = self._mouse_ring.push
+        self._flush_pending_move(push)
+        push(t, CLICK, int(x), int(y), self.events.button_id(button), 1 if pressed else 0)
 
     def on_scroll(self, x, y, dx, dy):
-        t = time.monotonic() - self.start_time
-        event = {'time': t, 'type': 'scroll', 'pos': (x, y), 'scroll': (dx, dy)}
-        display = f"[{t:.2f}s] Mouse Scroll: ({dx}, {dy})"
-        self._record_event(event, display)
+        if not self.is_recording:
+            return
+        t = time.monotonic_ns() - self.start_time
+        push = self._mouse_ring.push
+        self._flush_pending_move(push)
+        push(t, SCROLL, int(x), int(y), 0, 0, int(dx), int(dy))
+
 
+def describe_event(event):
+    """Monta o texto de exibição de um evento no formato de dicionário."""
+    t = event['time']
+    event_type = event['type']
+    if event_type == 'key_tap':
+        return f"[{t:.2f}s] Apertou Tecla: {event['key']}"
+    if event_type == 'key_press':
+        return f"[{t:.2f}s] Pressionou Tecla: {event['key']}"
+    if event_type == 'key_release':
+        return f"[{t:.2f}s] Soltou Tecla: {event['key']}"
+    if event_type == 'move':
+        x, y = event['pos']
+        return f"[{t:.2f}s] Mouse Move: ({x}, {y})"
+    if event_type == 'click':
+        action = 'pressionou' if event['pressed'] else 'soltou'
+        return f"[{t:.2f}s] Mouse {action}: {event['button']}"
+    dx, dy = event['scroll']
+    return f"[{t:.2f}s] Mouse Scroll: ({dx}, {dy})"
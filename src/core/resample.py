@@ -0,0 +1,78 @@
+"""
+Reamostragem dos movimentos do mouse na reprodução
+
+A densidade dos movimentos gravados depende do mouse de quem gravou (alguns
+enviam milhares de posições por segundo), mas a máquina que reproduz pode não
+conseguir injetar nessa taxa. `resample_moves` reduz cada sequência de
+movimentos consecutivos a no máximo um ponto por intervalo, interpolando ao
+longo do caminho gravado:
+
+- o primeiro e o último ponto de cada sequência são mantidos, com seus tempos;
+- nos trechos densos (pontos mais próximos que o intervalo) os pontos saem em
+  uma grade regular, com a posição interpolada no caminho gravado;
+- nos trechos esparsos (o mouse parou) os pontos originais são mantidos, para
+  não inventar movimento onde o cursor estava parado.
+
+Trabalha direto sobre as linhas do `EventStore`, como um gerador, então serve
+também para a reprodução em blocos.
+"""
+from .event_store import MOVE
+
+
+def resample_moves(rows, interval_ns):
+    """
+    Reamostra as sequências de movimentos de `rows` para no máximo um ponto a cada `interval_ns`.
+
+    Args:
+        rows (iterable): Linhas `(tempo, tipo, x, y, código, estado, dx, dy)` em ordem de tempo.
+        interval_ns (int): Intervalo mínimo entre movimentos interpolados, em nanossegundos.
+
+    Yields:
+        tuple: As linhas reamostradas; eventos que não são movimentos passam sem alteração.
+    """
+    last = None # Último movimento recebido da sequência atual
+    emitted_time = None # Tempo do último movimento entregue
+    grid = 0 # Próximo tempo da grade
+
+    for row in rows:
+        time_ns = row[0]
+        if row[1] != MOVE:
+            # Fim da sequência: garante o ponto final antes do clique/tecla
+            if last is not None and last[0] != emitted_time:
+                yield last
+            last = None
+            yield row
+            continue
+
+        if last is None:
+            # Início da sequência
+            yield row
+            last = row
+            emitted_time = time_ns
+            grid = time_ns + interval_ns
+            continue
+
+        last_time = last[0]
+        if time_ns - last_time >= interval_ns:
+            # Trecho esparso: mantém os pontos originais nas duas pontas
+            if last_time != emitted_time:
+                yield last
+            yield row
+            emitted_time = time_ns
+            grid = time_ns + interval_ns
+        else:
+            # Trecho denso: pontos da grade interpolados entre `last` e `row`
+            last_x, last_y = last[2], last[3]
+            span = time_ns - last_time
+            while grid <= time_ns:
+                fraction = (grid - last_time) / span
+                yield (grid, MOVE,
+                       round(last_x + (row[2] - last_x) * fraction),
+                       round(last_y + (row[3] - last_y) * fraction),
+                       0, 0, 0, 0)
+                emitted_time = grid
+                grid += interval_ns
+        last = row
+
+    if last is not None and last[0] != emitted_time:
+        yield last
@@ -0,0 +1,167 @@
+"""
+Modo de baixa variação (jitter) da reprodução
+
+Durante a reprodução a thread do player disputa a CPU com o mainloop do Tk, as
+threads dos listeners do pynput e o coletor de lixo do Python, o que aparece
+como travadas periódicas de alguns milissegundos. `LowJitter` reduz essa
+disputa enquanto uma reprodução roda:
+
+- congela (`gc.freeze`) os objetos já existentes e desativa o coletor cíclico,
+  que é process-wide e pausa todas as threads quando roda;
+- aumenta a prioridade da thread atual onde o sistema permite (Windows:
+  `SetThreadPriority`; Linux: nice da thread, que exige CAP_SYS_NICE);
+- opcionalmente fixa a thread atual em uma CPU (Linux: `sched_setaffinity`;
+  Windows: `SetThreadAffinityMask`).
+
+Tudo é desfeito em `restore()`. Cada medida que o sistema recusar é só
+registrada no log, sem impedir a reprodução; `applied` lista as que valeram.
+"""
+import gc
+import logging
+import os
+import sys
+import threading
+
+# Prioridade pedida para a thread da reprodução
+_WINDOWS_PRIORITY = 2 # THREAD_PRIORITY_HIGHEST
+_LINUX_NICE = -10
+
+_THREAD_PRIORITY_ERROR_RETURN = 0x7FFFFFFF
+
+_kernel32 = None
+
+
+def _windows_kernel32():
+    """
+    kernel32 próprio, com os tipos de cada função declarados.
+
+    Não usa o `ctypes.windll.kernel32` compartilhado pelo processo, cujos tipos
+    outras bibliotecas podem alterar (ou que um handle de 64 bits quebraria sem
+    `argtypes`).
+    """
+    global _kernel32
+    if _kernel32 is None:
+        import ctypes
+        from ctypes import wintypes
+        kernel32 = ctypes.WinDLL('kernel32', use_last_error=True)
+        kernel32.GetCurrentThread.argtypes = ()
+        kernel32.GetCurrentThread.restype = wintypes.HANDLE
+        kernel32.GetThreadPriority.argtypes = (wintypes.HANDLE,)
+        kernel32.GetThreadPriority.restype = ctypes.c_int
+        kernel32.SetThreadPriority.argtypes = (wintypes.HANDLE, ctypes.c_int)
+        kernel32.SetThreadPriority.restype = wintypes.BOOL
+        kernel32.SetThreadAffinityMask.argtypes = (wintypes.HANDLE, ctypes.c_size_t)
+        kernel32.SetThreadAffinityMask.restype = ctypes.c_size_t
+        _kernel32 = kernel32
+    return _kernel32
+
+
+def _windows_error():
+    import ctypes
+    return ctypes.WinError(ctypes.get_last_error())
+
+
+class LowJitter:
+    """
+    Ajustes de execução da thread atual durante uma reprodução.
+
+    Deve ser aplicado e desfeito na própria thread da reprodução:
+
+        with LowJitter(cpu=2) as runtime:
+            ...  # runtime.applied == ['gc', 'priority', 'cpu 2']
+    """
+    def __init__(self, cpu=None, priority=True):
+        self.cpu = cpu
+        self.priority = priority
+        self.applied = []
+        self._restore = []
+
+    def __enter__(self):
+        self.apply()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.restore()
+
+    def apply(self):
+        """Aplica os ajustes. As medidas recusadas pelo sistema são ignoradas."""
+        self._freeze_gc()
+        if self.priority:
+            self._attempt('priority', self._raise_priority)
+        if self.cpu is not None:
+            self._attempt(f'cpu {self.cpu}', self._pin_cpu)
+        logging.info(f"Modo de baixa variação: {', '.join(self.applied) or 'nenhum ajuste aplicado'}")
+
+    def restore(self):
+        """Desfaz os ajustes aplicados, na ordem inversa."""
+        while self._restore:
+            undo = self._restore.pop()
+            try:
+                undo()
+            except Exception as e:
+                logging.warning(f"Não foi possível desfazer um ajuste do modo de baixa variação: {e}")
+        self.applied = []
+
+    def _attempt(self, name, func):
+        try:
+            undo = func()
+        except Exception as e:
+            logging.warning(f"Modo de baixa variação: '{name}' não aplicado ({e})")
+            return
+        if undo is not None:
+            self._restore.append(undo)
+            self.applied.append(name)
+
+    def _freeze_gc(self):
+        was_enabled = gc.isenabled()
+        gc.freeze() # Os objetos atuais não são mais percorridos pelo coletor
+        gc.disable()
+
+        def undo():
+            gc.unfreeze()
+            if was_enabled:
+                gc.enable()
+        self._restore.append(undo)
+        self.applied.append('gc')
+
+    def _raise_priority(self):
+        """Aumenta a prioridade da thread atual. Retorna a função que desfaz, ou None se não suportado."""
+        if sys.platform == 'win32':
+            kernel32 = _windows_kernel32()
+            thread = kernel32.GetCurrentThread()
+            previous = kernel32.GetThreadPriority(thread)
+            if previous == _THREAD_PRIORITY_ERROR_RETURN:
+                raise _windows_error()
+            if previous >= _WINDOWS_PRIORITY:
+                return None
+            if not kernel32.SetThreadPriority(thread, _WINDOWS_PRIORITY):
+                raise _windows_error()
+            return lambda: kernel32.SetThreadPriority(thread, previous)
+        if sys.platform.startswith('linux'):
+            # No Linux o nice vale por thread quando recebe o id nativo dela
+            thread_id = threading.get_native_id()
+            previous = os.getpriority(os.PRIO_PROCESS, thread_id)
+            if previous <= _LINUX_NICE:
+                return None
+            os.setpriority(os.PRIO_PROCESS, thread_id, _LINUX_NICE)
+            return lambda: os.setpriority(os.PRIO_PROCESS, thread_id, previous)
+        return None
+
+    def _pin_cpu(self):
+        """Fixa a thread atual na CPU `cpu`. Retorna a função que desfaz, ou None se não suportado."""
+        cpu = self.cpu
+        if sys.platform == 'win32':
+            kernel32 = _windows_kernel32()
+            thread = kernel32.GetCurrentThread()
+            previous = kernel32.SetThreadAffinityMask(thread, 1 << cpu)
+            if not previous:
+                raise _windows_error()
+            return lambda: kernel32.SetThreadAffinityMask(thread, previous)
+        if hasattr(os, 'sched_setaffinity'):
+            # pid 0 = thread atual
+            previous = os.sched_getaffinity(0)
+            if cpu not in previous:
+                raise ValueError(f"CPU {cpu} indisponível")
+            os.sched_setaffinity(0, {cpu})
+            return lambda: os.sched_setaffinity(0, previous)
+        return None
@@ -0,0 +1,128 @@
+"""
+Resumo dos eventos em grupos para exibição
+
+Agrupa a linha do tempo em uma única passada linear:
+- movimentos do mouse consecutivos viram um grupo;
+- eventos consecutivos iguais (mesma tecla, mesmo clique...) viram um grupo
+  com contagem de repetições;
+- o restante fica como grupos de um evento só.
+
+A comparação usa uma assinatura canônica barata montada direto das colunas do
+`EventStore` (tipo, id da tecla/botão, posição...), sem formatar texto. Os
+textos de exibição são memorizados por assinatura (`LabelCache`), então cada
+tecla ou clique distinto é formatado uma única vez.
+
+O resultado é compacto (colunas de início e quantidade, mais uma assinatura
+compartilhada por grupo) e pode ser alimentado aos poucos, o que permite
+exibir listas enormes sob demanda ou ir estendendo o último grupo durante a
+gravação.
+"""
+from array import array
+from collections import namedtuple
+
+from .event_store import KEY_TYPES, MOVE, CLICK, SCROLL
+
+Group = namedtuple('Group', 'start count signature')
+
+# Assinatura dos grupos de movimentos do mouse
+MOVE_SIGNATURE = (MOVE,)
+
+
+class EventSummarizer:
+    """Agrupamento incremental dos eventos de um `EventStore`."""
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        """Descarta todos os grupos."""
+        self.starts = array('q') # Índice do primeiro evento de cada grupo
+        self.counts = array('q') # Quantidade de eventos de cada grupo
+        self.signatures = [] # Assinatura de cada grupo (objetos compartilhados)
+        self.fed = 0 # Eventos já processados
+        self._interned = {}
+
+    def __len__(self):
+        return len(self.starts)
+
+    def group(self, index):
+        """Retorna o grupo `index` como `Group(start, count, signature)`."""
+        return Group(self.starts[index], self.counts[index], self.signatures[index])
+
+    def feed(self, store, stop=None):
+        """
+        Processa os eventos de `store` ainda não vistos, até o índice `stop`.
+
+        O último grupo pode continuar crescendo na próxima chamada.
+
+        Returns:
+            int: Índice do primeiro grupo alterado (ou criado) por esta chamada.
+        """
+        start = self.fed
+        stop = len(store) if stop is None else min(stop, len(store))
+        first_changed = max(len(self.starts) - 1, 0)
+        if start >= stop:
+            return len(self.starts)
+
+        starts = self.starts
+        counts = self.counts
+        signatures = self.signatures
+        interned = self._interned
+        last = signatures[-1] if signatures else None
+        run = counts[-1] if counts else 0
+        index = start
+
+        for _, type_code, x, y, code, flag, dx, dy in store.rows(start, stop):
+            # Assinatura canônica: eventos com a mesma assinatura são exibidos iguais
+            if type_code == MOVE:
+                current = MOVE_SIGNATURE
+            elif type_code in KEY_TYPES:
+                current = (type_code, code)
+            elif type_code == CLICK:
+                current = (CLICK, code, flag, x, y)
+            else:
+                current = (SCROLL, dy > 0, x, y)
+
+            if current == last:
+                run += 1
+            else:
+                if signatures:
+                    counts[-1] = run
+                # Grupos iguais compartilham o mesmo objeto de assinatura
+                last = interned.setdefault(current, current)
+                starts.append(index)
+                counts.append(1)
+                signatures.append(last)
+                run = 1
+            index += 1
+
+        counts[-1] = run
+        self.fed = stop
+        return first_changed
+
+    def summarize(self, store):
+        """Agrupa todos os eventos de `store` de uma vez (reiniciando o resumo)."""
+        self.reset()
+        self.feed(store)
+        return self
+
+
+class LabelCache:
+    """Memoriza os textos de exibição de cada assinatura."""
+    def __init__(self, format_event):
+        """
+        Args:
+            format_event (callable): Recebe o dicionário de um evento e devolve os textos de exibição.
+        """
+        self._format_event = format_event
+        self._labels = {}
+
+    def get(self, signature, store, index):
+        """Textos de exibição do evento `index`, formatados só na primeira vez que a assinatura aparece."""
+        try:
+            return self._labels[signature]
+        except KeyError:
+            labels = self._labels[signature] = self._format_event(store.event(index))
+            return labels
+
+    def clear(self):
+        self._labels.clear()
@@ -0,0 +1,154 @@
+"""
+Medição de tempos da reprodução
+
+Quando ativada no `MacroPlayer`, cada reprodução guarda três histogramas:
+- `lateness`: atraso de cada disparo em relação ao horário previsto
+  (mostra se o sleep passou do ponto);
+- `engine`: duração de cada chamada ao motor (mostra se o motor está lento);
+- `focus`: duração de cada verificação da janela ativa.
+
+Os histogramas têm buckets logarítmicos (16 por potência de 2, erro relativo de
+no máximo ~6%), então ocupam algumas centenas de contadores não importa quantos
+eventos a macro tenha.
+"""
+import csv
+import time
+from array import array
+
+# Buckets por potência de 2 (como bits): 2**4 = 16
+_SUB_BITS = 4
+_SUB_COUNT = 1 << _SUB_BITS
+
+_NS_PER_SECOND = 1_000_000_000
+
+
+def _bucket_index(value):
+    """Índice do bucket de um valor inteiro não negativo (em ns)."""
+    if value < _SUB_COUNT:
+        return value
+    shift = value.bit_length() - _SUB_BITS - 1
+    return (shift + 1) * _SUB_COUNT + (value >> shift) - _SUB_COUNT
+
+
+def _bucket_bounds(index):
+    """Limites `[inferior, superior)` em ns do bucket `index`."""
+    if index < _SUB_COUNT:
+        return index, index + 1
+    shift = index // _SUB_COUNT - 1
+    mantissa = index % _SUB_COUNT + _SUB_COUNT
+    return mantissa << shift, (mantissa + 1) << shift
+
+
+class Histogram:
+    """Histograma compacto de durações (registradas em segundos)."""
+    def __init__(self):
+        self.counts = array('Q')
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def record(self, seconds):
+        """Registra uma duração. Valores negativos (disparo adiantado) contam como zero."""
+        if seconds < 0.0:
+            seconds = 0.0
+        index = _bucket_index(int(seconds * _NS_PER_SECOND))
+        counts = self.counts
+        if index >= len(counts):
+            counts.extend([0] * (index + 1 - len(counts)))
+        counts[index] += 1
+        self.count += 1
+        self.total += seconds
+        if seconds > self.max:
+            self.max = seconds
+
+    @property
+    def mean(self):
+        return self.total / self.count if self.count else 0.0
+
+    def percentile(self, fraction):
+        """
+        Valor (em segundos) abaixo do qual está a fração `fraction` (0 a 1) das medições.
+
+        Devolve o limite superior do bucket, sem passar do máximo medido.
+        """
+        if not self.count:
+            return 0.0
+        target = max(1, round(fraction * self.count))
+        seen = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if seen >= target:
+                return min(_bucket_bounds(index)[1] / _NS_PER_SECOND, self.max)
+        return self.max
+
+    def buckets(self):
+        """Itera pelos buckets não vazios como `(inferior, superior, quantidade)`, em segundos."""
+        for index, count in enumerate(self.counts):
+            if count:
+                lower, upper = _bucket_bounds(index)
+                yield lower / _NS_PER_SECOND, upper / _NS_PER_SECOND, count
+
+
+class RunTimings:
+    """Histogramas de uma reprodução."""
+    METRICS = ('lateness', 'engine', 'focus')
+
+    def __init__(self):
+        self.lateness = Histogram()
+        self.engine = Histogram()
+        self.focus = Histogram()
+        self.events = 0
+        self.elapsed = 0.0
+
+    def timed(self, func, histogram):
+        """Envolve `func` para registrar a duração de cada chamada em `histogram`."""
+        perf_counter = time.perf_counter
+
+        def wrapper(*args):
+            start = perf_counter()
+            try:
+                return func(*args)
+            finally:
+                histogram.record(perf_counter() - start)
+        return wrapper
+
+    def finish(self, events, elapsed):
+        """Guarda o total de eventos e a duração da reprodução."""
+        self.events = events
+        self.elapsed = elapsed
+
+    @property
+    def events_per_second(self):
+        return self.events / self.elapsed if self.elapsed else 0.0
+
+    def summary(self):
+        """Resumo da reprodução (tempos em segundos)."""
+        result = {'events': self.events, 'elapsed': self.elapsed, 'events_per_s': self.events_per_second}
+        for name in self.METRICS:
+            histogram = getattr(self, name)
+            result[name] = {
+                'count': histogram.count,
+                'mean': histogram.mean,
+                'p50': histogram.percentile(0.5),
+                'p99': histogram.percentile(0.99),
+                'max': histogram.max,
+            }
+        return result
+
+    def status_text(self):
+        """Texto curto para a barra de status."""
+        lateness = self.lateness
+        return (
+            f"atraso p50 {lateness.percentile(0.5) * 1000:.2f}ms, "
+            f"p99 {lateness.percentile(0.99) * 1000:.2f}ms, "
+            f"máx {lateness.max * 1000:.2f}ms | {self.events_per_second:.0f} ev/s"
+        )
+
+    def save_csv(self, file_path):
+        """Exporta os buckets não vazios de cada histograma (em microssegundos)."""
+        with open(file_path, 'w', newline='', encoding='utf-8') as f:
+            writer = csv.writer(f)
+            writer.writerow(('metric', 'lower_us', 'upper_us', 'count'))
+            for name in self.METRICS:
+                for lower, upper, count in getattr(self, name).buckets():
+                    writer.writerow((name, f"{lower * 1e6:.3f}", f"{upper * 1e6:.3f}", count))
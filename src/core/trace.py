@@ -0,0 +1,85 @@
+"""
+Linha do tempo de uma reprodução simulada
+
+Usada pelo motor de simulação (`engines.TraceEngine`): para cada evento guarda o
+horário previsto e o horário real do disparo, ambos em segundos desde o início
+da reprodução, junto com o tipo e os dados do evento. Pode ser exportada para
+CSV ou JSON para validar macros e medir a precisão do agendador sem injetar nada.
+"""
+import csv
+import json
+import math
+from array import array
+
+from .event_store import TYPE_NAMES
+
+CSV_HEADER = ('intended', 'actual', 'lateness_ms', 'type', 'x', 'y', 'detail')
+
+
+class Timeline:
+    """Horários previstos e reais de cada evento disparado, em colunas."""
+    def __init__(self):
+        self.clear()
+
+    def clear(self):
+        self.intended = array('d') # Segundos desde o início da reprodução
+        self.actual = array('d')
+        self.types = array('B')
+        self.xs = array('i')
+        self.ys = array('i')
+        self.details = [] # Tecla, botão e estado, rolagem...
+
+    def __len__(self):
+        return len(self.intended)
+
+    def append(self, intended, actual, type_code, x, y, detail):
+        self.intended.append(intended)
+        self.actual.append(actual)
+        self.types.append(type_code)
+        self.xs.append(x)
+        self.ys.append(y)
+        self.details.append(detail)
+
+    def rows(self):
+        """Itera pelas linhas como `(previsto, real, tipo, x, y, detalhe)`."""
+        for i in range(len(self)):
+            yield self.intended[i], self.actual[i], TYPE_NAMES[self.types[i]], self.xs[i], self.ys[i], self.details[i]
+
+    def summary(self):
+        """Estatísticas do atraso dos disparos (em segundos)."""
+        count = len(self)
+        if not count:
+            return {'events': 0, 'mean_lateness': 0.0, 'max_lateness': 0.0, 'jitter': 0.0}
+        lateness = [a - i for i, a in zip(self.intended, self.actual)]
+        mean = sum(lateness) / count
+        return {
+            'events': count,
+            'mean_lateness': mean,
+            'max_lateness': max(lateness),
+            'jitter': math.sqrt(sum((x - mean) ** 2 for x in lateness) / count), # Desvio padrão do atraso
+        }
+
+    def save(self, file_path):
+        """Exporta a linha do tempo, em JSON se o arquivo terminar em .json e em CSV caso contrário."""
+        if file_path.lower().endswith('.json'):
+            self.save_json(file_path)
+        else:
+            self.save_csv(file_path)
+
+    def save_csv(self, file_path):
+        with open(file_path, 'w', newline='', encoding='utf-8') as f:
+            writer = csv.writer(f)
+            writer.writerow(CSV_HEADER)
+            for intended, actual, type_name, x, y, detail in self.rows():
+                writer.writerow((f"{intended:.6f}", f"{actual:.6f}", f"{(actual - intended) * 1000:.3f}", type_name, x, y, detail))
+
+    def save_json(self, file_path):
+        data = {
+            'summary': self.summary(),
+            'events': [
+                {'intended': intended, 'actual': actual, 'type': type_name, 'x': x, 'y': y, 'detail': detail}
+                for intended, actual, type_name, x, y, detail in self.rows()
+            ],
+        }
+        with open(file_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, indent=4)
@@ -0,0 +1,223 @@
+"""
+Formato binário de macros (`.gmac`)
+
+Um contêiner versionado pensado para macros grandes, carregado com `mmap`:
+
+    cabeçalho (32 bytes, little-endian)
+        magic b'GMAC', versão (u16), reservado (u16), quantidade de eventos (u64),
+        quantidade de teclas (u32), quantidade de botões (u32), tamanho dos tempos (u64)
+    tabela de strings
+        teclas e depois botões, cada um como tamanho (u16) + UTF-8, com os mesmos
+        textos que o formato JSON usa ('space', "'a'", 'Button.left'...)
+    tempos
+        diferença para o evento anterior em nanossegundos, zigzag + varint
+    colunas de largura fixa
+        tipo (u8), x (i32), y (i32), id de tecla/botão (u16), pressionado (i8),
+        rolagem x (i16), rolagem y (i16)
+
+Cada seção começa alinhada em 8 bytes. As colunas de largura fixa são usadas
+direto do arquivo mapeado (sem cópia) como colunas somente leitura do
+`EventStore`; só os tempos precisam ser decodificados.
+
+A conversão JSON <-> binário não perde informação: os tempos ficam em
+nanossegundos inteiros, a mesma resolução do `EventStore`.
+"""
+import mmap
+import struct
+import sys
+from array import array
+
+from ..core.event_store import EventStore, COLUMNS
+
+MAGIC = b'GMAC'
+VERSION = 1
+
+_HEADER = struct.Struct('<4sHHQIIQ')
+_LENGTH = struct.Struct('<H')
+_ALIGNMENT = 8
+
+# Colunas de largura fixa, na ordem em que aparecem no arquivo
+_FIXED_COLUMNS = [(name, typecode) for name, typecode in COLUMNS if name != 'times']
+
+
+class BinaryFormatError(ValueError):
+    """O arquivo não é uma macro binária válida ou tem uma versão não suportada."""
+
+
+def _padding(size):
+    return -size % _ALIGNMENT
+
+
+def _encode_times(times):
+    """Codifica os tempos como diferenças zigzag + varint."""
+    out = bytearray()
+    append = out.append
+    previous = 0
+    for t in times:
+        delta = t - previous
+        previous = t
+        # Zigzag: mantém o formato sem perdas mesmo se algum evento estiver fora de ordem
+        value = (delta << 1) if delta >= 0 else ((-delta << 1) - 1)
+        while value > 0x7F:
+            append((value & 0x7F) | 0x80)
+            value >>= 7
+        append(value)
+    return out
+
+
+def _decode_times(data, count, block_size=None):
+    """
+    Decodifica `count` tempos codificados por `_encode_times`.
+
+    Yields:
+        array: Blocos consecutivos de até `block_size` tempos (um único bloco se None).
+    """
+    block_size = block_size or count
+    times = array('q', bytes(8 * min(block_size, count)))
+    previous = 0
+    value = 0
+    shift = 0
+    index = 0
+    decoded = 0
+    for byte in data:
+        value |= (byte & 0x7F) << shift
+        if byte & 0x80:
+            shift += 7
+            continue
+        if decoded == count:
+            raise BinaryFormatError("Seção de tempos corrompida.")
+        previous += (value >> 1) if not value & 1 else -((value + 1) >> 1)
+        times[index] = previous
+        index += 1
+        value = 0
+        shift = 0
+        if index == len(times):
+            yield times
+            decoded += index
+            index = 0
+            times = array('q', bytes(8 * min(block_size, count - decoded)))
+    if decoded != count:
+        raise BinaryFormatError("Seção de tempos corrompida.")
+
+
+def _column_bytes(column, typecode):
+    """Bytes little-endian de uma coluna (array ou memoryview)."""
+    if sys.byteorder == 'little' or array(typecode).itemsize == 1:
+        return column.tobytes() if hasattr(column, 'tobytes') else bytes(column)
+    swapped = array(typecode, column)
+    swapped.byteswap()
+    return swapped.tobytes()
+
+
+def save(events, file_path, serialize_key, serialize_button):
+    """
+    Salva os eventos no formato binário.
+
+    Args:
+        events (EventStore or list): Os eventos a serem salvos.
+        file_path (str): O caminho do arquivo.
+        serialize_key (callable): Converte um objeto de tecla para o texto salvo.
+        serialize_button (callable): Converte um objeto de botão para o texto salvo.
+    """
+    store = EventStore.from_events(events)
+    count = len(store)
+
+    strings = bytearray()
+    for value in [serialize_key(k) for k in store.keys] + [serialize_button(b) for b in store.buttons]:
+        encoded = value.encode('utf-8')
+        strings += _LENGTH.pack(len(encoded)) + encoded
+
+    times = _encode_times(store.times)
+
+    with open(file_path, 'wb') as f:
+        f.write(_HEADER.pack(MAGIC, VERSION, 0, count, len(store.keys), len(store.buttons), len(times)))
+        for section in (strings, times):
+            f.write(section)
+            f.write(b'\0' * _padding(len(section)))
+        for name, typecode in _FIXED_COLUMNS:
+            data = _column_bytes(getattr(store, name), typecode)
+            f.write(data)
+            f.write(b'\0' * _padding(len(data)))
+
+
+def _map(file_path):
+    """
+    Mapeia o arquivo na memória e localiza as seções.
+
+    Returns:
+        tuple: (quantidade, teclas, botões, bytes dos tempos, colunas de largura fixa)
+    """
+    with open(file_path, 'rb') as f:
+        try:
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            raise BinaryFormatError("Arquivo vazio.")
+    view = memoryview(mapped)
+
+    if len(view) < _HEADER.size:
+        raise BinaryFormatError("Cabeçalho incompleto.")
+    magic, version, _, count, key_count, button_count, times_size = _HEADER.unpack_from(view, 0)
+    if magic != MAGIC:
+        raise BinaryFormatError("Não é um arquivo de macro binária.")
+    if version != VERSION:
+        raise BinaryFormatError(f"Versão {version} do formato não suportada.")
+    offset = _HEADER.size
+
+    # Tabela de strings
+    strings = []
+    strings_start = offset
+    for _ in range(key_count + button_count):
+        (length,) = _LENGTH.unpack_from(view, offset)
+        offset += _LENGTH.size
+        strings.append(bytes(view[offset:offset + length]).decode('utf-8'))
+        offset += length
+    offset += _padding(offset - strings_start)
+
+    times_data = view[offset:offset + times_size]
+    offset += times_size + _padding(times_size)
+
+    columns = {}
+    for name, typecode in _FIXED_COLUMNS:
+        itemsize = array(typecode).itemsize
+        size = itemsize * count
+        if offset + size > len(view):
+            raise BinaryFormatError("Arquivo truncado.")
+        column = view[offset:offset + size]
+        if sys.byteorder == 'little' or itemsize == 1:
+            columns[name] = column.cast(typecode) # Sem cópia
+        else:
+            columns[name] = array(typecode, column.tobytes())
+            columns[name].byteswap()
+        offset += size + _padding(size)
+
+    return count, strings[:key_count], strings[key_count:], times_data, columns
+
+
+def load(file_path):
+    """
+    Carrega uma macro binária mapeando o arquivo na memória.
+
+    Returns:
+        EventStore: Os eventos, com as colunas de largura fixa apontando direto para o arquivo mapeado.
+    """
+    count, keys, buttons, times_data, columns = _map(file_path)
+    blocks = list(_decode_times(times_data, count))
+    columns['times'] = blocks[0] if blocks else array('q')
+    return EventStore.from_columns(columns, keys, buttons)
+
+
+def iter_chunks(file_path, chunk_size):
+    """
+    Lê uma macro binária em blocos, decodificando os tempos só do bloco atual.
+
+    Yields:
+        EventStore: Blocos consecutivos de até `chunk_size` eventos.
+    """
+    count, keys, buttons, times_data, columns = _map(file_path)
+    start = 0
+    for times in _decode_times(times_data, count, chunk_size):
+        stop = start + len(times)
+        chunk = {name: column[start:stop] for name, column in columns.items()}
+        chunk['times'] = times
+        yield EventStore.from_columns(chunk, keys, buttons)
+        start = stop
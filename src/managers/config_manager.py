@@ -11,12 +11,28 @@ DEFAULT_CONFIG = {
     "theme": "dark",
     "playback_engine": "Pynput (Padrão)",
     "record_mode": "Teclado e Mouse",
+    "move_max_rate": 0,
+    "move_min_distance": 0,
+    "stream_recording": False,
+    "stream_directory": "gravacoes",
+    "stream_playback_min_mb": 64,
+    "save_compression": "none",
     "hotkeys": {
         "record": None,
         "playback": None
     },
     "window_specific_title": "",
-    "pydirectinput_optimized_pause": True
+    "focus_max_staleness": 0.1,
+    "pydirectinput_optimized_pause": True,
+    "absolute_scheduling": True,
+    "move_playback_rate": 0,
+    "playback_batch_window_ms": 0,
+    "catch_up_skip_moves": False,
+    "catch_up_max_lag_ms": 0,
+    "playback_low_jitter": False,
+    "playback_pin_cpu": None,
+    "playback_timings": False,
+    "playback_timings_csv": False
 }
 
 def save_config(config):
@@ -4,14 +4,71 @@ Módulo de Gerenciamento de Arquivos
 Este módulo centraliza a lógica para salvar e carregar as listas de eventos
 de macro em arquivos JSON.
 
+Formatos suportados (escolhidos pela extensão):
+- `.json`: uma lista JSON com todos os eventos.
+- `.jsonl`: um evento JSON por linha, só de acréscimo. É o formato da gravação
+  direta em arquivo; um arquivo interrompido no meio (queda do app) pode ser
+  reaberto, e a última linha incompleta é ignorada.
+- `.gmac`: formato binário em colunas, carregado com `mmap` (ver `binary_format`).
+  Indicado para macros grandes.
+
+Os formatos JSON também podem ser compactados acrescentando `.gz` (zlib/gzip)
+ou `.xz` (lzma) à extensão, ex: `macro.json.gz`. A compressão e a descompressão
+acontecem em fluxo enquanto o arquivo é escrito ou lido, sem montar o conteúdo
+inteiro (compactado ou não) na memória.
+
 Responsabilidades:
 - Serializar os eventos (converter objetos para um formato salvável).
 - Desserializar os eventos (converter dados do arquivo de volta para objetos).
-- Lidar com as caixas de diálogo para salvar e abrir arquivos.
+- Lidar com as caixas de diálogo para salvar e abrir arquivos (o tkinter só é
+  importado por elas, então o resto do módulo funciona sem interface gráfica).
 """
+import contextlib
+import gzip
 import json
-from tkinter import filedialog, messagebox
-from pynput.keyboard import Key
+import logging
+import lzma
+import os
+import shutil
+import tempfile
+
+from ..core.event_store import EventStore
+from . import binary_format
+
+BINARY_EXTENSION = '.gmac'
+
+# Compressões suportadas: sufixo do arquivo -> função que abre o arquivo compactado
+COMPRESSIONS = {
+    '.gz': lambda path, mode: gzip.open(path, mode, compresslevel=6, encoding='utf-8'),
+    '.xz': lambda path, mode: lzma.open(path, mode, encoding='utf-8'),
+}
+
+# Nome da compressão na configuração -> sufixo do arquivo
+COMPRESSION_SUFFIXES = {"none": "", "zlib": ".gz", "lzma": ".xz"}
+
+# Eventos por bloco na leitura em blocos
+DEFAULT_CHUNK_SIZE = 4096
+
+# Tamanho das leituras do arquivo na leitura incremental de `.json`
+_READ_SIZE = 1 << 16
+
+FILE_TYPES = [
+    ("JSON files", "*.json"),
+    ("JSON Lines (gravação direta)", "*.jsonl"),
+    ("Macro binária", "*" + BINARY_EXTENSION),
+    ("JSON compactado", "*.json.gz *.jsonl.gz *.json.xz *.jsonl.xz"),
+    ("All files", "*.*"),
+]
+
+def _serialize_key(key_obj):
+    """Converte uma tecla para o texto salvo no arquivo."""
+    # Para objetos de tecla pynput, usamos o nome
+    if hasattr(key_obj, 'name'):
+        return key_obj.name
+    # Para caracteres (já são strings), mantemos como está
+    if isinstance(key_obj, str):
+        return key_obj
+    return str(key_obj)
 
 def _serialize_event(event):
     """Converte um único evento para um formato serializável em JSON."""
@@ -23,75 +80,301 @@ def _serialize_event(event):
         
     # Converte a tecla do teclado para string
     if 'key' in serializable_event:
-        key_obj = serializable_event['key']
-        # Para objetos de tecla pynput, usamos o nome
-        if hasattr(key_obj, 'name'):
-            serializable_event['key'] = key_obj.name
-        # Para caracteres (já são strings), mantemos como está
-        elif isinstance(key_obj, str):
-            serializable_event['key'] = key_obj
-        else:
-            serializable_event['key'] = str(key_obj)
+        serializable_event['key'] = _serialize_key(serializable_event['key'])
             
     return serializable_event
 
-def save_events_to_file(events):
+def serialize_line(event):
+    """Converte um evento para uma linha do formato `.jsonl`."""
+    return json.dumps(_serialize_event(event), ensure_ascii=False) + '\n'
+
+def _split_compression(file_path):
+    """Separa o sufixo de compressão: 'a.json.gz' -> ('a.json', '.gz')."""
+    root, suffix = os.path.splitext(file_path)
+    if suffix.lower() in COMPRESSIONS:
+        return root, suffix.lower()
+    return file_path, None
+
+def _extension(file_path):
+    return os.path.splitext(_split_compression(file_path)[0])[1].lower()
+
+def _open_text(file_path, mode):
+    """Abre o arquivo em modo texto, compactando ou descompactando em fluxo se necessário."""
+    compression = _split_compression(file_path)[1]
+    if compression:
+        return COMPRESSIONS[compression](file_path, mode + 't')
+    return open(file_path, mode, encoding='utf-8')
+
+def _is_jsonl(file_path):
+    return _extension(file_path) == '.jsonl'
+
+def _is_binary(file_path):
+    return _extension(file_path) == BINARY_EXTENSION
+
+@contextlib.contextmanager
+def _replacing(file_path):
+    """
+    Entrega um caminho temporário na pasta de `file_path` e, se a escrita terminar
+    sem erro, move o arquivo temporário por cima de `file_path`.
+
+    O nome temporário termina com o nome do destino, então a extensão e a compressão
+    continuam as mesmas.
+    """
+    directory = os.path.dirname(os.path.abspath(file_path))
+    fd, temp_path = tempfile.mkstemp(prefix='.tmp-', suffix='-' + os.path.basename(file_path), dir=directory)
+    os.close(fd)
+    try:
+        yield temp_path
+        if os.path.exists(file_path):
+            shutil.copymode(file_path, temp_path) # mkstemp cria o arquivo só para o dono
+        os.replace(temp_path, file_path)
+    except BaseException:
+        try:
+            os.remove(temp_path)
+        except OSError:
+            pass
+        raise
+
+def save_events_to_path(events, file_path):
+    """
+    Salva os eventos em `file_path`, no formato indicado pela extensão.
+
+    Args:
+        events (EventStore or list): Os eventos a serem salvos.
+        file_path (str): O caminho do arquivo.
+    """
+    binary = _is_binary(file_path)
+    if binary and _split_compression(file_path)[1]:
+        raise ValueError("O formato binário não pode ser compactado (ele é lido direto do disco com mmap).")
+
+    if isinstance(events, EventStore) and os.path.exists(file_path):
+        # Um `.gmac` carregado mantém o arquivo mapeado (e, no Windows, aberto), o que
+        # impediria substituí-lo: as colunas passam a ser cópias próprias antes
+        events.own_columns()
+
+    # O destino só é trocado quando o novo arquivo está completo: os eventos podem
+    # vir dele mesmo (um `.gmac` mapeado na memória, que truncado derrubaria o
+    # processo, ou um `StreamedMacro` ainda sendo lido)
+    with _replacing(file_path) as temp_path:
+        if binary:
+            binary_format.save(events, temp_path, _serialize_key, str)
+            return
+
+        compressed = _split_compression(file_path)[1] is not None
+        with _open_text(temp_path, 'w') as f:
+            if _is_jsonl(file_path):
+                for event in events:
+                    f.write(serialize_line(event))
+            else:
+                serializable_events = [_serialize_event(e) for e in events]
+                # Sem indentação no arquivo compactado: ninguém o lê à mão e a compressão fica mais rápida
+                json.dump(serializable_events, f, ensure_ascii=False, indent=None if compressed else 4)
+
+def load_events_from_path(file_path):
+    """
+    Carrega os eventos de `file_path`, no formato indicado pela extensão.
+
+    Args:
+        file_path (str): O caminho do arquivo.
+
+    Returns:
+        EventStore: Os eventos carregados.
+    """
+    if _is_jsonl(file_path):
+        return _load_jsonl(file_path)
+    if _is_binary(file_path):
+        return binary_format.load(file_path)
+    if _split_compression(file_path)[1]:
+        # Lê os eventos à medida que descompacta, sem guardar o texto inteiro
+        return EventStore.from_events(_iter_json_array(file_path))
+
+    with open(file_path, 'r', encoding='utf-8') as f:
+        loaded_data = json.load(f)
+
+    # A desserialização completa da tecla (para objeto) é complexa e agora
+    # é tratada pela camada de UI (`actions_display`) para exibição e pelo
+    # `player` durante a execução. Aqui, apenas garantimos que a estrutura
+    # básica seja carregada. O player e a UI saberão como lidar com as strings.
+    return EventStore.from_events(loaded_data)
+
+def _load_jsonl(file_path):
+    """Carrega um arquivo `.jsonl`, tolerando uma última linha incompleta."""
+    store = EventStore()
+    for event in _iter_jsonl(file_path):
+        try:
+            store.append(event)
+        except (KeyError, TypeError) as e:
+            logging.warning(f"Evento inválido em '{file_path}' ignorado: {e}")
+    return store
+
+def iter_events_from_path(file_path, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Lê os eventos de `file_path` em blocos, sem carregar o arquivo inteiro.
+
+    Args:
+        file_path (str): O caminho do arquivo.
+        chunk_size (int): Quantidade máxima de eventos por bloco.
+
+    Yields:
+        EventStore: Blocos consecutivos de eventos.
+    """
+    if _is_binary(file_path):
+        # O arquivo fica mapeado na memória; os blocos são fatias sem cópia
+        yield from binary_format.iter_chunks(file_path, chunk_size)
+        return
+
+    events = _iter_jsonl(file_path) if _is_jsonl(file_path) else _iter_json_array(file_path)
+    store = EventStore()
+    for event in events:
+        store.append(event)
+        if len(store) >= chunk_size:
+            yield store
+            # Os blocos compartilham as tabelas de teclas e botões (como as fatias do `.gmac`),
+            # então o mesmo id é a mesma tecla em todos eles
+            store = store[0:0]
+    if len(store):
+        yield store
+
+def _iter_jsonl(file_path):
+    """Itera pelos eventos de um `.jsonl`, tolerando uma última linha incompleta."""
+    with _open_text(file_path, 'r') as f:
+        for line_number, line in enumerate(f, start=1):
+            if not line.strip():
+                continue
+            try:
+                event = json.loads(line)
+            except ValueError as e:
+                # Uma linha cortada só é esperada no fim de um arquivo interrompido
+                logging.warning(f"Linha {line_number} inválida em '{file_path}' ignorada: {e}")
+                continue
+            yield event
+
+def _iter_json_array(file_path):
+    """Itera pelos objetos de um arquivo `.json` com uma lista, lendo aos poucos."""
+    decoder = json.JSONDecoder()
+    with _open_text(file_path, 'r') as f:
+        buffer = f.read(_READ_SIZE)
+        position = 0
+        started = False
+        while True:
+            # Pula espaços, o '[' inicial e as vírgulas entre os objetos
+            while position < len(buffer) and buffer[position] in ' \t\r\n,[':
+                if buffer[position] == '[':
+                    started = True
+                position += 1
+            if position < len(buffer) and buffer[position] == ']':
+                return
+            if position < len(buffer) and not started:
+                raise ValueError(f"'{file_path}' não contém uma lista de eventos.")
+            try:
+                event, end = decoder.raw_decode(buffer, position)
+            except ValueError:
+                # Objeto incompleto no fim do buffer: lê mais e tenta de novo
+                more = f.read(_READ_SIZE)
+                if not more:
+                    if buffer[position:].strip():
+                        raise
+                    return
+                buffer = buffer[position:] + more
+                position = 0
+                continue
+            yield event
+            position = end
+
+class StreamedMacro:
+    """
+    Macro que continua no arquivo e é lida em blocos durante a reprodução.
+
+    Usada para arquivos grandes: nada é carregado até a reprodução, e a memória
+    fica limitada pelos blocos em uso.
+    """
+    def __init__(self, file_path, chunk_size=DEFAULT_CHUNK_SIZE):
+        self.file_path = file_path
+        self.chunk_size = chunk_size
+
+    def __bool__(self):
+        return True
+
+    def chunks(self):
+        """Retorna um iterador novo pelos blocos de eventos do arquivo."""
+        return iter_events_from_path(self.file_path, self.chunk_size)
+
+    def __iter__(self):
+        for chunk in self.chunks():
+            yield from chunk
+
+def convert_file(source_path, target_path):
+    """
+    Converte uma macro entre formatos (ex: `.json` -> `.gmac`), sem perder eventos.
+
+    Returns:
+        int: Quantidade de eventos convertidos.
+    """
+    events = load_events_from_path(source_path)
+    save_events_to_path(events, target_path)
+    return len(events)
+
+def save_events_to_file(events, compression="none"):
     """
     Abre uma caixa de diálogo para salvar eventos em um arquivo JSON.
 
     Args:
-        events (list): A lista de eventos gravados.
+        events (EventStore or list): Os eventos gravados.
+        compression (str): Compressão sugerida no nome do arquivo ("none", "zlib" ou "lzma").
     
     Returns:
         bool: True se o arquivo foi salvo com sucesso, False caso contrário.
     """
+    from tkinter import filedialog, messagebox
+
     if not events:
         messagebox.showwarning("Aviso", "Nenhuma ação gravada para salvar.")
         return False
 
     file_path = filedialog.asksaveasfilename(
-        defaultextension=".json",
-        filetypes=[("JSON files", "*.json"), ("All files", "*.*")]
+        defaultextension=".json" + COMPRESSION_SUFFIXES.get(compression, ""),
+        filetypes=FILE_TYPES
     )
     
     if not file_path:
         return False
 
     try:
-        serializable_events = [_serialize_event(e) for e in events]
-        with open(file_path, 'w', encoding='utf-8') as f:
-            json.dump(serializable_events, f, ensure_ascii=False, indent=4)
+        save_events_to_path(events, file_path)
         messagebox.showinfo("Sucesso", "Ações gravadas salvas com sucesso.")
         return True
     except Exception as e:
         messagebox.showerror("Erro", f"Não foi possível salvar as ações: {e}")
         return False
 
-def load_events_from_file():
+def load_events_from_file(stream_min_bytes=None):
     """
     Abre uma caixa de diálogo para carregar eventos de um arquivo JSON.
 
+    Args:
+        stream_min_bytes (int, opcional): A partir deste tamanho o arquivo não é
+            carregado; devolve um `StreamedMacro` que será lido em blocos na reprodução.
+
     Returns:
-        list or None: A lista de eventos carregados ou None se a operação falhar ou for cancelada.
+        EventStore or StreamedMacro or None: Os eventos carregados ou None se a operação falhar ou for cancelada.
     """
+    from tkinter import filedialog, messagebox
+
     file_path = filedialog.askopenfilename(
-        filetypes=[("JSON files", "*.json"), ("All files", "*.*")]
+        filetypes=FILE_TYPES
     )
 
     if not file_path:
         return None
 
     try:
-        with open(file_path, 'r', encoding='utf-8') as f:
-            loaded_data = json.load(f)
-        
-        # A desserialização completa da tecla (para objeto) é complexa e agora
-        # é tratada pela camada de UI (`actions_display`) para exibição e pelo
-        # `player` durante a execução. Aqui, apenas garantimos que a estrutura
-        # básica seja carregada. O player e a UI saberão como lidar com as strings.
+        if stream_min_bytes and os.path.getsize(file_path) >= stream_min_bytes:
+            return StreamedMacro(file_path)
+
+        events = load_events_from_path(file_path)
 
         messagebox.showinfo("Sucesso", "Ações carregadas com sucesso.")
-        return loaded_data
+        return events
     except Exception as e:
         messagebox.showerror("Erro", f"Não foi possível carregar as ações: {e}")
         return None
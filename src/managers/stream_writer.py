@@ -0,0 +1,98 @@
+"""
+Gravação direta em arquivo
+
+O `StreamWriter` recebe lotes de eventos da thread consumidora do gravador e os
+escreve em uma thread de fundo num arquivo `.jsonl` novo, só de acréscimo. Cada escrita
+junta um número limitado de lotes, e o arquivo é sincronizado com o disco
+(`fsync`) periodicamente, então uma queda do app perde no máximo os últimos
+instantes da gravação. A memória fica limitada pela fila de lotes pendentes.
+"""
+import os
+import queue
+import logging
+import threading
+import time
+
+from .file_manager import serialize_line
+
+# Intervalo (em segundos) entre sincronizações do arquivo com o disco
+FSYNC_INTERVAL = 1.0
+
+# Máximo de lotes esperando na fila e de eventos juntados em uma única escrita
+MAX_PENDING_BATCHES = 64
+MAX_EVENTS_PER_WRITE = 4096
+
+
+class StreamWriter:
+    """
+    Escreve lotes de eventos em um arquivo `.jsonl` em segundo plano.
+
+    O arquivo precisa ser novo (`FileExistsError` se já existir): acrescentar a um
+    `.jsonl` existente criaria uma segunda linha do tempo começando do zero.
+    """
+    def __init__(self, file_path, fsync_interval=FSYNC_INTERVAL):
+        self.file_path = file_path
+        self.fsync_interval = fsync_interval
+        self.written = 0 # Eventos já escritos no arquivo
+        self.error = None
+        self._file = open(file_path, 'x', encoding='utf-8')
+        self._queue = queue.Queue(maxsize=MAX_PENDING_BATCHES)
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def submit(self, batch):
+        """
+        Enfileira um lote de eventos para escrita. Bloqueia se a fila estiver cheia,
+        segurando o consumidor (e não a thread do hook) até o disco alcançar.
+        """
+        if len(batch):
+            self._queue.put(batch)
+
+    def close(self):
+        """Escreve o que falta, sincroniza com o disco e fecha o arquivo."""
+        if self._thread is None:
+            return
+        self._queue.put(None)
+        self._thread.join()
+        self._thread = None
+
+    def _run(self):
+        """Alvo da thread de escrita."""
+        last_sync = time.monotonic()
+        finished = False
+        while not finished:
+            batches = [self._queue.get()]
+            # Junta os lotes que já estiverem esperando, até o limite por escrita
+            count = len(batches[0]) if batches[0] is not None else 0
+            while count < MAX_EVENTS_PER_WRITE:
+                try:
+                    batch = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                batches.append(batch)
+                if batch is not None:
+                    count += len(batch)
+
+            if None in batches:
+                finished = True
+                batches = [b for b in batches if b is not None]
+
+            try:
+                if batches:
+                    self._file.write(''.join(serialize_line(e) for batch in batches for e in batch))
+                    self._file.flush()
+                    self.written += count
+                now = time.monotonic()
+                if finished or now - last_sync >= self.fsync_interval:
+                    os.fsync(self._file.fileno())
+                    last_sync = now
+            except OSError as e:
+                # Continua consumindo a fila para não travar o gravador
+                if self.error is None:
+                    logging.error(f"Erro ao gravar em '{self.file_path}': {e}")
+                self.error = e
+
+        try:
+            self._file.close()
+        except OSError as e:
+            logging.error(f"Erro ao fechar '{self.file_path}': {e}")
@@ -1,5 +1,127 @@
-import pygetwindow as gw
 import logging
+import threading
+import time
+
+# Títulos das janelas do nosso aplicativo a serem ignoradas
+APP_TITLES = {"Gravador de Macro", "Gravador de ações", "Configurações", ""}
+
+# Idade máxima padrão (em segundos) do estado da janela ativa antes de ser consultado de novo
+DEFAULT_MAX_STALENESS = 0.1
+
+
+class FocusSnapshot:
+    """Estado imutável da janela ativa em um instante."""
+    __slots__ = ('title', 'title_lower', 'timestamp')
+
+    def __init__(self, title, timestamp):
+        self.title = title
+        self.title_lower = title.lower() if title else ""
+        self.timestamp = timestamp
+
+
+class FocusTracker:
+    """
+    Acompanha a janela ativa em uma thread de fundo.
+
+    A thread consulta o pygetwindow periodicamente e publica um `FocusSnapshot`
+    compartilhado, de modo que verificar a janela ativa durante a reprodução é só
+    a leitura de um atributo. Se o snapshot ficar mais velho que `max_staleness`
+    (thread atrasada ou parada), ele é atualizado na hora pelo chamador.
+    Também guarda a última janela ativa que não pertence ao app.
+
+    Se o pygetwindow falhar (plataforma sem suporte), o erro é registrado uma vez e
+    o acompanhamento fica desativado: consultar de novo só repetiria o erro.
+    """
+    def __init__(self, max_staleness=DEFAULT_MAX_STALENESS):
+        self.max_staleness = max_staleness
+        self.snapshot = None
+        self.last_foreign_title = None
+        self._stop_event = threading.Event()
+        self._thread = None
+        self._unsupported = False
+
+    @property
+    def is_running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self, max_staleness=None):
+        """Inicia a thread de acompanhamento (ou só atualiza o limite se já estiver rodando)."""
+        if max_staleness is not None:
+            self.max_staleness = max_staleness
+        if self.is_running or self._unsupported:
+            return
+        self._stop_event.clear()
+        if not self._poll():
+            return
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Para a thread de acompanhamento."""
+        self._stop_event.set()
+        if self._thread and self._thread.is_alive():
+            self._thread.join(timeout=0.5)
+        self._thread = None
+
+    def _run(self):
+        """Alvo da thread, consulta a janela ativa com metade do limite de idade como intervalo."""
+        while not self._stop_event.wait(self.max_staleness / 2):
+            if not self._poll():
+                return
+
+    def _poll(self):
+        """Publica a janela ativa. Retorna False e desativa o acompanhamento se o pygetwindow falhar."""
+        try:
+            title = _read_active_window_title()
+        except Exception as e:
+            logging.warning(f"Acompanhamento da janela ativa desativado: {e}")
+            self._unsupported = True
+            return False
+        self._publish(title)
+        return True
+
+    def refresh(self):
+        """Consulta a janela ativa agora e publica um novo snapshot."""
+        return self._publish(get_active_window_title())
+
+    def _publish(self, title):
+        if title not in APP_TITLES and title is not None:
+            self.last_foreign_title = title
+        snapshot = FocusSnapshot(title, time.monotonic())
+        self.snapshot = snapshot
+        return snapshot
+
+    def current(self):
+        """Retorna o snapshot atual, atualizando-o se estiver mais velho que o limite."""
+        snapshot = self.snapshot
+        if snapshot is None or time.monotonic() - snapshot.timestamp > self.max_staleness:
+            snapshot = self.refresh()
+        return snapshot
+
+
+# Instância compartilhada pelo app e pelo player
+focus_tracker = FocusTracker()
+
+
+def start_focus_tracking(max_staleness=DEFAULT_MAX_STALENESS):
+    """Inicia o acompanhamento de foco em segundo plano."""
+    focus_tracker.start(max_staleness)
+
+
+def stop_focus_tracking():
+    """Para o acompanhamento de foco em segundo plano."""
+    focus_tracker.stop()
+
+
+def _read_active_window_title():
+    """Como `get_active_window_title`, mas deixa passar os erros do pygetwindow."""
+    import pygetwindow as gw # Importado só quando usado: não suporta todas as plataformas
+    active_window = gw.getActiveWindow()
+    return active_window.title if active_window else None
+
+
+_failure_logged = False
+
 
 def get_active_window_title():
     """
@@ -8,13 +130,15 @@ def get_active_window_title():
     Returns:
         str or None: O título da janela ativa ou None se não houver nenhuma
     """
+    global _failure_logged
     try:
-        active_window = gw.getActiveWindow()
-        if active_window:
-            return active_window.title
+        return _read_active_window_title()
     except Exception as e:
-        # pygetwindow pode lançar exceções em alguns ambientes
-        logging.warning(f"Não foi possível obter a janela ativa: {e}")
+        # pygetwindow pode lançar exceções em alguns ambientes, e a cada consulta:
+        # o erro só é registrado na primeira
+        if not _failure_logged:
+            _failure_logged = True
+            logging.warning(f"Não foi possível obter a janela ativa: {e}")
     return None
 
 def get_last_active_window_title():
@@ -24,10 +148,13 @@ def get_last_active_window_title():
     Returns:
         str or None: O título da janela ou None se não encontrar uma adequada.
     """
-    try:
-        # Títulos das janelas do nosso aplicativo a serem ignoradas
-        app_titles = {"Gravador de Macro", "Configurações", ""}
+    # Com o acompanhamento ativo, a última janela de fora do app já é conhecida
+    if focus_tracker.is_running and focus_tracker.last_foreign_title:
+        return focus_tracker.last_foreign_title
+
+    import pygetwindow as gw
 
+    try:
         # gw.getAllWindows() retorna uma lista de objetos de janela
         all_windows = gw.getAllWindows()
 
@@ -40,7 +167,7 @@ def get_last_active_window_title():
                 continue
             
             # Ignora janelas sem título ou que pertencem ao app
-            if window.title in app_titles:
+            if window.title in APP_TITLES:
                 continue
 
             # Ignora janelas minimizadas, pois provavelmente não são o alvo
@@ -72,6 +199,10 @@ def is_window_active(title):
     if not title:
         # Se nenhum título for especificado, a verificação sempre passa.
         return True
+
+    # Usa o snapshot compartilhado quando o acompanhamento está ativo
+    if focus_tracker.is_running:
+        return title.lower() in focus_tracker.current().title_lower
         
     active_title = get_active_window_title()
     if active_title:
@@ -1,7 +1,21 @@
+import os
 import tkinter as tk
+from collections import deque
 from tkinter import ttk
 from pynput.keyboard import Key
 
+from ..core.event_store import EventStore
+from ..core.summarizer import EventSummarizer, LabelCache, MOVE_SIGNATURE
+
+# Linhas inseridas por página (grupos no nível de cima ou filhos de um grupo)
+PAGE_SIZE = 500
+
+# Eventos processados por vez pelo resumo enquanto uma página é montada
+FEED_CHUNK = 8192
+
+# Intervalo (em ms) entre as atualizações da lista durante a gravação (~15 quadros/s)
+LIVE_FRAME_MS = 66
+
 class ActionsDisplay:
     """
     Gerencia a criação e atualização da área de exibição de ações gravadas
@@ -32,6 +46,26 @@ class ActionsDisplay:
         
         self.tree.pack(fill=tk.BOTH, expand=True)
         scrollbar.config(command=self.tree.yview)
+        self.tree.bind('<<TreeviewOpen>>', self._on_open)
+        self.tree.bind('<<TreeviewSelect>>', self._on_select)
+
+        # Estado da exibição virtual (ver update)
+        self._store = None
+        self._summary = None
+        self._labels = None
+        self._next_group = 0 # Próximo grupo a ser inserido no nível de cima
+        self._lazy_children = {} # Grupo ainda fechado -> (início, fim, assinatura) dos filhos
+        self._more_rows = {} # Linha "Mostrar mais" -> (pai, próxima faixa ou None para grupos)
+
+        # Estado da exibição ao vivo (ver begin_live)
+        self._live = False
+        self._live_job = None
+        self._incoming = deque() # Lotes recebidos da thread do gravador
+        self._live_tail = None # Último grupo: [assinatura, quantidade, início, fim, textos]
+        self._tail_item = None # Linha do último grupo, que ainda pode crescer
+        self._live_rows = deque() # Linhas dos grupos na tela, da mais antiga para a mais nova
+        self._live_hidden = 0 # Grupos que saíram da tela durante a gravação
+        self._live_hidden_item = None # Linha com a quantidade de grupos que saíram
 
         # Mapeamento de nomes de teclas para exibição amigável
         self.KEY_NAME_MAP = {
@@ -55,103 +89,242 @@ class ActionsDisplay:
         }
 
     def clear(self):
-        """Limpa todos os itens do Treeview."""
-        for item in self.tree.get_children():
-            self.tree.delete(item)
+        """Limpa todos os itens do Treeview de uma vez."""
+        if self._live_job is not None:
+            self.tree.after_cancel(self._live_job)
+            self._live_job = None
+        self._live = False
+        self._incoming.clear()
+        self.tree.delete(*self.tree.get_children())
+        self._store = None
+        self._summary = None
+        self._labels = None
+        self._next_group = 0
+        self._lazy_children = {}
+        self._more_rows = {}
+        self._live_tail = None
+        self._tail_item = None
+        self._live_rows = deque()
+        self._live_hidden = 0
+        self._live_hidden_item = None
+
+    def show_streamed(self, file_path):
+        """Mostra uma macro que será lida em blocos direto do arquivo, sem listar os eventos."""
+        self.clear()
+        self.tree.insert('', tk.END, values=("-", "Arquivo grande", f"{os.path.basename(file_path)} (lido durante a reprodução)"))
 
-    def add_action(self, action_text):
+    # Lista ao vivo durante a gravação
+
+    def begin_live(self):
         """
-        Este método não é usado com a lógica de agrupamento do Treeview,
-        pois a atualização é feita em lote.
+        Começa a exibição ao vivo de uma gravação.
+
+        Os lotes recebidos por `append_events` (de qualquer thread) são aplicados
+        pela thread da interface em um ritmo fixo (`LIVE_FRAME_MS`): o último grupo
+        é estendido no lugar (mais movimentos, mais repetições) e só grupos novos
+        viram linhas novas.
+
+        Os lotes são descartados depois de resumidos: só o último grupo (assinatura,
+        quantidade e tempos) fica guardado, então a memória não cresce com a duração
+        da gravação (importante na gravação direta em arquivo). Ficam na tela no máximo
+        `PAGE_SIZE` grupos, os mais recentes, sem filhos; a lista completa é montada
+        em `end_live`.
+        """
+        self.clear()
+        self._summary = EventSummarizer()
+        self._labels = LabelCache(self._format_event)
+        self._live = True
+        self._incoming.clear()
+        self._schedule_live_refresh()
+
+    def append_events(self, batch):
+        """Enfileira um lote de eventos gravados. Pode ser chamado da thread do gravador."""
+        self._incoming.append(batch)
+
+    def end_live(self, events):
         """
-        pass # Não faz nada, a atualização é feita via update()
+        Termina a exibição ao vivo e mostra a gravação final como uma lista normal.
+
+        Args:
+            events (EventStore or list): Os eventos finais da gravação.
+        """
+        self._live = False
+        self._incoming.clear()
+        self.update(events) # Também cancela o timer da lista ao vivo
+
+    def _schedule_live_refresh(self):
+        self._live_job = self.tree.after(LIVE_FRAME_MS, self._live_refresh)
+
+    def _live_refresh(self):
+        """Aplica os lotes recebidos desde o último quadro."""
+        self._live_job = None
+        if not self._live:
+            return
+        self._apply_incoming()
+        self._schedule_live_refresh()
+
+    def _apply_incoming(self):
+        """Resume os lotes pendentes e atualiza só os grupos alterados."""
+        incoming = self._incoming
+        if not incoming:
+            return
+        summary = self._summary
+        labels = self._labels
+        tail = self._live_tail
+        changed = [tail] if tail is not None else []
+        while incoming:
+            batch = incoming.popleft()
+            # Os lotes compartilham as tabelas de teclas e botões do gravador, então as
+            # assinaturas de lotes diferentes podem ser comparadas
+            summary.summarize(batch)
+            for index in range(len(summary)):
+                start, count, signature = summary.group(index)
+                end_time = batch.time_at(start + count - 1)
+                if index == 0 and tail is not None and signature == tail[0]:
+                    # Continuação do último grupo do lote anterior
+                    tail[1] += count
+                    tail[3] = end_time
+                    continue
+                group_labels = None if signature == MOVE_SIGNATURE else labels.get(signature, batch, start)
+                tail = [signature, count, batch.time_at(start), end_time, group_labels]
+                changed.append(tail)
+        summary.reset()
+
+        if self._tail_item is not None:
+            # O primeiro alterado é o grupo que já estava na tela
+            self.tree.item(self._tail_item, values=self._row_values(*changed.pop(0)))
+        live_rows = self._live_rows
+        skipped = max(len(changed) - PAGE_SIZE, 0)
+        self._live_hidden += skipped
+        for group in changed[skipped:]:
+            self._tail_item = self.tree.insert('', tk.END, values=self._row_values(*group))
+            live_rows.append(self._tail_item)
+        self._live_tail = tail
+
+        # Só os `PAGE_SIZE` grupos mais recentes ficam na tela durante a gravação
+        if len(live_rows) > PAGE_SIZE:
+            old_rows = [live_rows.popleft() for _ in range(len(live_rows) - PAGE_SIZE)]
+            self._live_hidden += len(old_rows)
+            self.tree.delete(*old_rows)
+        if self._live_hidden:
+            values = ("...", "Grupos anteriores", f"{self._live_hidden} (lista completa ao parar)")
+            if self._live_hidden_item is None:
+                self._live_hidden_item = self.tree.insert('', 0, values=values)
+            else:
+                self.tree.item(self._live_hidden_item, values=values)
+        if self._tail_item is not None:
+            self.tree.see(self._tail_item)
 
     def update(self, events):
         """
         Atualiza o Treeview com uma lista completa de eventos, agrupando
         os movimentos do mouse.
 
+        A exibição é virtual: só a primeira página de grupos é criada, os filhos
+        de um grupo são inseridos quando ele é aberto e listas longas terminam em
+        uma linha "Mostrar mais" que carrega a próxima página ao ser selecionada.
+        Os grupos vêm do `EventSummarizer`, alimentado só até onde a página precisa,
+        então o tempo até a primeira exibição não depende do tamanho da macro.
+
         Args:
-            events (list): A lista de dicionários de eventos a serem exibidos.
+            events (EventStore or list): Os eventos a serem exibidos.
         """
         self.clear()
         if not events:
             return
 
-        i = 0
-        while i < len(events):
-            event = events[i]
-            
-            # Tenta agrupar eventos consecutivos idênticos (que não sejam 'move')
-            if i + 1 < len(events) and event.get('type') != 'move':
-                
-                # Formata o evento atual para ver como ele é
-                action_str, details_str = self._format_event(event)
-                
-                # Conta quantos eventos seguintes são idênticos
-                count = 1
-                j = i + 1
-                while j < len(events):
-                    next_action_str, next_details_str = self._format_event(events[j])
-                    if events[j].get('type') != 'move' and action_str == next_action_str and details_str == next_details_str:
-                        count += 1
-                        j += 1
-                    else:
-                        break
-                
-                # Se houver mais de um evento igual, cria um grupo
-                if count > 1:
-                    start_time = event.get('time', 0)
-                    
-                    # Cria o nó pai para o grupo
-                    parent_id = self.tree.insert(
-                        '', 
-                        tk.END, 
-                        values=(f"{start_time:.2f}s", f"{action_str} [x{count}]", details_str)
-                    )
-                    
-                    # Adiciona cada evento repetido como um filho
-                    for k in range(i, i + count):
-                        repeated_event = events[k]
-                        time_str = f"[{repeated_event.get('time', 0):.2f}s]"
-                        rep_action, rep_details = self._format_event(repeated_event)
-                        self.tree.insert(parent_id, tk.END, values=(time_str, rep_action, rep_details))
-                    
-                    i += count # Pula todos os eventos que foram agrupados
-                    continue # Volta para o início do loop
-
-            # Se for um evento de movimento, agrupa com os próximos
-            if event.get('type') == 'move':
-                move_group = []
-                start_time = event.get('time', 0)
-                
-                # Coleta todos os eventos 'move' consecutivos
-                while i < len(events) and events[i].get('type') == 'move':
-                    move_group.append(events[i])
-                    i += 1
-                
-                end_time = move_group[-1].get('time', 0)
-                duration = end_time - start_time
-                
-                # Cria o nó pai para o grupo de movimentos
-                parent_id = self.tree.insert(
-                    '', 
-                    tk.END, 
-                    values=(f"{start_time:.2f}s", "Mover Mouse", f"{len(move_group)} movimentos em {duration:.2f}s")
-                )
-                
-                # Adiciona cada movimento como um filho do nó pai
-                for move_event in move_group:
-                    time_str = f"[{move_event.get('time', 0):.2f}s]"
-                    pos_str = f"Para: {move_event.get('pos')}"
-                    self.tree.insert(parent_id, tk.END, values=(time_str, "Moveu", pos_str))
-            
+        self._store = EventStore.from_events(events)
+        self._summary = EventSummarizer()
+        self._labels = LabelCache(self._format_event)
+        self._next_group = 0
+        self._insert_group_page()
+
+    def _feed_until(self, group_count):
+        """Alimenta o resumo até ter `group_count` grupos (ou acabarem os eventos)."""
+        summary = self._summary
+        store = self._store
+        while len(summary) < group_count and summary.fed < len(store):
+            summary.feed(store, summary.fed + FEED_CHUNK)
+
+    def _insert_group_page(self):
+        """Insere a próxima página de grupos no nível de cima."""
+        first = self._next_group
+        # Um grupo a mais garante que o último da página não cresce depois de exibido
+        self._feed_until(first + PAGE_SIZE + 1)
+        summary = self._summary
+        stop = min(first + PAGE_SIZE, len(summary))
+        for index in range(first, stop):
+            start, count, signature = summary.group(index)
+            values, has_children = self._group_values(start, count, signature)
+            item_id = self.tree.insert('', tk.END, values=values)
+            if has_children:
+                # Filho provisório só para o grupo mostrar o botão de expandir
+                self.tree.insert(item_id, tk.END, values=("", "", ""))
+                self._lazy_children[item_id] = (start, start + count, signature)
+        self._next_group = stop
+        if stop < len(summary):
+            self._add_more_row('', None)
+
+    def _group_values(self, start, count, signature):
+        """Valores da linha de um grupo e se ele tem filhos."""
+        store = self._store
+        if signature == MOVE_SIGNATURE:
+            values = self._row_values(signature, count, store.time_at(start), store.time_at(start + count - 1), None)
+            return values, True
+        labels = self._labels.get(signature, store, start)
+        return self._row_values(signature, count, store.time_at(start), None, labels), count > 1
+
+    def _row_values(self, signature, count, start_time, end_time, labels):
+        """Valores da linha de um grupo (`end_time` só é usado nos movimentos)."""
+        if signature == MOVE_SIGNATURE:
+            return (f"{start_time:.2f}s", "Mover Mouse", f"{count} movimentos em {end_time - start_time:.2f}s")
+        action_str, details_str = labels
+        if count > 1:
+            return (f"{start_time:.2f}s", f"{action_str} [x{count}]", details_str)
+        return (f"{start_time:.2f}s", action_str, details_str)
+
+    def _insert_child_page(self, parent_id, start, stop, signature):
+        """Insere uma página de eventos de um grupo aberto."""
+        store = self._store
+        end = min(start + PAGE_SIZE, stop)
+        if signature == MOVE_SIGNATURE:
+            xs, ys = store.xs, store.ys
+            for k in range(start, end):
+                self.tree.insert(parent_id, tk.END, values=(f"[{store.time_at(k):.2f}s]", "Moveu", f"Para: {(xs[k], ys[k])}"))
+        else:
+            # Todos os eventos do grupo têm a mesma assinatura, então os textos são os mesmos
+            action_str, details_str = self._labels.get(signature, store, start)
+            for k in range(start, end):
+                self.tree.insert(parent_id, tk.END, values=(f"[{store.time_at(k):.2f}s]", action_str, details_str))
+        if end < stop:
+            self._add_more_row(parent_id, (end, stop, signature), stop - end)
+
+    def _add_more_row(self, parent_id, next_range, remaining=None):
+        details = f"{remaining} restantes" if remaining is not None else ""
+        row_id = self.tree.insert(parent_id, tk.END, values=("...", "Mostrar mais", details))
+        self._more_rows[row_id] = (parent_id, next_range)
+
+    def _on_open(self, event):
+        """Insere os filhos de um grupo na primeira vez que ele é aberto."""
+        item_id = self.tree.focus()
+        child_range = self._lazy_children.pop(item_id, None)
+        if child_range is None:
+            return
+        self.tree.delete(*self.tree.get_children(item_id))
+        self._insert_child_page(item_id, *child_range)
+
+    def _on_select(self, event):
+        """Carrega a próxima página quando uma linha "Mostrar mais" é selecionada."""
+        for row_id in self.tree.selection():
+            more = self._more_rows.pop(row_id, None)
+            if more is None:
+                continue
+            parent_id, next_range = more
+            self.tree.delete(row_id)
+            if next_range is None:
+                self._insert_group_page()
             else:
-                # Para outros tipos de evento (ou eventos únicos), adiciona uma linha normal
-                time_str = f"{event.get('time', 0):.2f}s"
-                action_str, details_str = self._format_event(event)
-                self.tree.insert('', tk.END, values=(time_str, action_str, details_str))
-                i += 1
+                self._insert_child_page(parent_id, *next_range)
 
     def _deserialize_key(self, key_data):
         """Converte uma string de volta para um objeto de tecla pynput, se necessário."""
@@ -5,6 +5,7 @@ import tkinter as tk
 from tkinter import ttk, messagebox
 from pynput.keyboard import Listener, Key
 
+from ..core import engines
 from ..managers import window_manager
 from ..utils import resource_path
 
@@ -17,7 +18,7 @@ class SettingsWindow(tk.Toplevel):
             self.iconbitmap(resource_path('img/icon.ico'))
         except tk.TclError:
             print("Aviso: O arquivo de ícone para a janela de configurações não foi encontrado.")
-        self.geometry("480x600")
+        self.geometry("480x640")
         self.parent = parent
         self.config = config
         self.original_theme = self.config.get("theme", "dark") # Salva o tema original
@@ -29,12 +30,33 @@ class SettingsWindow(tk.Toplevel):
         self.theme_map = {"Escuro": "dark", "Claro": "light"}
         self.reverse_theme_map = {v: k for k, v in self.theme_map.items()}
 
+        # Mapeamento de compressão dos arquivos salvos
+        self.compression_map = {"Nenhuma (.json)": "none", "zlib (.json.gz)": "zlib", "lzma (.json.xz)": "lzma"}
+        self.reverse_compression_map = {v: k for k, v in self.compression_map.items()}
+
         # Variáveis de UI 
         self.theme_var = tk.StringVar(value=self.reverse_theme_map.get(self.original_theme))
         self.record_mode_var = tk.StringVar(value=self.config.get("record_mode", "Teclado e Mouse"))
+        self.move_max_rate_var = tk.StringVar(value=str(self.config.get("move_max_rate", 0)))
+        self.move_min_distance_var = tk.StringVar(value=str(self.config.get("move_min_distance", 0)))
+        self.stream_recording_var = tk.BooleanVar(value=self.config.get("stream_recording", False))
+        self.stream_directory_var = tk.StringVar(value=self.config.get("stream_directory", "gravacoes"))
+        self.save_compression_var = tk.StringVar(value=self.reverse_compression_map.get(self.config.get("save_compression", "none"), "Nenhuma (.json)"))
         self.playback_engine_var = tk.StringVar(value=self.config.get("playback_engine"))
         self.pydirectinput_pause_var = tk.BooleanVar(value=self.config.get("pydirectinput_optimized_pause", True))
+        self.absolute_scheduling_var = tk.BooleanVar(value=self.config.get("absolute_scheduling", True))
+        self.stream_playback_min_mb_var = tk.StringVar(value=str(self.config.get("stream_playback_min_mb", 64)))
+        self.move_playback_rate_var = tk.StringVar(value=str(self.config.get("move_playback_rate", 0)))
+        self.batch_window_var = tk.StringVar(value=str(self.config.get("playback_batch_window_ms", 0)))
+        self.catch_up_skip_moves_var = tk.BooleanVar(value=self.config.get("catch_up_skip_moves", False))
+        self.catch_up_max_lag_var = tk.StringVar(value=str(self.config.get("catch_up_max_lag_ms", 0)))
+        self.low_jitter_var = tk.BooleanVar(value=self.config.get("playback_low_jitter", False))
+        pin_cpu = self.config.get("playback_pin_cpu")
+        self.pin_cpu_var = tk.StringVar(value="" if pin_cpu is None else str(pin_cpu))
+        self.playback_timings_var = tk.BooleanVar(value=self.config.get("playback_timings", False))
+        self.playback_timings_csv_var = tk.BooleanVar(value=self.config.get("playback_timings_csv", False))
         self.window_title_var = tk.StringVar(value=self.config.get("window_specific_title", ""))
+        self.focus_staleness_var = tk.StringVar(value=str(self.config.get("focus_max_staleness", 0.1)))
         self.record_hotkey_var = tk.StringVar(value=self._format_key_for_display(self.config["hotkeys"].get("record")))
         self.playback_hotkey_var = tk.StringVar(value=self._format_key_for_display(self.config["hotkeys"].get("playback")))
         
@@ -50,8 +72,15 @@ class SettingsWindow(tk.Toplevel):
         main_frame = ttk.Frame(self, padding="10")
         main_frame.pack(fill=tk.BOTH, expand=True)
 
+        # Abas: as opções de reprodução ficam separadas para a janela caber em telas baixas
+        notebook = ttk.Notebook(main_frame)
+        general_tab = ttk.Frame(notebook, padding="5")
+        playback_tab = ttk.Frame(notebook, padding="5")
+        notebook.add(general_tab, text="Geral")
+        notebook.add(playback_tab, text="Reprodução")
+
         # Aparência 
-        theme_frame = ttk.LabelFrame(main_frame, text="Aparência", padding="10")
+        theme_frame = ttk.LabelFrame(general_tab, text="Aparência", padding="10")
         theme_frame.pack(fill=tk.X, pady=5)
         
         ttk.Label(theme_frame, text="Tema:").pack(side=tk.LEFT, padx=(0, 5))
@@ -61,23 +90,104 @@ class SettingsWindow(tk.Toplevel):
         theme_dropdown.bind("<<ComboboxSelected>>", self._on_theme_change)
 
         # Modo de Gravação
-        record_mode_frame = ttk.LabelFrame(main_frame, text="Modo de Gravação", padding="10")
+        record_mode_frame = ttk.LabelFrame(general_tab, text="Modo de Gravação", padding="10")
         record_mode_frame.pack(fill=tk.X, pady=5)
         
-        ttk.Label(record_mode_frame, text="Gravar:").pack(side=tk.LEFT, padx=(0, 5))
+        ttk.Label(record_mode_frame, text="Gravar:").grid(row=0, column=0, sticky=tk.W, padx=(0, 5))
         record_mode_options = ["Teclado e Mouse", "Somente Teclado", "Somente Mouse"]
         record_mode_dropdown = ttk.Combobox(record_mode_frame, textvariable=self.record_mode_var, values=record_mode_options, state="readonly")
-        record_mode_dropdown.pack(fill=tk.X, expand=True)
+        record_mode_dropdown.grid(row=0, column=1, columnspan=3, sticky="ew")
+
+        # Política de captura dos movimentos do mouse (0 = sem limite)
+        ttk.Label(record_mode_frame, text="Movimentos máx. (Hz):").grid(row=1, column=0, sticky=tk.W, pady=(5, 0))
+        ttk.Entry(record_mode_frame, textvariable=self.move_max_rate_var, width=8).grid(row=1, column=1, sticky=tk.W, padx=5, pady=(5, 0))
+        ttk.Label(record_mode_frame, text="Distância mín. (px):").grid(row=1, column=2, sticky=tk.W, pady=(5, 0))
+        ttk.Entry(record_mode_frame, textvariable=self.move_min_distance_var, width=8).grid(row=1, column=3, sticky=tk.W, padx=5, pady=(5, 0))
+        record_mode_frame.columnconfigure(3, weight=1)
+
+        # Gravação direta em arquivo (.jsonl), que sobrevive a uma queda do app
+        ttk.Checkbutton(
+            record_mode_frame,
+            text="Gravar direto em arquivo na pasta:",
+            variable=self.stream_recording_var
+        ).grid(row=2, column=0, columnspan=2, sticky=tk.W, pady=(5, 0))
+        ttk.Entry(record_mode_frame, textvariable=self.stream_directory_var).grid(row=2, column=2, columnspan=2, sticky="ew", pady=(5, 0))
+
+        # Compressão sugerida ao salvar (a extensão escolhida no arquivo é que vale)
+        ttk.Label(record_mode_frame, text="Compressão ao salvar:").grid(row=3, column=0, sticky=tk.W, pady=(5, 0))
+        ttk.Combobox(
+            record_mode_frame, textvariable=self.save_compression_var,
+            values=list(self.compression_map.keys()), state="readonly"
+        ).grid(row=3, column=1, columnspan=3, sticky="ew", pady=(5, 0))
 
         # Motor de Reprodução 
-        engine_frame = ttk.LabelFrame(main_frame, text="Motor de Reprodução", padding="10")
+        engine_frame = ttk.LabelFrame(playback_tab, text="Motor de Reprodução", padding="10")
         engine_frame.pack(fill=tk.X, pady=5)
         
-        engine_options = ["Pynput (Padrão)", "PyAutoGUI (Apps)", "PyDirectInput (Jogos)"]
+        engine_options = engines.engine_labels()
         engine_dropdown = ttk.Combobox(engine_frame, textvariable=self.playback_engine_var, values=engine_options, state="readonly")
         engine_dropdown.pack(fill=tk.X, expand=True)
         engine_dropdown.bind("<<ComboboxSelected>>", self._toggle_pydirectinput_options)
 
+        # Agenda cada evento no horário absoluto para o tempo não acumular atrasos
+        ttk.Checkbutton(
+            engine_frame,
+            text="Agendamento sem deriva (horário absoluto)",
+            variable=self.absolute_scheduling_var
+        ).pack(anchor=tk.W, pady=(5, 0))
+
+        # Arquivos grandes são lidos em blocos durante a reprodução (0 desativa)
+        stream_playback_frame = ttk.Frame(engine_frame)
+        stream_playback_frame.pack(fill=tk.X, pady=(5, 0))
+        ttk.Label(stream_playback_frame, text="Ler do arquivo durante a reprodução acima de (MB):").pack(side=tk.LEFT)
+        ttk.Entry(stream_playback_frame, textvariable=self.stream_playback_min_mb_var, width=8).pack(side=tk.LEFT, padx=5)
+
+        # Movimentos do mouse reamostrados para uma taxa que a máquina consiga injetar
+        move_rate_frame = ttk.Frame(engine_frame)
+        move_rate_frame.pack(fill=tk.X, pady=(5, 0))
+        ttk.Label(move_rate_frame, text="Movimentos por segundo na reprodução (0 = todos):").pack(side=tk.LEFT)
+        ttk.Entry(move_rate_frame, textvariable=self.move_playback_rate_var, width=8).pack(side=tk.LEFT, padx=5)
+
+        # Eventos gravados quase juntos são disparados em lote (uma espera e uma verificação da janela)
+        batch_frame = ttk.Frame(engine_frame)
+        batch_frame.pack(fill=tk.X, pady=(5, 0))
+        ttk.Label(batch_frame, text="Disparar juntos eventos a até (ms, 0 = um por vez):").pack(side=tk.LEFT)
+        ttk.Entry(batch_frame, textvariable=self.batch_window_var, width=8).pack(side=tk.LEFT, padx=5)
+
+        # Recuperação quando a reprodução fica atrasada (teclas e cliques nunca são pulados)
+        ttk.Checkbutton(
+            engine_frame,
+            text="Pular movimentos do mouse atrasados",
+            variable=self.catch_up_skip_moves_var
+        ).pack(anchor=tk.W, pady=(5, 0))
+        max_lag_frame = ttk.Frame(engine_frame)
+        max_lag_frame.pack(fill=tk.X)
+        ttk.Label(max_lag_frame, text="Atraso máximo acumulado (ms, 0 = sem limite):").pack(side=tk.LEFT)
+        ttk.Entry(max_lag_frame, textvariable=self.catch_up_max_lag_var, width=8).pack(side=tk.LEFT, padx=5)
+
+        # Coletor de lixo desativado, prioridade maior e CPU fixa durante a reprodução
+        ttk.Checkbutton(
+            engine_frame,
+            text="Modo de baixa variação (pausa o coletor de lixo, prioridade alta)",
+            variable=self.low_jitter_var
+        ).pack(anchor=tk.W, pady=(5, 0))
+        pin_cpu_frame = ttk.Frame(engine_frame)
+        pin_cpu_frame.pack(fill=tk.X)
+        ttk.Label(pin_cpu_frame, text="Fixar a reprodução na CPU (vazio = qualquer uma):").pack(side=tk.LEFT)
+        ttk.Entry(pin_cpu_frame, textvariable=self.pin_cpu_var, width=8).pack(side=tk.LEFT, padx=5)
+
+        # Histogramas de atraso e duração das chamadas, com resumo na barra de status
+        ttk.Checkbutton(
+            engine_frame,
+            text="Medir tempos da reprodução (resumo na barra de status)",
+            variable=self.playback_timings_var
+        ).pack(anchor=tk.W, pady=(5, 0))
+        ttk.Checkbutton(
+            engine_frame,
+            text="Exportar os tempos para CSV na pasta de gravações",
+            variable=self.playback_timings_csv_var
+        ).pack(anchor=tk.W)
+
         # Opção de pausa para PyDirectInput (oculta)
         self.pydirectinput_pause_check = ttk.Checkbutton(
             engine_frame, 
@@ -88,7 +198,7 @@ class SettingsWindow(tk.Toplevel):
         self._toggle_pydirectinput_options()
 
         #  Atalhos Globais 
-        hotkey_frame = ttk.LabelFrame(main_frame, text="Atalhos Globais", padding="10")
+        hotkey_frame = ttk.LabelFrame(general_tab, text="Atalhos Globais", padding="10")
         hotkey_frame.pack(fill=tk.X, pady=5)
 
         ttk.Label(hotkey_frame, text="Gravação (Iniciar/Parar):").grid(row=0, column=0, sticky=tk.W, pady=2)
@@ -106,25 +216,32 @@ class SettingsWindow(tk.Toplevel):
         hotkey_frame.columnconfigure(1, weight=1) # Permite que a coluna da entrada se expanda
 
         # Janela Específica 
-        window_frame = ttk.LabelFrame(main_frame, text="Executar somente na janela...", padding="10")
+        window_frame = ttk.LabelFrame(general_tab, text="Executar somente na janela...", padding="10")
         window_frame.pack(fill=tk.X, pady=5)
         
         ttk.Label(window_frame, text="Título da Janela (ou parte dele):").pack(anchor=tk.W)
         window_entry = ttk.Entry(window_frame, textvariable=self.window_title_var)
         window_entry.pack(fill=tk.X, expand=True, pady=2)
 
-        # Status e botões 
-        self.status_label = ttk.Label(main_frame, text=" ")
-        self.status_label.pack(pady=(10, 0))
+        staleness_frame = ttk.Frame(window_frame)
+        staleness_frame.pack(fill=tk.X, pady=(5, 0))
+        ttk.Label(staleness_frame, text="Intervalo máx. de verificação da janela (s):").pack(side=tk.LEFT)
+        ttk.Entry(staleness_frame, textvariable=self.focus_staleness_var, width=8).pack(side=tk.LEFT, padx=5)
 
+        # Status e botões (empacotados antes das abas para ficarem sempre visíveis)
         button_frame = ttk.Frame(main_frame)
         button_frame.pack(side=tk.BOTTOM, fill=tk.X, pady=(10,0))
         
         ttk.Button(button_frame, text="Salvar e Fechar", command=self._save_and_close).pack(side=tk.RIGHT)
         ttk.Button(button_frame, text="Cancelar", command=self._on_closing).pack(side=tk.RIGHT, padx=5)
 
+        self.status_label = ttk.Label(main_frame, text=" ", wraplength=440)
+        self.status_label.pack(side=tk.BOTTOM, pady=(10, 0))
+
+        notebook.pack(fill=tk.BOTH, expand=True)
+
     def _toggle_pydirectinput_options(self, event=None):
-        if self.playback_engine_var.get() == "PyDirectInput (Jogos)":
+        if self.playback_engine_var.get() == engines.PyDirectInputEngine.label:
             self.pydirectinput_pause_check.pack(anchor=tk.W, pady=5)
         else:
             self.pydirectinput_pause_check.pack_forget()
@@ -191,13 +308,58 @@ class SettingsWindow(tk.Toplevel):
             return key.char
         return str(key)
 
+    def _read_number(self, var, label, invalid, convert=float):
+        """
+        Lê um campo numérico (não negativo).
+
+        Returns:
+            O valor lido, ou None se o campo for inválido (o rótulo vai para `invalid`).
+        """
+        try:
+            return max(convert(var.get().strip()), 0)
+        except ValueError:
+            invalid.append(label)
+            return None
+
     def _save_and_close(self):
+        # Lê os campos numéricos antes de tudo: com algum inválido nada é salvo
+        invalid = []
+        numbers = {
+            key: self._read_number(var, label, invalid)
+            for key, var, label in (
+                ("move_max_rate", self.move_max_rate_var, "Movimentos máx."),
+                ("move_min_distance", self.move_min_distance_var, "Distância mín."),
+                ("stream_playback_min_mb", self.stream_playback_min_mb_var, "Ler do arquivo acima de"),
+                ("move_playback_rate", self.move_playback_rate_var, "Movimentos por segundo"),
+                ("playback_batch_window_ms", self.batch_window_var, "Disparar juntos"),
+                ("catch_up_max_lag_ms", self.catch_up_max_lag_var, "Atraso máximo acumulado"),
+                ("focus_max_staleness", self.focus_staleness_var, "Intervalo de verificação da janela"),
+            )
+        }
+        # CPU fixa: vazio = nenhuma
+        pin_cpu = None
+        if self.pin_cpu_var.get().strip():
+            pin_cpu = self._read_number(self.pin_cpu_var, "CPU da reprodução", invalid, int)
+        if invalid:
+            self.status_label.config(text=f"Valores inválidos: {', '.join(invalid)}.")
+            return
+
         # Salva as configurações
         selected_theme_display = self.theme_var.get()
         self.config["theme"] = self.theme_map.get(selected_theme_display, self.original_theme)
         self.config["record_mode"] = self.record_mode_var.get()
+        self.config["stream_recording"] = self.stream_recording_var.get()
+        self.config["stream_directory"] = self.stream_directory_var.get().strip() or "gravacoes"
+        self.config["save_compression"] = self.compression_map.get(self.save_compression_var.get(), "none")
+        self.config.update(numbers)
         self.config["playback_engine"] = self.playback_engine_var.get()
         self.config["pydirectinput_optimized_pause"] = self.pydirectinput_pause_var.get()
+        self.config["absolute_scheduling"] = self.absolute_scheduling_var.get()
+        self.config["catch_up_skip_moves"] = self.catch_up_skip_moves_var.get()
+        self.config["playback_low_jitter"] = self.low_jitter_var.get()
+        self.config["playback_pin_cpu"] = pin_cpu
+        self.config["playback_timings"] = self.playback_timings_var.get()
+        self.config["playback_timings_csv"] = self.playback_timings_csv_var.get()
         self.config["window_specific_title"] = self.window_title_var.get()
         self.config["hotkeys"] = self.temp_hotkeys
 